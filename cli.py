@@ -0,0 +1,140 @@
+"""
+Fletube em linha de comando, para downloads agendados sem interface.
+
+    python cli.py batch urls.txt --format mp3 --jobs 6
+
+Cada evento de progresso sai em stdout como uma linha JSON; os logs e a
+saída do yt-dlp vão para stderr. Os downloads concluídos entram no mesmo
+histórico do aplicativo.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+FORMATS = ["mp4", "mkv", "webm", "mp3", "wav", "m4a"]
+
+
+def read_links(path: str):
+    source = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    with source:
+        for line in source:
+            link = line.strip()
+            if link and not link.startswith("#"):
+                yield link
+
+
+def json_lines_writer():
+    """
+    Reserva o stdout real para o JSON e aponta o descritor 1 para stderr,
+    de modo que prints do yt-dlp, inclusive em processos filhos, não
+    misturem texto à saída.
+    """
+    output = os.fdopen(os.dup(sys.stdout.fileno()), "w", buffering=1, encoding="utf-8")
+    sys.stdout.flush()
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    def emit(record):
+        output.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    return emit
+
+
+def run_batch(args) -> int:
+    links = list(read_links(args.file))
+    if not links:
+        print("Nenhum link encontrado em", args.file, file=sys.stderr)
+        return 2
+
+    emit = json_lines_writer()
+
+    # Importados depois do redirecionamento: os módulos já logam no import
+    from services.storage_service import FletubeStorage
+    from utils.instance_lock import storage_lock
+    from utils.logging_config import setup_logging
+
+    logger = setup_logging()
+
+    # Dois processos gravando o mesmo journal perdem registros
+    lock = storage_lock()
+    if not lock.acquire():
+        print(
+            "O Fletube está aberto (ou outro batch em execução); feche-o antes.",
+            file=sys.stderr,
+        )
+        return 2
+
+    try:
+        return _run_with_storage(args, links, emit, FletubeStorage(), logger)
+    finally:
+        lock.release()
+
+
+def _run_with_storage(args, links, emit, storage, logger) -> int:
+    from services.headless import HeadlessDownloadManager
+    from utils.metadata_cache import is_youtube_playlist_url
+
+    formato = args.format or storage.get_setting("default_format", "mp4")
+    diretorio = args.output or storage.get_setting("download_directory")
+    if not diretorio:
+        print(
+            "Informe --output ou configure um diretório no aplicativo.",
+            file=sys.stderr,
+        )
+        return 2
+    Path(diretorio).mkdir(parents=True, exist_ok=True)
+
+    manager = HeadlessDownloadManager(storage, emit)
+
+    if args.jobs:
+        # Número fixo de slots: o ajuste automático ficaria competindo
+        manager.concurrency.configure(enabled=False)
+        manager.scheduler.set_max_active(args.jobs)
+
+    logger.info(
+        f"Batch: {len(links)} links, formato={formato}, "
+        f"downloads simultâneos={manager.scheduler.max_active}"
+    )
+
+    requests = [(link, is_youtube_playlist_url(link)) for link in links]
+
+    try:
+        summary = asyncio.run(manager.run(requests, formato, diretorio))
+    except KeyboardInterrupt:
+        logger.warning("Batch interrompido, cancelando downloads em andamento")
+        manager.cancel_all()
+        emit({"event": "interrupted"})
+        return 130
+    finally:
+        storage.close()
+
+    manager.shutdown()
+    return 1 if summary["error"] else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="fletube", description=__doc__.split("\n")[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="baixa uma lista de links")
+    batch.add_argument("file", help="arquivo com um link por linha ('-' para stdin)")
+    batch.add_argument("--format", choices=FORMATS, help="formato (padrão: o do app)")
+    batch.add_argument("--output", help="diretório de destino (padrão: o do app)")
+    batch.add_argument(
+        "--jobs", type=int, help="downloads simultâneos (padrão: ajuste automático)"
+    )
+    batch.set_defaults(handler=run_batch)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
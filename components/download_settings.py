@@ -7,6 +7,9 @@ from utils.logging_config import setup_logging
 
 logger = setup_logging()
 
+from services.bandwidth import BANDWIDTH_SETTINGS
+from services.concurrency import CONCURRENCY_SETTINGS
+from services.process_worker import WORKER_PROCESS, WORKER_THREAD
 from utils.file_picker_utils import setup_file_picker
 
 
@@ -25,6 +28,25 @@ class DownloadSettingsManager:
         ("m4a", "M4A - Áudio"),
     ]
 
+    DOWNLOADS_BACKENDS = [
+        ("json", "JSON (padrão)"),
+        ("sqlite", "SQLite (históricos grandes)"),
+    ]
+
+    FRAGMENT_THREAD_OPTIONS = [
+        (0, "Automático"),
+        (1, "1 (sequencial)"),
+        (2, "2"),
+        (4, "4"),
+        (8, "8"),
+        (16, "16"),
+    ]
+
+    WORKER_MODES = [
+        (WORKER_THREAD, "Threads (padrão)"),
+        (WORKER_PROCESS, "Processos separados"),
+    ]
+
     DEFAULT_DIRECTORY_MESSAGE = "Nenhum diretório selecionado"
 
     def __init__(self, page: ft.Page):
@@ -118,6 +140,173 @@ class DownloadSettingsManager:
 
         self._show_success(f"Monitoramento {status}!")
 
+    def get_downloads_backend(self) -> str:
+        return self.storage.get_setting("downloads_backend", "json")
+
+    def set_downloads_backend(self, backend: str) -> bool:
+        valid_backends = [code for code, _ in self.DOWNLOADS_BACKENDS]
+
+        if backend not in valid_backends:
+            logger.warning(f"Backend de histórico inválido: {backend}")
+            return False
+
+        self.storage.set_setting("downloads_backend", backend)
+
+        logger.info(f"Backend do histórico alterado para: {backend}")
+        self._show_success("Armazenamento alterado! Reinicie o aplicativo.")
+
+        return True
+
+    def get_fragment_threads(self) -> int:
+        return self.storage.get_setting("fragment_threads", 0)
+
+    def set_fragment_threads(self, threads) -> bool:
+        valid_threads = [value for value, _ in self.FRAGMENT_THREAD_OPTIONS]
+
+        try:
+            threads = int(threads)
+        except (TypeError, ValueError):
+            threads = None
+
+        if threads not in valid_threads:
+            logger.warning(f"Número de fragmentos inválido: {threads}")
+            return False
+
+        self.storage.set_setting("fragment_threads", threads)
+
+        download_manager = self.page.session.get("download_manager")
+        if download_manager:
+            download_manager.bandwidth.configure(fragment_threads=threads)
+
+        logger.info(f"Fragmentos simultâneos: {threads or 'automático'}")
+        self._show_success(
+            f"Fragmentos simultâneos: {threads}"
+            if threads
+            else "Fragmentos: automático"
+        )
+
+        return True
+
+    def get_download_worker(self) -> str:
+        return self.storage.get_setting("download_worker", WORKER_THREAD)
+
+    def set_download_worker(self, mode: str) -> bool:
+        valid_modes = [code for code, _ in self.WORKER_MODES]
+
+        if mode not in valid_modes:
+            logger.warning(f"Modo de execução inválido: {mode}")
+            return False
+
+        self.storage.set_setting("download_worker", mode)
+
+        # Vale para os próximos downloads; os atuais seguem como estão
+        download_manager = self.page.session.get("download_manager")
+        if download_manager:
+            download_manager.worker_mode = mode
+
+        logger.info(f"Modo de execução dos downloads: {mode}")
+        self._show_success(
+            "Downloads em processos separados"
+            if mode == WORKER_PROCESS
+            else "Downloads em threads"
+        )
+
+        return True
+
+    def get_bandwidth_settings(self) -> dict:
+        return {
+            key: self.storage.get_setting(key, default)
+            for key, default in BANDWIDTH_SETTINGS.items()
+        }
+
+    def set_bandwidth_settings(
+        self,
+        limit_kbps,
+        job_cap_kbps,
+        schedule_enabled: bool,
+        schedule_start: int,
+        schedule_end: int,
+    ) -> bool:
+        try:
+            limit_kbps = int(limit_kbps or 0)
+            job_cap_kbps = int(job_cap_kbps or 0)
+        except (TypeError, ValueError):
+            self._show_error("Informe os limites em KB/s (apenas números).")
+            return False
+
+        if limit_kbps < 0 or job_cap_kbps < 0:
+            self._show_error("Os limites não podem ser negativos.")
+            return False
+
+        values = {
+            "bandwidth_limit_kbps": limit_kbps,
+            "bandwidth_job_cap_kbps": job_cap_kbps,
+            "bandwidth_schedule_enabled": bool(schedule_enabled),
+            "bandwidth_schedule_start": int(schedule_start) % 24,
+            "bandwidth_schedule_end": int(schedule_end) % 24,
+        }
+        self.storage.set_settings(values)
+
+        # Aplica imediatamente aos downloads em andamento
+        download_manager = self.page.session.get("download_manager")
+        if download_manager:
+            download_manager.bandwidth.configure(
+                limit_kbps=values["bandwidth_limit_kbps"],
+                job_cap_kbps=values["bandwidth_job_cap_kbps"],
+                schedule_enabled=values["bandwidth_schedule_enabled"],
+                schedule_start=values["bandwidth_schedule_start"],
+                schedule_end=values["bandwidth_schedule_end"],
+            )
+
+        logger.info(f"Limites de banda atualizados: {values}")
+        self._show_success(
+            f"Limite de banda: {limit_kbps} KB/s" if limit_kbps else "Banda sem limite"
+        )
+
+        return True
+
+    def get_concurrency_settings(self) -> dict:
+        return {
+            key: self.storage.get_setting(key, default)
+            for key, default in CONCURRENCY_SETTINGS.items()
+        }
+
+    def set_concurrency_settings(self, enabled: bool, min_active, max_active) -> bool:
+        try:
+            min_active = int(min_active)
+            max_active = int(max_active)
+        except (TypeError, ValueError):
+            self._show_error("Informe os limites de downloads simultâneos.")
+            return False
+
+        if min_active < 1 or max_active < min_active:
+            self._show_error("O máximo deve ser maior ou igual ao mínimo.")
+            return False
+
+        values = {
+            "adaptive_concurrency": bool(enabled),
+            "concurrency_min": min_active,
+            "concurrency_max": max_active,
+        }
+        self.storage.set_settings(values)
+
+        download_manager = self.page.session.get("download_manager")
+        if download_manager:
+            download_manager.concurrency.configure(
+                enabled=values["adaptive_concurrency"],
+                min_active=min_active,
+                max_active=max_active,
+            )
+
+        logger.info(f"Downloads simultâneos atualizados: {values}")
+        self._show_success(
+            f"Downloads simultâneos: {min_active}-{max_active}"
+            if enabled
+            else "Ajuste automático desativado"
+        )
+
+        return True
+
     def _show_success(self, message: str):
         snack_bar = ft.SnackBar(
             content=ft.Row(
@@ -188,6 +377,43 @@ def DownloadSettings(page: ft.Page):
         new_format = e.control.value
         manager.set_default_format(new_format)
 
+    def on_backend_change(e):
+        manager.set_downloads_backend(e.control.value)
+
+    bandwidth_settings = manager.get_bandwidth_settings()
+    bandwidth_limit_ref = ft.Ref[ft.TextField]()
+    bandwidth_cap_ref = ft.Ref[ft.TextField]()
+    schedule_switch_ref = ft.Ref[ft.Switch]()
+    schedule_start_ref = ft.Ref[ft.Dropdown]()
+    schedule_end_ref = ft.Ref[ft.Dropdown]()
+
+    def on_bandwidth_apply(e):
+        manager.set_bandwidth_settings(
+            limit_kbps=bandwidth_limit_ref.current.value,
+            job_cap_kbps=bandwidth_cap_ref.current.value,
+            schedule_enabled=schedule_switch_ref.current.value,
+            schedule_start=schedule_start_ref.current.value,
+            schedule_end=schedule_end_ref.current.value,
+        )
+
+    concurrency_settings = manager.get_concurrency_settings()
+    concurrency_switch_ref = ft.Ref[ft.Switch]()
+    concurrency_min_ref = ft.Ref[ft.Dropdown]()
+    concurrency_max_ref = ft.Ref[ft.Dropdown]()
+
+    def on_concurrency_apply(e):
+        manager.set_concurrency_settings(
+            enabled=concurrency_switch_ref.current.value,
+            min_active=concurrency_min_ref.current.value,
+            max_active=concurrency_max_ref.current.value,
+        )
+
+    def on_worker_change(e):
+        manager.set_download_worker(e.control.value)
+
+    def on_fragment_threads_change(e):
+        manager.set_fragment_threads(e.control.value)
+
     def on_clipboard_toggle(e):
         enabled = e.control.value
         manager.set_clipboard_monitoring(enabled)
@@ -334,6 +560,22 @@ def DownloadSettings(page: ft.Page):
                 ft.Container(height=8),
                 download_format_dropdown,
                 format_info,
+                ft.Container(height=8),
+                ft.Dropdown(
+                    label="Fragmentos simultâneos (DASH/HLS)",
+                    value=str(manager.get_fragment_threads()),
+                    options=[
+                        ft.dropdown.Option(str(value), label)
+                        for value, label in manager.FRAGMENT_THREAD_OPTIONS
+                    ],
+                    on_change=on_fragment_threads_change,
+                    border_color=ft.Colors.OUTLINE_VARIANT,
+                    focused_border_color=ft.Colors.PRIMARY,
+                    border_radius=8,
+                    content_padding=ft.padding.symmetric(horizontal=16, vertical=14),
+                    text_size=14,
+                    filled=True,
+                ),
             ],
             spacing=4,
         ),
@@ -375,6 +617,172 @@ def DownloadSettings(page: ft.Page):
         border=ft.border.all(1, ft.Colors.OUTLINE_VARIANT),
     )
 
+    hour_options = [ft.dropdown.Option(str(h), f"{h:02d}:00") for h in range(24)]
+
+    bandwidth_section = ft.Container(
+        content=ft.Column(
+            [
+                ft.Row(
+                    [
+                        ft.Icon(ft.Icons.SPEED, size=20, color=ft.Colors.PRIMARY),
+                        ft.Text(
+                            "Limite de Banda",
+                            size=16,
+                            weight=ft.FontWeight.BOLD,
+                            color=ft.Colors.ON_SURFACE,
+                        ),
+                    ],
+                    spacing=8,
+                ),
+                ft.Container(height=8),
+                ft.TextField(
+                    ref=bandwidth_limit_ref,
+                    label="Limite total (KB/s)",
+                    value=str(bandwidth_settings["bandwidth_limit_kbps"]),
+                    keyboard_type=ft.KeyboardType.NUMBER,
+                    border_radius=8,
+                    text_size=14,
+                ),
+                ft.TextField(
+                    ref=bandwidth_cap_ref,
+                    label="Limite por download (KB/s)",
+                    value=str(bandwidth_settings["bandwidth_job_cap_kbps"]),
+                    keyboard_type=ft.KeyboardType.NUMBER,
+                    border_radius=8,
+                    text_size=14,
+                ),
+                ft.Switch(
+                    ref=schedule_switch_ref,
+                    label="Velocidade máxima no horário agendado",
+                    value=bandwidth_settings["bandwidth_schedule_enabled"],
+                    active_color=ft.Colors.PRIMARY,
+                ),
+                ft.Row(
+                    [
+                        ft.Dropdown(
+                            ref=schedule_start_ref,
+                            label="Das",
+                            value=str(bandwidth_settings["bandwidth_schedule_start"]),
+                            options=hour_options,
+                            width=120,
+                            border_radius=8,
+                            text_size=14,
+                        ),
+                        ft.Dropdown(
+                            ref=schedule_end_ref,
+                            label="Até",
+                            value=str(bandwidth_settings["bandwidth_schedule_end"]),
+                            options=hour_options,
+                            width=120,
+                            border_radius=8,
+                            text_size=14,
+                        ),
+                    ],
+                    spacing=12,
+                ),
+                ft.Text(
+                    "0 = sem limite; o total é dividido entre os downloads ativos",
+                    size=12,
+                    color=ft.Colors.BLUE_GREY_400,
+                    italic=True,
+                ),
+                ft.ElevatedButton(
+                    text="Aplicar limites",
+                    icon=ft.Icons.CHECK,
+                    on_click=on_bandwidth_apply,
+                ),
+            ],
+            spacing=8,
+        ),
+        col={"sm": 12, "md": 6},
+        padding=20,
+        border_radius=12,
+        border=ft.border.all(1, ft.Colors.OUTLINE_VARIANT),
+    )
+
+    slot_options = [ft.dropdown.Option(str(n)) for n in range(1, 11)]
+
+    concurrency_section = ft.Container(
+        content=ft.Column(
+            [
+                ft.Row(
+                    [
+                        ft.Icon(ft.Icons.TUNE, size=20, color=ft.Colors.PRIMARY),
+                        ft.Text(
+                            "Downloads Simultâneos",
+                            size=16,
+                            weight=ft.FontWeight.BOLD,
+                            color=ft.Colors.ON_SURFACE,
+                        ),
+                    ],
+                    spacing=8,
+                ),
+                ft.Container(height=8),
+                ft.Switch(
+                    ref=concurrency_switch_ref,
+                    label="Ajustar automaticamente",
+                    value=concurrency_settings["adaptive_concurrency"],
+                    active_color=ft.Colors.PRIMARY,
+                ),
+                ft.Row(
+                    [
+                        ft.Dropdown(
+                            ref=concurrency_min_ref,
+                            label="Mínimo",
+                            value=str(concurrency_settings["concurrency_min"]),
+                            options=slot_options,
+                            width=120,
+                            border_radius=8,
+                            text_size=14,
+                        ),
+                        ft.Dropdown(
+                            ref=concurrency_max_ref,
+                            label="Máximo",
+                            value=str(concurrency_settings["concurrency_max"]),
+                            options=slot_options,
+                            width=120,
+                            border_radius=8,
+                            text_size=14,
+                        ),
+                    ],
+                    spacing=12,
+                ),
+                ft.Dropdown(
+                    label="Execução dos downloads",
+                    value=manager.get_download_worker(),
+                    options=[
+                        ft.dropdown.Option(code, label)
+                        for code, label in manager.WORKER_MODES
+                    ],
+                    on_change=on_worker_change,
+                    border_color=ft.Colors.OUTLINE_VARIANT,
+                    focused_border_color=ft.Colors.PRIMARY,
+                    border_radius=8,
+                    content_padding=ft.padding.symmetric(horizontal=16, vertical=14),
+                    text_size=14,
+                    filled=True,
+                ),
+                ft.Text(
+                    "Aumenta enquanto a velocidade total cresce e reduz com erros "
+                    "ou bloqueios do servidor",
+                    size=12,
+                    color=ft.Colors.BLUE_GREY_400,
+                    italic=True,
+                ),
+                ft.ElevatedButton(
+                    text="Aplicar",
+                    icon=ft.Icons.CHECK,
+                    on_click=on_concurrency_apply,
+                ),
+            ],
+            spacing=8,
+        ),
+        col={"sm": 12, "md": 6},
+        padding=20,
+        border_radius=12,
+        border=ft.border.all(1, ft.Colors.OUTLINE_VARIANT),
+    )
+
     storage_info_section = ft.Container(
         content=ft.Column(
             [
@@ -407,6 +815,28 @@ def DownloadSettings(page: ft.Page):
                     f"📋 Monitoramento: {'Ativo' if manager.get_clipboard_monitoring() else 'Inativo'}",
                     size=13,
                 ),
+                ft.Container(height=8),
+                ft.Dropdown(
+                    label="Armazenamento do histórico",
+                    value=manager.get_downloads_backend(),
+                    options=[
+                        ft.dropdown.Option(code, label)
+                        for code, label in manager.DOWNLOADS_BACKENDS
+                    ],
+                    on_change=on_backend_change,
+                    border_color=ft.Colors.OUTLINE_VARIANT,
+                    focused_border_color=ft.Colors.PRIMARY,
+                    border_radius=8,
+                    content_padding=ft.padding.symmetric(horizontal=16, vertical=14),
+                    text_size=14,
+                    filled=True,
+                ),
+                ft.Text(
+                    "A mudança vale após reiniciar; o histórico é migrado para o novo formato",
+                    size=12,
+                    color=ft.Colors.BLUE_GREY_400,
+                    italic=True,
+                ),
             ],
             spacing=8,
         ),
@@ -419,6 +849,8 @@ def DownloadSettings(page: ft.Page):
             directory_section,
             format_section,
             clipboard_section,
+            bandwidth_section,
+            concurrency_section,
             storage_info_section,
         ],
         run_spacing=20,
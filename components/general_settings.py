@@ -23,8 +23,6 @@ class GeneralSettingsManager:
 
             logger.warning(f"Resetando configurações: {storage_info}")
 
-            self.storage.settings.clear()
-
             defaults = {
                 "theme_mode": "LIGHT",
                 "font_family": "Padrão",
@@ -33,8 +31,9 @@ class GeneralSettingsManager:
                 "initialized": True,
             }
 
-            for key, value in defaults.items():
-                self.storage.set_setting(key, value)
+            with self.storage.settings.batch():
+                self.storage.settings.clear()
+                self.storage.set_settings(defaults)
 
             self.page.client_storage.clear()
 
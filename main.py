@@ -1,4 +1,5 @@
 import logging
+import multiprocessing
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -9,6 +10,7 @@ from services.download_manager import DownloadManager
 from services.send_feedback import retry_failed_feedbacks
 from services.storage_service import FletubeStorage
 from services.supabase_utils import user_is_active
+from utils.instance_lock import StorageLockedError, storage_lock
 from utils.logging_config import setup_logging
 from utils.validations import AuthValidator
 
@@ -18,11 +20,27 @@ logger = setup_logging()
 class AppState:
     def __init__(self, page: ft.Page):
         self.page = page
+        # Dois processos gravando o mesmo journal perdem registros: sem a
+        # trava (app já aberto ou batch do CLI rodando) o app não abre
+        self.lock = storage_lock()
+        if not self.lock.acquire():
+            raise StorageLockedError(
+                "O Fletube já está aberto ou um download em lote está em "
+                "andamento. Feche-o e abra o aplicativo novamente."
+            )
         self.storage = FletubeStorage()
-        self.download_manager = DownloadManager(page)
+        self.download_manager = DownloadManager(storage=self.storage)
 
         self._initialize_defaults()
 
+        page.on_close = lambda e: self.shutdown()
+
+    def shutdown(self):
+        logger.info("Encerrando Fletube, gravando alterações pendentes...")
+        self.download_manager.shutdown()
+        self.storage.close()
+        self.lock.release()
+
     def _initialize_defaults(self):
         if not self.storage.get_setting("initialized"):
             logger.info("Primeira execução detectada, configurando padrões...")
@@ -35,8 +53,8 @@ class AppState:
                 "initialized": True,
             }
 
+            self.storage.set_settings(defaults)
             for key, value in defaults.items():
-                self.storage.set_setting(key, value)
                 self.page.client_storage.set(key, value)
 
             logger.info("Configurações padrão aplicadas com sucesso")
@@ -180,6 +198,10 @@ def setup_lifecycle_handler(page: ft.Page):
             logger.info("Aplicação em segundo plano")
             page.session.set("app_in_background", True)
 
+            storage = page.session.get("app_storage")
+            if storage:
+                storage.flush()
+
             if page.client_storage.get("autenticado"):
                 verificar_status_usuario(page)
 
@@ -285,11 +307,17 @@ def main(page: ft.Page):
 
         logger.info("Fletube inicializado com sucesso")
 
+    except StorageLockedError as e:
+        logger.error(f"Storage em uso por outro processo: {e}")
+        show_error_screen(page, str(e))
+
     except Exception as e:
         logger.critical(f"Erro crítico na inicialização: {e}", exc_info=True)
         show_error_screen(page, str(e))
 
 
 if __name__ == "__main__":
+    # Necessário para o modo de downloads em processos no executável empacotado
+    multiprocessing.freeze_support()
     logger.info("Fletube - Sistema de Download do YouTube")
     ft.app(target=main, assets_dir="assets")
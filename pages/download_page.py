@@ -6,16 +6,20 @@ logger = setup_logging()
 
 from partials.download_content import download_content
 from partials.download_sidebar import SidebarList
+from partials.download_view import DownloadView
 from services.download_manager import DownloadManager
 
 
 def DownloadPage(page: ft.Page, download_manager: DownloadManager):
     sidebar = SidebarList(page)
+    view = DownloadView(page, download_manager, sidebar)
+    view.attach()
 
-    content = download_content(page, sidebar, download_manager)
+    content = download_content(page, sidebar, download_manager, view)
 
     def on_unmount(e):
         logger.info("DownloadPage desmontada.")
+        view.detach()
         sidebar.on_unmount()
         logger.info("SidebarList desmontada.")
 
@@ -1,112 +1,57 @@
 import os
+import threading
 
 import flet as ft
 
 from utils.logging_config import setup_logging
+from utils.thumbnail_cache import thumbnail_cache
 
 logger = setup_logging()
 
 
-def HistoryPage(page: ft.Page):
-    storage = page.session.get("app_storage")
-    search_query = ft.Ref[ft.TextField]()
-    sort_by = ft.Ref[ft.Dropdown]()
-    selected_items = set()
-    last_deleted_items = []
+PAGE_SIZE = 40
+# Máximo de cards na grade: ao rolar, os que saem da janela voltam ao pool
+MAX_CARDS = PAGE_SIZE * 3
+SCROLL_THRESHOLD = 400
+SEARCH_DEBOUNCE = 0.2
 
-    dlg_modal_rf = ft.Ref[ft.AlertDialog]()
 
-    counts_text = ft.Text("", size=16, weight=ft.FontWeight.W_600)
+class HistoryCard(ft.Container):
+    """
+    Card do histórico reaproveitável: bind() troca o item exibido sem
+    recriar imagem, textos e botões.
+    """
 
-    def get_download_history():
-        if storage:
-            return storage.list_downloads()
-        return []
+    def __init__(self, on_delete):
+        self.item = None
+        self.on_delete = on_delete
 
-    def render_download_item(item):
-        item_id = item.get("id")
-        file_path = item.get("file_path", "")
-        if not item_id:
-            logger.warning(f"Item sem ID encontrado: {item}")
-            return ft.Container()
-
-        def toggle_selection(e):
-            if item_id in selected_items:
-                selected_items.remove(item_id)
-            else:
-                selected_items.add(item_id)
-            checkbox.checked = item_id in selected_items
-            page.update()
-
-        def delete_item(e, item_id=item_id, current_item=item):
-            try:
-                if storage:
-                    storage.delete_download(item_id)
-                last_deleted_items.append(current_item)
-                update_history_view()
-
-                from utils.ui_helpers import show_snackbar
-
-                snack_bar = ft.SnackBar(
-                    content=ft.Text("Item excluído."),
-                    bgcolor=ft.Colors.PRIMARY,
-                    action="Desfazer",
-                )
-                snack_bar.on_action = lambda e: undo_delete(e)
-                page.overlay.append(snack_bar)
-                snack_bar.open = True
-                page.update()
-            except Exception as ex:
-                logger.error(f"Erro ao excluir o item: {ex}")
-                from utils.ui_helpers import show_error_snackbar
-
-                show_error_snackbar(page, "Erro ao excluir o item.")
-
-        def undo_delete(e):
-            for deleted_item in last_deleted_items:
-                if storage:
-                    storage.save_download(deleted_item.get("id"), deleted_item)
-            last_deleted_items.clear()
-            update_history_view()
-
-            from utils.ui_helpers import show_snackbar
-
-            show_snackbar(page, "Exclusão desfeita.")
-
-        checkbox = ft.Checkbox(
-            value=item_id in selected_items,
-            on_change=toggle_selection,
+        self.thumbnail_image = ft.Image(
+            src="images/",
+            width=235,
+            height=120,
+            fit=ft.ImageFit.COVER,
+            border_radius=ft.border_radius.only(top_left=8, top_right=8),
+            expand=True,
         )
+        self.title_text = ft.Text(
+            "",
+            size=16,
+            weight=ft.FontWeight.BOLD,
+            max_lines=2,
+            overflow=ft.TextOverflow.ELLIPSIS,
+        )
+        self.format_text = ft.Text("", size=14, weight=ft.FontWeight.W_600)
 
-        container_ref = ft.Ref[ft.Container]()
-
-        return ft.Container(
-            ref=container_ref,
+        super().__init__(
             content=ft.Column(
                 controls=[
-                    ft.Image(
-                        src=item.get("thumbnail", "images/"),
-                        width=235,
-                        height=120,
-                        fit=ft.ImageFit.COVER,
-                        border_radius=ft.border_radius.only(top_left=8, top_right=8),
-                        expand=True,
-                    ),
+                    self.thumbnail_image,
                     ft.Container(
                         content=ft.Column(
                             controls=[
-                                ft.Text(
-                                    item.get("title", "Título Indisponível"),
-                                    size=16,
-                                    weight=ft.FontWeight.BOLD,
-                                    max_lines=2,
-                                    overflow=ft.TextOverflow.ELLIPSIS,
-                                ),
-                                ft.Text(
-                                    f"Formato: {item.get('format', 'Formato Indisponível')}",
-                                    size=14,
-                                    weight=ft.FontWeight.W_600,
-                                ),
+                                self.title_text,
+                                self.format_text,
                                 ft.Row(
                                     controls=[
                                         ft.IconButton(
@@ -131,8 +76,8 @@ def HistoryPage(page: ft.Page):
                                         ),
                                         ft.IconButton(
                                             icon=ft.Icons.DELETE_OUTLINE,
-                                            on_click=lambda e, item_id=item_id: delete_item(
-                                                e, item_id
+                                            on_click=lambda e: self.on_delete(
+                                                self, self.item
                                             ),
                                             tooltip="Excluir do Histórico",
                                             icon_size=20,
@@ -170,15 +115,220 @@ def HistoryPage(page: ft.Page):
                 offset=ft.Offset(0, 2),
             ),
             animate_scale=ft.Animation(300, ft.AnimationCurve.EASE_IN_OUT),
-            on_hover=lambda e: on_hover(e, container_ref.current),
+            on_hover=self._on_hover,
+        )
+
+    def bind(self, item):
+        self.item = item
+        self.thumbnail_image.src = thumbnail_cache.src(
+            item.get("thumbnail", "images/"),
+            "history",
+            on_ready=lambda path, bound=item: self._set_thumbnail(bound, path),
+        )
+        self.title_text.value = item.get("title", "Título Indisponível")
+        self.format_text.value = (
+            f"Formato: {item.get('format', 'Formato Indisponível')}"
+        )
+        self.scale = 1.0
+        return self
+
+    def _set_thumbnail(self, item, path):
+        # O card pode ter sido reaproveitado para outro item enquanto isso
+        if self.item is not item:
+            return
+        self.thumbnail_image.src = path
+        try:
+            self.thumbnail_image.update()
+        except Exception:
+            pass
+
+    def _on_hover(self, e):
+        self.scale = 1.05 if e.data == "true" else 1.0
+        self.update()
+
+
+def HistoryPage(page: ft.Page):
+    storage = page.session.get("app_storage")
+    search_query = ft.Ref[ft.TextField]()
+    sort_by = ft.Ref[ft.Dropdown]()
+    last_deleted_items = []
+
+    # Janela de itens carregados: [start, offset) no storage, com no máximo
+    # MAX_CARDS cards; o resto é buscado conforme o usuário rola a grade
+    view_state = {
+        "start": 0,
+        "offset": 0,
+        "has_more": False,
+        "total": 0,
+        "filtered": 0,
+    }
+    card_pool = []
+    search_timer = {"timer": None}
+
+    dlg_modal_rf = ft.Ref[ft.AlertDialog]()
+
+    counts_text = ft.Text("", size=16, weight=ft.FontWeight.W_600)
+
+    def get_download_history():
+        if storage:
+            return storage.list_downloads()
+        return []
+
+    def current_filters():
+        query = ""
+        if search_query.current and search_query.current.value:
+            query = search_query.current.value.strip()
+        sort_criteria = sort_by.current.value if sort_by.current else "title"
+        return query, sort_criteria
+
+    def acquire_card(item):
+        card = card_pool.pop() if card_pool else HistoryCard(on_delete=delete_item)
+        return card.bind(item)
+
+    def release_card(card):
+        card.item = None
+        card_pool.append(card)
+
+    def refresh_counts():
+        counts_text.value = (
+            f"Total de downloads: {view_state['total']} | "
+            f"Exibindo: {view_state['filtered']}"
+        )
+
+    def fetch_cards(offset, limit):
+        query, sort_criteria = current_filters()
+        items = storage.query_downloads(
+            text=query, sort_by=sort_criteria, limit=limit, offset=offset
         )
 
-    def on_hover(e, container):
-        if e.data == "true":
-            container.scale = 1.05
-        else:
-            container.scale = 1.0
-        container.update()
+        cards = []
+        for item in items:
+            if not item.get("id"):
+                logger.warning(f"Item sem ID encontrado: {item}")
+                continue
+            cards.append(acquire_card(item))
+        return items, cards
+
+    def load_more():
+        if not storage:
+            view_state["has_more"] = False
+            return
+
+        items, cards = fetch_cards(view_state["offset"], PAGE_SIZE)
+        history_grid.controls.extend(cards)
+
+        view_state["offset"] += len(items)
+        view_state["has_more"] = len(items) == PAGE_SIZE
+
+    def load_previous():
+        """Recarrega a página anterior ao topo da janela; devolve quantos cards."""
+        start = max(view_state["start"] - PAGE_SIZE, 0)
+        _, cards = fetch_cards(start, view_state["start"] - start)
+        history_grid.controls[0:0] = cards
+        view_state["start"] = start
+
+        excess = len(history_grid.controls) - MAX_CARDS
+        if excess > 0:
+            for card in history_grid.controls[-excess:]:
+                release_card(card)
+            del history_grid.controls[-excess:]
+            view_state["offset"] -= excess
+            view_state["has_more"] = True
+        return len(cards)
+
+    def trim_head():
+        """Libera os cards que passaram do topo da janela; devolve quantos."""
+        excess = len(history_grid.controls) - MAX_CARDS
+        if excess <= 0:
+            return 0
+
+        for card in history_grid.controls[:excess]:
+            release_card(card)
+        del history_grid.controls[:excess]
+        view_state["start"] += excess
+        return excess
+
+    def card_extent(e: ft.OnScrollEvent):
+        # Altura média por card, para manter a posição visível ao trocar
+        # cards no início da grade
+        content = e.max_scroll_extent + e.viewport_dimension
+        return content / max(len(history_grid.controls), 1)
+
+    def reset_view():
+        for card in history_grid.controls:
+            release_card(card)
+        history_grid.controls = []
+        view_state["start"] = 0
+        view_state["offset"] = 0
+
+        query, _ = current_filters()
+        view_state["total"] = storage.count_downloads() if storage else 0
+        view_state["filtered"] = (
+            storage.count_downloads(text=query)
+            if storage and query
+            else view_state["total"]
+        )
+        refresh_counts()
+
+        load_more()
+
+    def handle_scroll(e: ft.OnScrollEvent):
+        if view_state["has_more"] and (
+            e.pixels >= e.max_scroll_extent - SCROLL_THRESHOLD
+        ):
+            extent = card_extent(e)
+            load_more()
+            removed = trim_head()
+            history_grid.update()
+            if removed:
+                history_grid.scroll_to(delta=-removed * extent, duration=0)
+
+        elif view_state["start"] > 0 and e.pixels <= SCROLL_THRESHOLD:
+            extent = card_extent(e)
+            added = load_previous()
+            history_grid.update()
+            history_grid.scroll_to(delta=added * extent, duration=0)
+
+    def delete_item(card, current_item):
+        try:
+            item_id = current_item.get("id")
+            if storage:
+                storage.delete_download(item_id)
+            last_deleted_items.append(current_item)
+
+            if card in history_grid.controls:
+                history_grid.controls.remove(card)
+                release_card(card)
+                view_state["offset"] -= 1
+            view_state["total"] -= 1
+            view_state["filtered"] -= 1
+            refresh_counts()
+
+            snack_bar = ft.SnackBar(
+                content=ft.Text("Item excluído."),
+                bgcolor=ft.Colors.PRIMARY,
+                action="Desfazer",
+            )
+            snack_bar.on_action = lambda e: undo_delete(e)
+            page.overlay.append(snack_bar)
+            snack_bar.open = True
+            page.update()
+        except Exception as ex:
+            logger.error(f"Erro ao excluir o item: {ex}")
+            from utils.ui_helpers import show_error_snackbar
+
+            show_error_snackbar(page, "Erro ao excluir o item.")
+
+    def undo_delete(e):
+        for deleted_item in last_deleted_items:
+            if storage:
+                storage.save_download(deleted_item.get("id"), deleted_item)
+        last_deleted_items.clear()
+        update_history_view()
+
+        from utils.ui_helpers import show_snackbar
+
+        show_snackbar(page, "Exclusão desfeita.")
 
     def delete_all(e):
         download_history = get_download_history()
@@ -234,32 +384,17 @@ def HistoryPage(page: ft.Page):
         show_snackbar(page, "Exclusão desfeita.")
 
     def update_history_view(e=None):
-        download_history = get_download_history()
-        query = search_query.current.value.lower() if search_query.current.value else ""
-        sort_criteria = sort_by.current.value
-
-        filtered_history = [
-            item for item in download_history if query in item.get("title", "").lower()
-        ]
-
-        if sort_criteria == "title":
-            filtered_history.sort(key=lambda x: x.get("title", "").lower())
-        elif sort_criteria == "format":
-            filtered_history.sort(key=lambda x: x.get("format", ""))
-
-        history_grid.controls = [
-            render_download_item(item) for item in filtered_history
-        ]
-
-        total_downloads = len(download_history)
-        filtered_downloads = len(filtered_history)
-        counts_text.value = (
-            f"Total de downloads: {total_downloads} | Exibindo: {filtered_downloads}"
-        )
-        counts_text.update()
-
+        reset_view()
         page.update()
 
+    def on_search_change(e):
+        # Só consulta o índice depois que o usuário para de digitar
+        if search_timer["timer"]:
+            search_timer["timer"].cancel()
+        search_timer["timer"] = threading.Timer(SEARCH_DEBOUNCE, update_history_view)
+        search_timer["timer"].daemon = True
+        search_timer["timer"].start()
+
     excluir_tudo_button = ft.ElevatedButton(
         text="Excluir Tudo",
         icon=ft.Icons.DELETE_FOREVER,
@@ -278,7 +413,7 @@ def HistoryPage(page: ft.Page):
 
     search_field = ft.TextField(
         hint_text="Pesquisar...",
-        on_change=update_history_view,
+        on_change=on_search_change,
         ref=search_query,
         border_radius=8,
         content_padding=ft.padding.all(10),
@@ -294,14 +429,16 @@ def HistoryPage(page: ft.Page):
         ref=sort_by,
     )
 
-    download_history = get_download_history()
     history_grid = ft.GridView(
-        controls=[render_download_item(item) for item in download_history],
+        controls=[],
         max_extent=240,
         child_aspect_ratio=0.75,
         spacing=10,
         expand=True,
+        on_scroll=handle_scroll,
+        on_scroll_interval=100,
     )
+    reset_view()
 
     dlg_modal = ft.AlertDialog(
         title=ft.Text(""),
@@ -5,22 +5,27 @@ import uuid
 from functools import partial
 
 import flet as ft
-import yt_dlp
 
 from utils.logging_config import setup_logging
 
 logger = setup_logging()
 
-from services.dlp_service import start_download
+from services.dlp_service import extract_playlist_entries
+from partials.download_view import DownloadView
 from services.download_manager import DownloadManager
+from services.prefetch import prefetch_link
 from utils.file_picker_utils import setup_file_picker
+from utils.metadata_cache import is_youtube_playlist_url, is_youtube_url
 from utils.ui_helpers import show_error_snackbar, show_snackbar
 from utils.validations import UIValidator
 from utils.video_info_extractor import VideoInfoExtractor
 
 
 def download_content(
-    page: ft.Page, sidebar: ft.Control, download_manager: DownloadManager
+    page: ft.Page,
+    sidebar: ft.Control,
+    download_manager: DownloadManager,
+    view: DownloadView,
 ):
 
     drop_format_rf = ft.Ref[ft.Dropdown]()
@@ -89,6 +94,11 @@ def download_content(
 
                 page.run_task(hide_bar)
 
+            elif status == "skipped":
+                barra_progress_video_rf.current.visible = False
+                status_text_rf.current.value = "⏭️ Vídeo já baixado neste formato"
+                status_text_rf.current.color = ft.Colors.ON_SURFACE_VARIANT
+
             elif status == "error":
                 barra_progress_video_rf.current.value = 1.0
                 barra_progress_video_rf.current.visible = True
@@ -102,31 +112,32 @@ def download_content(
         except Exception as e:
             logger.error(f"Erro ao atualizar progress bar: {e}")
 
+    view.add_progress_listener(update_download_progress)
+
     def check_if_playlist(url: str) -> tuple[bool, int]:
+        # Links do YouTube sem "list=" nunca são playlists: evita a extração
+        if is_youtube_url(url) and not is_youtube_playlist_url(url):
+            return False, 1
+
         try:
-            ydl_opts = {
-                "quiet": True,
-                "extract_flat": True,
-                "skip_download": True,
-                "no_warnings": True,
-            }
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-
-                if info and "entries" in info:
-                    entries = list(info.get("entries", []))
-                    entries_count = len(entries)
-
-                    if entries_count > 1:
-                        logger.info(f"Playlist detectada: {entries_count} vídeos")
-                        return True, entries_count
+            info = extract_playlist_entries(url)
+            entries_count = len(info.get("entries", []))
+
+            if entries_count > 1:
+                logger.info(f"Playlist detectada: {entries_count} vídeos")
+                return True, entries_count
 
         except Exception as e:
             logger.error(f"Erro ao verificar playlist: {e}")
 
         return False, 1
 
+    # Link da extração mais recente; uma anterior que termine depois não
+    # mexe no status dela
+    thumbnail_request = {"url": None}
+
     async def update_thumbnail_animated(video_url: str):
+        thumbnail_request["url"] = video_url
         try:
             status_text_rf.current.value = "Extraindo informações..."
             status_text_rf.current.color = ft.Colors.PRIMARY
@@ -135,7 +146,35 @@ def download_content(
             status_text_rf.current.update()
             barra_progress_video_rf.current.update()
 
-            thumb_url = VideoInfoExtractor.extract_thumbnail(video_url)
+            # O info completo (com formatos) para o download segue em
+            # segundo plano; a prévia só precisa de título e thumbnail, que
+            # o cache em disco responde na hora para links já vistos. Sem
+            # cache, as duas aguardam a mesma extração.
+            prefetch_link(video_url)
+            try:
+                info_dict = await asyncio.to_thread(
+                    VideoInfoExtractor.extract_info_dict, video_url
+                )
+            except Exception as e:
+                raise VideoInfoExtractor.describe_error(e)
+
+            # O link mudou enquanto a extração rodava: sem outra extração
+            # em andamento, o status volta ao estado inicial
+            if (input_link_rf.current.value or "").strip() != video_url:
+                if thumbnail_request["url"] == video_url:
+                    thumbnail_request["url"] = None
+                    status_text_rf.current.value = "Cole um link do YouTube"
+                    status_text_rf.current.color = ft.Colors.ON_SURFACE_VARIANT
+                    status_text_rf.current.update()
+
+                    barra_progress_video_rf.current.value = 1.0
+                    barra_progress_video_rf.current.visible = False
+                    barra_progress_video_rf.current.update()
+                return
+
+            thumb_url = info_dict.get("thumbnail")
+            if not thumb_url:
+                raise ValueError("Thumbnail não disponível para este vídeo")
 
             thumbnail_container_rf.current.scale = 0.95
             thumbnail_container_rf.current.opacity = 0.3
@@ -239,10 +278,7 @@ def download_content(
             link=link,
             formato=formato,
             diretorio=diretorio,
-            sidebar=sidebar,
-            page=page,
             is_playlist=is_playlist,
-            progress_callback=update_download_progress,
         )
 
     def handle_playlist_response(download_playlist: bool):
@@ -380,6 +416,10 @@ def download_content(
                 logger.info("Conteúdo do clipboard já foi processado anteriormente.")
                 return
 
+            # Pré-carrega antes mesmo de o usuário confirmar o link: quando
+            # ele clicar em download a extração já terminou
+            prefetch_link(clipboard_content.strip())
+
             if current_input_value:
                 if clipboard_content != current_input_value:
                     dialog_open["value"] = True
@@ -573,6 +613,8 @@ def download_content(
 
     def on_layout(e):
         renderizar_lista_downloads_salvos(page, sidebar)
+        sidebar.update_bandwidth_state(download_manager.bandwidth.state())
+        download_manager.resume_pending_jobs()
         start_clipboard_task()
 
     def start_clipboard_task():
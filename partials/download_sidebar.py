@@ -1,10 +1,21 @@
+from contextlib import contextmanager
+
 import flet as ft
 
 from utils.logging_config import setup_logging
+from utils.thumbnail_cache import thumbnail_cache
 
 logger = setup_logging()
 
 
+def format_eta(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
 class SidebarList(ft.Container):
     def __init__(self, page: ft.Page):
         self.page = page
@@ -28,6 +39,23 @@ class SidebarList(ft.Container):
                             ),
                         ],
                     ),
+                    ft.Row(
+                        alignment=ft.MainAxisAlignment.CENTER,
+                        controls=[
+                            ft.Text(
+                                value="🚦 Banda: sem limite",
+                                size=13,
+                                color=ft.Colors.BLUE_GREY_500,
+                                key="bandwidth_state",
+                            ),
+                            ft.Text(
+                                value="",
+                                size=13,
+                                color=ft.Colors.BLUE_GREY_500,
+                                key="throughput_state",
+                            ),
+                        ],
+                    ),
                     ft.Divider(thickness=2, color=ft.Colors.BLUE_GREY_300),
                     ft.Container(
                         height=500,
@@ -48,11 +76,46 @@ class SidebarList(ft.Container):
 
         self.items = {}
         self.title_control = self.content.controls[0].controls[0]
-        self.downloads_column = self.content.controls[2].content
+        self.bandwidth_control = self.content.controls[1].controls[0]
+        self.throughput_control = self.content.controls[1].controls[1]
+        self.downloads_column = self.content.controls[3].content
 
         self.mounted = True
+
+        # Em modo agrupado as alterações ficam só nos controles; quem abriu
+        # o batch envia tudo de uma vez com page.update()
+        self.deferred = False
+        self._counts_dirty = False
+
         logger.info("SidebarList inicializado e montado.")
 
+    @contextmanager
+    def batch(self):
+        self.deferred = True
+        try:
+            yield self
+        finally:
+            if self._counts_dirty:
+                self._counts_dirty = False
+                self._compute_download_counts()
+            self.deferred = False
+
+    def _refresh(self, control):
+        if self.deferred:
+            return
+        control.update()
+
+    def _set_thumbnail(self, image, path):
+        # Chamado pelo cache de thumbnails, fora do loop da UI
+        image.src = path
+        if not self.mounted:
+            return
+        try:
+            image.update()
+        except Exception:
+            # Ainda não enviado à página: o próximo update leva o novo src
+            pass
+
     def on_unmount(self, e=None):
         self.mounted = False
         logger.info("SidebarList desmontado.")
@@ -77,21 +140,36 @@ class SidebarList(ft.Container):
             icon_color=ft.Colors.RED_400,
             icon_size=20,
             tooltip="Cancelar download",
-            visible=False,
             on_click=lambda e, did=id, dm=download_manager: self.cancel_download(
                 did, dm
             ),
             animate_opacity=300,
         )
 
+        pause_btn = ft.IconButton(
+            icon=ft.Icons.PAUSE,
+            icon_color=ft.Colors.BLUE_GREY_400,
+            icon_size=20,
+            tooltip="Pausar download",
+            visible=False,
+            on_click=lambda e, did=id, dm=download_manager: self.toggle_pause(did, dm),
+            animate_opacity=300,
+        )
+
+        thumbnail_image = ft.Image(
+            width=50,
+            height=50,
+            fit=ft.ImageFit.COVER,
+            border_radius=ft.border_radius.all(5),
+        )
+        thumbnail_image.src = thumbnail_cache.src(
+            thumbnail_url,
+            "sidebar",
+            on_ready=lambda path: self._set_thumbnail(thumbnail_image, path),
+        )
+
         thumbnail_container = ft.Container(
-            content=ft.Image(
-                src=thumbnail_url,
-                width=50,
-                height=50,
-                fit=ft.ImageFit.COVER,
-                border_radius=ft.border_radius.all(5),
-            ),
+            content=thumbnail_image,
             width=50,
             height=50,
             border_radius=ft.border_radius.all(5),
@@ -115,7 +193,7 @@ class SidebarList(ft.Container):
                 color=ft.Colors.LIGHT_BLUE_600,
             ),
             trailing=ft.Row(
-                [status_text, cancel_btn],
+                [status_text, pause_btn, cancel_btn],
                 spacing=5,
                 tight=True,
             ),
@@ -125,6 +203,7 @@ class SidebarList(ft.Container):
                 "file_path": file_path,
                 "download_manager": download_manager,
                 "cancel_btn": cancel_btn,
+                "pause_btn": pause_btn,
                 "status_text": status_text,
                 "thumbnail_container": thumbnail_container,
             },
@@ -137,7 +216,7 @@ class SidebarList(ft.Container):
         self.downloads_column.controls.append(item)
 
         try:
-            self.downloads_column.update()
+            self._refresh(self.downloads_column)
         except Exception as e:
             logger.error(f"Erro ao atualizar UI após adicionar item: {e}")
 
@@ -154,6 +233,17 @@ class SidebarList(ft.Container):
         else:
             logger.warning("DownloadManager não disponível")
 
+    def toggle_pause(self, download_id, download_manager):
+        if not download_manager:
+            logger.warning("DownloadManager não disponível")
+            return
+
+        item = self.items.get(download_id)
+        if item and item.data.get("status") == "paused":
+            download_manager.resume_download(download_id)
+        else:
+            download_manager.pause_download(download_id)
+
     def update_download_item(
         self,
         id,
@@ -163,6 +253,9 @@ class SidebarList(ft.Container):
         total_bytes=None,
         speed=None,
         eta=None,
+        fragment_index=None,
+        fragment_count=None,
+        elapsed=None,
     ):
         if not self.mounted:
             logger.warning(f"Sidebar desmontada, ignorando atualização: {id}")
@@ -176,52 +269,75 @@ class SidebarList(ft.Container):
         try:
             status_text = item.data.get("status_text")
             cancel_btn = item.data.get("cancel_btn")
+            pause_btn = item.data.get("pause_btn")
 
-            if not status_text or not cancel_btn:
+            if not status_text or not cancel_btn or not pause_btn:
                 trailing_row = item.trailing
                 status_text = trailing_row.controls[0]
-                cancel_btn = trailing_row.controls[1]
+                pause_btn = trailing_row.controls[1]
+                cancel_btn = trailing_row.controls[-1]
+
+            # Pausar só faz sentido enquanto baixa; pausado vira "retomar"
+            pause_btn.visible = status in ("downloading", "paused")
+            pause_btn.icon = (
+                ft.Icons.PLAY_ARROW if status == "paused" else ft.Icons.PAUSE
+            )
+            pause_btn.tooltip = (
+                "Retomar download" if status == "paused" else "Pausar download"
+            )
 
             if status == "downloading":
                 progress_percent = min(progress * 100, 100.0)
 
+                parts = [f"📥 {progress_percent:.1f}%"]
                 if downloaded_bytes and total_bytes:
                     total_mb = total_bytes / (1024 * 1024)
-                    status_text.value = (
-                        f"📥 {progress_percent:.1f}% de {total_mb:.2f}MiB"
-                    )
-                elif speed:
-                    speed_mb = speed / (1024 * 1024)
-                    if eta:
-                        status_text.value = f"📥 {progress_percent:.1f}% • {speed_mb:.2f}MiB/s • ETA {eta}"
-                    else:
-                        status_text.value = (
-                            f"📥 {progress_percent:.1f}% • {speed_mb:.2f}MiB/s"
-                        )
-                else:
-                    status_text.value = f"📥 {progress_percent:.1f}%"
+                    parts[0] += f" de {total_mb:.2f}MiB"
+                elif fragment_index and fragment_count:
+                    parts.append(f"frag. {fragment_index}/{fragment_count}")
+                if speed:
+                    parts.append(f"{speed / (1024 * 1024):.2f}MiB/s")
+                if eta is not None and speed:
+                    parts.append(f"ETA {format_eta(eta)}")
+
+                status_text.value = " • ".join(parts)
 
                 status_text.color = ft.Colors.BLUE_700
                 cancel_btn.visible = True
                 item.data["status"] = "downloading"
+                item.data["progress"] = progress
+
+            elif status == "paused":
+                progress_percent = min(item.data.get("progress", 0) * 100, 100.0)
+                status_text.value = f"⏸️ Pausado {progress_percent:.1f}%"
+                status_text.color = ft.Colors.BLUE_GREY_500
+                cancel_btn.visible = True
+                item.data["status"] = "paused"
 
             elif status == "converting":
-                progress_percent = min(progress * 100, 100.0)
-                status_text.value = f"🔄 Convertendo... {progress_percent:.0f}%"
+                if elapsed is not None:
+                    status_text.value = f"🔄 Convertendo... {format_eta(elapsed)}"
+                else:
+                    progress_percent = min(progress * 100, 100.0)
+                    status_text.value = f"🔄 Convertendo... {progress_percent:.0f}%"
                 status_text.color = ft.Colors.ORANGE_700
-                cancel_btn.visible = False
+                cancel_btn.visible = True
                 item.data["status"] = "converting"
 
             elif status == "merging":
-                status_text.value = "🔄 Mesclando..."
+                status_text.value = (
+                    f"🔄 Mesclando... {format_eta(elapsed)}"
+                    if elapsed is not None
+                    else "🔄 Mesclando..."
+                )
                 status_text.color = ft.Colors.ORANGE_700
-                cancel_btn.visible = False
+                cancel_btn.visible = True
                 item.data["status"] = "merging"
 
             elif status == "pending":
                 status_text.value = "📥 Aguardando..."
                 status_text.color = ft.Colors.BLUE_500
-                cancel_btn.visible = False
+                cancel_btn.visible = True
                 item.data["status"] = "pending"
 
             elif status == "finished":
@@ -233,7 +349,13 @@ class SidebarList(ft.Container):
                 thumbnail_container = item.data.get("thumbnail_container")
                 if thumbnail_container:
                     thumbnail_container.opacity = 0.8
-                    thumbnail_container.update()
+                    self._refresh(thumbnail_container)
+
+            elif status == "skipped":
+                status_text.value = "⏭️ Já baixado"
+                status_text.color = ft.Colors.BLUE_GREY_500
+                cancel_btn.visible = False
+                item.data["status"] = "skipped"
 
             elif status == "error":
                 status_text.value = "❌ Erro"
@@ -249,17 +371,72 @@ class SidebarList(ft.Container):
                 item.opacity = 0.5
 
             try:
-                item.update()
+                self._refresh(item)
             except Exception as update_error:
                 logger.error(f"Erro ao atualizar item: {update_error}")
 
-            if status in ["finished", "error", "cancelled"]:
+            if status in ["finished", "skipped", "error", "cancelled"]:
                 self.update_download_counts()
 
         except Exception as e:
             logger.error(f"Erro ao atualizar item {id}: {e}")
 
+    def update_bandwidth_state(self, state):
+        if not self.mounted or not state:
+            return
+
+        mode = state.get("mode")
+        if mode == "limited":
+            self.bandwidth_control.value = (
+                f"🚦 Banda: {state.get('per_job_kbps', 0)} KB/s por download"
+                f" ({state.get('active', 0)} ativos)"
+            )
+            self.bandwidth_control.color = ft.Colors.ORANGE_700
+        elif mode == "schedule":
+            self.bandwidth_control.value = (
+                "🌙 Banda: velocidade máxima (horário agendado)"
+            )
+            self.bandwidth_control.color = ft.Colors.GREEN_700
+        else:
+            self.bandwidth_control.value = "🚦 Banda: sem limite"
+            self.bandwidth_control.color = ft.Colors.BLUE_GREY_500
+
+        try:
+            self._refresh(self.bandwidth_control)
+        except Exception as e:
+            logger.error(f"Erro ao atualizar estado da banda: {e}")
+
+    def update_throughput(self, total_speed, active):
+        if not self.mounted:
+            return
+
+        value = (
+            f"⚡ {total_speed / (1024 * 1024):.2f}MiB/s em {active} downloads"
+            if active and total_speed
+            else ""
+        )
+        if value == self.throughput_control.value:
+            return
+
+        self.throughput_control.value = value
+        try:
+            self._refresh(self.throughput_control)
+        except Exception as e:
+            logger.error(f"Erro ao atualizar vazão total: {e}")
+
     def update_download_counts(self):
+        if self.deferred:
+            self._counts_dirty = True
+            return
+
+        self._compute_download_counts()
+
+        try:
+            self.title_control.update()
+        except Exception as e:
+            logger.error(f"Erro ao atualizar título: {e}")
+
+    def _compute_download_counts(self):
         try:
             total = len(self.items)
             errors = sum(
@@ -290,11 +467,6 @@ class SidebarList(ft.Container):
                     logger.error(f"Erro ao obter tema: {e}")
                     self.title_control.color = ft.Colors.BLUE_700
 
-            try:
-                self.title_control.update()
-            except Exception as e:
-                logger.error(f"Erro ao atualizar título: {e}")
-
         except Exception as e:
             logger.error(f"Erro ao atualizar contadores: {e}")
 
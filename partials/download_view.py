@@ -0,0 +1,280 @@
+import asyncio
+import time
+
+import flet as ft
+
+from utils.logging_config import setup_logging
+
+logger = setup_logging()
+
+from services.download_manager import DownloadManager
+from utils.ui_helpers import show_snackbar
+
+# Limites do intervalo entre flushes de UI: ~60 fps sob carga leve,
+# no máximo 4 flushes/s quando aplicar um frame fica caro
+MIN_FLUSH_INTERVAL = 1 / 60
+MAX_FLUSH_INTERVAL = 0.25
+
+
+class DownloadView:
+    """
+    Assinante do barramento do DownloadManager na página de downloads.
+
+    Agrupa os eventos em frames, aplica na sidebar e repassa o progresso
+    geral aos listeners (barra de progresso principal etc.) com um único
+    page.update() por frame.
+    """
+
+    def __init__(self, page: ft.Page, download_manager: DownloadManager, sidebar):
+        self.page = page
+        self.download_manager = download_manager
+        self.sidebar = sidebar
+        self.progress_listeners = []
+        self.channel = None
+
+        self._in_frame = False
+        self._pending_progress = None
+
+    def add_progress_listener(self, listener):
+        self.progress_listeners.append(listener)
+
+    def remove_progress_listener(self, listener):
+        if listener in self.progress_listeners:
+            self.progress_listeners.remove(listener)
+
+    def attach(self):
+        if self.channel is not None:
+            return
+
+        self.channel = self.download_manager.events.subscribe()
+        self.page.run_task(self._run)
+
+    def detach(self):
+        channel, self.channel = self.channel, None
+        if channel is not None:
+            self.download_manager.events.unsubscribe(channel)
+
+    async def _run(self):
+        logger.info("Processador de progresso assíncrono iniciado")
+
+        channel = self.channel
+        channel.bind()
+        interval = MIN_FLUSH_INTERVAL
+        last_flush = 0.0
+
+        while True:
+            try:
+                # Dorme até uma thread de download publicar algo
+                if not await channel.wait():
+                    break
+
+                # Eventos que chegam antes do próximo frame entram no mesmo flush
+                delay = last_flush + interval - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                updates_batch = channel.drain()
+
+                if not self.sidebar.mounted:
+                    self.detach()
+                    break
+
+                if not updates_batch:
+                    continue
+
+                started = time.monotonic()
+                await self._flush_updates(self._coalesce_updates(updates_batch))
+                last_flush = time.monotonic()
+
+                # Frames caros espaçam os próximos flushes, deixando o
+                # websocket e o loop livres para a interação do usuário
+                interval = min(
+                    MAX_FLUSH_INTERVAL,
+                    max(MIN_FLUSH_INTERVAL, (last_flush - started) * 2),
+                )
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Erro no processador de progresso: {e}")
+                await asyncio.sleep(1)
+
+        logger.info("Processador de progresso finalizado")
+
+    @staticmethod
+    def _coalesce_updates(updates):
+        """
+        Mantém só o último "downloading" de cada vídeo entre dois eventos
+        de outro tipo, preservando a ordem de add_item/finished/error.
+        """
+        coalesced = []
+        progress_index = {}
+
+        for update in updates:
+            video_id = update.get("video_id")
+
+            if update.get("status") == "downloading":
+                index = progress_index.get(video_id)
+                if index is not None:
+                    coalesced[index] = update
+                    continue
+                progress_index[video_id] = len(coalesced)
+            else:
+                progress_index.pop(video_id, None)
+
+            coalesced.append(update)
+
+        return coalesced
+
+    async def _flush_updates(self, updates):
+        """Aplica um frame de atualizações e envia tudo em um único page.update()."""
+        self._in_frame = True
+        self._pending_progress = None
+
+        try:
+            with self.sidebar.batch():
+                for update in updates:
+                    self._apply_update(update)
+                self.sidebar.update_throughput(
+                    self.download_manager.throughput.total(),
+                    self.download_manager.throughput.active(),
+                )
+        finally:
+            self._in_frame = False
+
+        if self._pending_progress:
+            self._call_progress_listeners(*self._pending_progress)
+            self._pending_progress = None
+
+        try:
+            self.page.update()
+        except Exception as e:
+            logger.error(f"Erro ao atualizar página: {e}")
+
+    def _notify_progress(self, progress, status):
+        # Dentro de um frame só o último estado chega à barra de progresso
+        if self._in_frame:
+            self._pending_progress = (progress, status)
+        else:
+            self._call_progress_listeners(progress, status)
+
+    def _call_progress_listeners(self, progress, status):
+        for listener in list(self.progress_listeners):
+            try:
+                listener(progress, status)
+            except Exception as e:
+                logger.error(f"Erro no callback de progresso: {e}")
+
+    def _apply_update(self, update):
+        try:
+            video_id = update.get("video_id")
+            download_id = update.get("download_id")
+            status = update.get("status")
+            progress = update.get("progress", 0)
+            data = update.get("data") or {}
+
+            if status == "bandwidth":
+                self.sidebar.update_bandwidth_state(data)
+                return
+
+            if status == "notice":
+                show_snackbar(self.page, data.get("message", ""))
+                return
+
+            if status == "playlist_finished":
+                self._notify_progress(progress, data.get("status", "finished"))
+                return
+
+            if not video_id:
+                return
+
+            # Playlists: a barra principal mostra o progresso proporcional
+            if "playlist_progress" in update:
+                if status != "add_item":
+                    self._notify_progress(update["playlist_progress"], "downloading")
+
+            elif status == "downloading":
+                self._notify_progress(progress, "downloading")
+
+            elif status in ("converting", "merging"):
+                self._notify_progress(progress, "converting")
+
+            elif status == "finished":
+                self._notify_progress(1.0, "finished")
+
+            elif status == "skipped":
+                self._notify_progress(1.0, "skipped")
+
+            elif status == "error":
+                self._notify_progress(0, "error")
+
+            # ATUALIZA SIDEBAR
+            if status == "add_item":
+                if video_id not in self.sidebar.items:
+                    logger.info(
+                        f"Adicionando item à sidebar: {data.get('title', 'N/A')[:30]}..."
+                    )
+                    self.sidebar.add_download_item(
+                        id=video_id,
+                        title=data.get("title", "Título Indisponível"),
+                        subtitle=data.get("format", "Formato"),
+                        thumbnail_url=data.get("thumbnail", "/images/thumb_broken.jpg"),
+                        file_path=data.get("file_path", ""),
+                        download_manager=self.download_manager,
+                    )
+
+            elif status == "downloading":
+                event = update.get("event")
+                if event:
+                    self.sidebar.update_download_item(
+                        video_id,
+                        progress,
+                        "downloading",
+                        downloaded_bytes=event.downloaded_bytes,
+                        total_bytes=event.total_bytes,
+                        speed=event.speed,
+                        eta=event.eta,
+                        fragment_index=event.fragment_index,
+                        fragment_count=event.fragment_count,
+                    )
+                else:
+                    self.sidebar.update_download_item(video_id, progress, "downloading")
+
+            elif status in ("converting", "merging"):
+                event = update.get("event")
+                self.sidebar.update_download_item(
+                    video_id,
+                    progress,
+                    status,
+                    elapsed=event.elapsed if event else None,
+                )
+
+            elif status == "finished":
+                self.sidebar.update_download_item(video_id, 1.0, "finished")
+                logger.info(f"Download concluído: {video_id}")
+
+            elif status == "skipped":
+                self.sidebar.update_download_item(video_id, 1.0, "skipped")
+
+            elif status == "error":
+                self.sidebar.update_download_item(video_id, 0, "error")
+                logger.error(f"Erro no download: {video_id}")
+
+            elif status in ("paused", "pending"):
+                self.sidebar.update_download_item(video_id, progress, status)
+
+            elif status == "cancelled" and video_id in self.sidebar.items:
+                self.sidebar.update_download_item(video_id, 0, "cancelled")
+                self.page.run_task(self._remove_cancelled_item, video_id)
+
+        except Exception as e:
+            logger.error(f"Erro ao aplicar atualização: {e}")
+
+    async def _remove_cancelled_item(self, video_id):
+        await asyncio.sleep(2)
+        if video_id in self.sidebar.items:
+            self.sidebar.downloads_column.controls.remove(self.sidebar.items[video_id])
+            del self.sidebar.items[video_id]
+            self.sidebar.update_download_counts()
+            if self.sidebar.mounted:
+                self.sidebar.update()
@@ -0,0 +1,214 @@
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from utils.logging_config import setup_logging
+
+logger = setup_logging()
+
+
+BANDWIDTH_SETTINGS = {
+    "bandwidth_limit_kbps": 0,
+    "bandwidth_job_cap_kbps": 0,
+    "bandwidth_schedule_enabled": False,
+    "bandwidth_schedule_start": 22,
+    "bandwidth_schedule_end": 7,
+    "fragment_threads": 0,
+}
+
+# Total de conexões de fragmentos (DASH/HLS) repartido entre os slots de
+# download no modo automático, e a banda que cada conexão costuma render
+FRAGMENT_THREAD_BUDGET = 12
+MAX_FRAGMENT_THREADS = 16
+KBPS_PER_FRAGMENT_THREAD = 512
+
+# Limite de cada conexão de fragmento em ydl.params. O yt-dlp aplica o
+# ratelimit por conexão, então com N conexões o download chegaria a N
+# vezes a fatia dele (ver dlp_service, que relê este valor a cada bloco)
+FRAGMENT_RATELIMIT = "fragment_ratelimit"
+
+
+class BandwidthLimiter:
+    """
+    Orçamento global de banda dividido entre os downloads ativos.
+
+    Cada YoutubeDL em execução é registrado aqui e recebe
+    params["ratelimit"] = min(orçamento / downloads ativos, teto por job);
+    em formatos fragmentados essa fatia é dividida entre as conexões
+    paralelas do download. O yt-dlp lê os dois valores a cada bloco, então
+    mudanças valem sem reiniciar o download. No horário agendado o limite
+    global é suspenso.
+    """
+
+    RECHECK_INTERVAL = 30
+
+    def __init__(self, on_change: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.limit_kbps = 0
+        self.job_cap_kbps = 0
+        self.schedule_enabled = False
+        self.schedule_start = 22
+        self.schedule_end = 7
+        self.fragment_threads_setting = 0
+        self.on_change = on_change
+
+        self._active: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self._last_state: Optional[Dict[str, Any]] = None
+
+    def load_settings(self, storage) -> None:
+        values = {
+            key: storage.get_setting(key, default)
+            for key, default in BANDWIDTH_SETTINGS.items()
+        }
+        self.configure(
+            limit_kbps=values["bandwidth_limit_kbps"],
+            job_cap_kbps=values["bandwidth_job_cap_kbps"],
+            schedule_enabled=values["bandwidth_schedule_enabled"],
+            schedule_start=values["bandwidth_schedule_start"],
+            schedule_end=values["bandwidth_schedule_end"],
+            fragment_threads=values["fragment_threads"],
+        )
+
+    def configure(
+        self,
+        limit_kbps: Optional[int] = None,
+        job_cap_kbps: Optional[int] = None,
+        schedule_enabled: Optional[bool] = None,
+        schedule_start: Optional[int] = None,
+        schedule_end: Optional[int] = None,
+        fragment_threads: Optional[int] = None,
+    ) -> None:
+        with self._lock:
+            if limit_kbps is not None:
+                self.limit_kbps = max(int(limit_kbps), 0)
+            if job_cap_kbps is not None:
+                self.job_cap_kbps = max(int(job_cap_kbps), 0)
+            if schedule_enabled is not None:
+                self.schedule_enabled = bool(schedule_enabled)
+            if schedule_start is not None:
+                self.schedule_start = int(schedule_start) % 24
+            if schedule_end is not None:
+                self.schedule_end = int(schedule_end) % 24
+            if fragment_threads is not None:
+                self.fragment_threads_setting = min(
+                    max(int(fragment_threads), 0), MAX_FRAGMENT_THREADS
+                )
+
+        logger.info(
+            f"Limite de banda: total={self.limit_kbps} KB/s, "
+            f"por download={self.job_cap_kbps} KB/s, "
+            f"agenda={'ativa' if self.schedule_enabled else 'inativa'} "
+            f"({self.schedule_start}h-{self.schedule_end}h)"
+        )
+        self.rebalance()
+
+    def in_schedule_window(self, now: Optional[datetime] = None) -> bool:
+        """Horário de velocidade máxima; a janela pode cruzar a meia-noite."""
+        if not self.schedule_enabled or self.schedule_start == self.schedule_end:
+            return False
+
+        hour = (now or datetime.now()).hour
+        if self.schedule_start < self.schedule_end:
+            return self.schedule_start <= hour < self.schedule_end
+        return hour >= self.schedule_start or hour < self.schedule_end
+
+    def per_job_rate(self, active: Optional[int] = None) -> Optional[int]:
+        """Limite em bytes/s para cada download ativo, ou None sem limite."""
+        active = len(self._active) if active is None else active
+        rates = []
+
+        if self.limit_kbps and not self.in_schedule_window():
+            rates.append(self.limit_kbps * 1024 // max(active, 1))
+        if self.job_cap_kbps:
+            rates.append(self.job_cap_kbps * 1024)
+
+        return min(rates) if rates else None
+
+    @staticmethod
+    def per_connection_rate(rate: Optional[int], threads: int) -> Optional[int]:
+        """Fatia de um download repartida entre as conexões de fragmentos."""
+        if not rate:
+            return None
+        return max(rate // max(int(threads), 1), 1)
+
+    def fragment_threads(self, max_active: int) -> int:
+        """
+        Conexões paralelas por download para formatos fragmentados.
+
+        No modo automático (0) o orçamento de conexões é dividido entre os
+        slots de download e, com limite de banda, reduzido ao que a fatia
+        de cada download consegue aproveitar.
+        """
+        if self.fragment_threads_setting:
+            return self.fragment_threads_setting
+
+        threads = max(FRAGMENT_THREAD_BUDGET // max(max_active, 1), 1)
+
+        rate = self.per_job_rate(max_active)
+        if rate:
+            useful = -(-rate // (KBPS_PER_FRAGMENT_THREAD * 1024))
+            threads = min(threads, max(useful, 1))
+
+        return threads
+
+    def register(self, job_id: str, ydl, fragment_threads: int = 1) -> None:
+        with self._lock:
+            self._active[job_id] = (ydl, fragment_threads)
+        self.rebalance()
+
+    def unregister(self, job_id: str) -> None:
+        with self._lock:
+            removed = self._active.pop(job_id, None)
+        if removed is not None:
+            self.rebalance()
+
+    def tick(self) -> None:
+        """Chamado pelos progress hooks: reavalia a agenda periodicamente."""
+        now = time.monotonic()
+        if now - self._last_check >= self.RECHECK_INTERVAL:
+            self.rebalance()
+
+    def rebalance(self) -> None:
+        with self._lock:
+            self._last_check = time.monotonic()
+            rate = self.per_job_rate()
+
+            for ydl, threads in self._active.values():
+                ydl.params["ratelimit"] = rate
+                ydl.params[FRAGMENT_RATELIMIT] = self.per_connection_rate(rate, threads)
+
+            state = self._state_locked(rate)
+
+        if state != self._last_state:
+            self._last_state = state
+            if rate:
+                logger.info(
+                    f"Banda redistribuída: {rate // 1024} KB/s para "
+                    f"{state['active']} downloads"
+                )
+            if self.on_change:
+                try:
+                    self.on_change(state)
+                except Exception as e:
+                    logger.error(f"Erro ao notificar limite de banda: {e}")
+
+    def _state_locked(self, rate: Optional[int]) -> Dict[str, Any]:
+        if self.limit_kbps and self.in_schedule_window():
+            mode = "schedule"
+        elif rate:
+            mode = "limited"
+        else:
+            mode = "unlimited"
+
+        return {
+            "mode": mode,
+            "active": len(self._active),
+            "limit_kbps": self.limit_kbps,
+            "per_job_kbps": rate // 1024 if rate else 0,
+        }
+
+    def state(self) -> Dict[str, Any]:
+        with self._lock:
+            return self._state_locked(self.per_job_rate())
@@ -0,0 +1,156 @@
+import glob
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterable, List
+
+from yt_dlp.utils import DownloadCancelled as YtDlpDownloadCancelled
+
+from utils.logging_config import setup_logging
+
+logger = setup_logging()
+
+
+class DownloadCancelled(YtDlpDownloadCancelled):
+    """
+    Download interrompido pelo usuário. Deriva da exceção do yt-dlp para
+    que ela atravesse o ignoreerrors em vez de virar um erro comum.
+    """
+
+    msg = "Download cancelado pelo usuário"
+
+
+class DownloadPaused(DownloadCancelled):
+    """Download interrompido para ser retomado depois; o .part é mantido."""
+
+    msg = "Download pausado pelo usuário"
+
+
+class CancellationToken:
+    """
+    Sinal de cancelamento de um job, compartilhado entre quem cancela (UI)
+    e quem executa (thread ou processo de download).
+
+    Callbacks registrados em on_cancel rodam uma única vez, na thread que
+    cancelar: matar o FFmpeg, sinalizar o processo filho etc. Uma pausa
+    interrompe o worker do mesmo jeito, só muda a exceção levantada.
+    """
+
+    def __init__(self):
+        self.paused = False
+        self._event = threading.Event()
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, pause: bool = False) -> bool:
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.paused = pause
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Erro ao interromper download cancelado: {e}")
+        return True
+
+    def on_cancel(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise DownloadPaused() if self.paused else DownloadCancelled()
+
+
+# Subprocessos (FFmpeg) abertos pelo yt-dlp ficam ligados ao token da
+# thread de download que os criou
+_local = threading.local()
+
+
+def _patch_popen() -> bool:
+    # Popen é interno do yt-dlp (versões testadas no pyproject.toml); sem
+    # ele o cancelamento ainda interrompe o download pelos hooks, mas não
+    # mata um FFmpeg já em execução
+    try:
+        from yt_dlp.utils import Popen
+    except ImportError:
+        Popen = None
+
+    if Popen is None or not hasattr(Popen, "kill"):
+        logger.warning(
+            "yt-dlp sem utils.Popen: cancelar não interrompe o FFmpeg em andamento"
+        )
+        return False
+
+    popen_init = Popen.__init__
+
+    def tracking_popen_init(self, *args, **kwargs):
+        popen_init(self, *args, **kwargs)
+        token = getattr(_local, "token", None)
+        if token is not None:
+            token.on_cancel(self.kill)
+
+    Popen.__init__ = tracking_popen_init
+    return True
+
+
+_patch_popen()
+
+
+@contextmanager
+def bind_token(token: CancellationToken):
+    """Associa o token à thread atual enquanto o yt-dlp roda nela."""
+    previous = getattr(_local, "token", None)
+    _local.token = token
+    try:
+        yield token
+    finally:
+        _local.token = previous
+
+
+# Arquivos de formato intermediários (ex.: "Título.f137.mp4") antes do merge
+INTERMEDIATE_FORMAT = re.compile(r"\.f\d+(-\w+)?\.\w+$")
+
+
+def partial_files(path: str) -> List[str]:
+    """Arquivos temporários que o yt-dlp pode ter deixado para um download."""
+    base, ext = os.path.splitext(path)
+    candidates = {
+        path + ".part",
+        path + ".ytdl",
+        f"{base}.temp{ext}",
+    }
+    if path.endswith(".part") or INTERMEDIATE_FORMAT.search(path):
+        candidates.add(path)
+
+    candidates.update(glob.glob(glob.escape(path) + "-Frag*"))
+    candidates.update(glob.glob(glob.escape(path) + ".part-Frag*"))
+    return sorted(candidates)
+
+
+def cleanup_partial_files(paths: Iterable[str]) -> int:
+    removed = 0
+    for path in {p for p in paths if p}:
+        for candidate in partial_files(path):
+            try:
+                if os.path.isfile(candidate):
+                    os.remove(candidate)
+                    removed += 1
+            except OSError as e:
+                logger.warning(f"Não foi possível remover {candidate}: {e}")
+
+    if removed:
+        logger.info(f"{removed} arquivos parciais removidos")
+    return removed
@@ -0,0 +1,188 @@
+import threading
+import time
+from typing import Dict, Optional
+
+from utils.logging_config import setup_logging
+
+logger = setup_logging()
+
+
+CONCURRENCY_SETTINGS = {
+    "adaptive_concurrency": True,
+    "concurrency_min": 1,
+    "concurrency_max": 6,
+}
+
+THROTTLE_MARKERS = ("429", "too many requests", "rate limit", "ratelimit")
+
+
+def is_throttle_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return any(marker in message for marker in THROTTLE_MARKERS)
+
+
+class AdaptiveConcurrency:
+    """
+    Ajusta o número de downloads simultâneos do scheduler (AIMD).
+
+    A cada janela de medição compara a vazão agregada (soma das
+    velocidades reportadas pelos progress hooks) com a janela anterior:
+
+    - erros 429 ou taxa de falhas alta: corta os slots pela metade;
+    - todos os slots ocupados, fila com pendentes e vazão crescendo:
+      soma um slot;
+    - um slot extra que não trouxe ganho de vazão é devolvido.
+
+    O valor fica sempre entre os limites configurados pelo usuário.
+    """
+
+    WINDOW = 10.0
+    MIN_SAMPLES = 3
+    ERROR_RATE_LIMIT = 0.3
+    GAIN_THRESHOLD = 1.10
+
+    def __init__(self, scheduler, min_active: int = 1, max_active: int = 6):
+        self.scheduler = scheduler
+        self.enabled = True
+        self.min_active = min_active
+        self.max_active = max_active
+
+        self._speeds: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._window_started = time.monotonic()
+        self._samples = 0
+        self._finished = 0
+        self._failed = 0
+        self._throttled = False
+        self._last_throughput: Optional[float] = None
+        self._probing = False
+
+    def load_settings(self, storage) -> None:
+        values = {
+            key: storage.get_setting(key, default)
+            for key, default in CONCURRENCY_SETTINGS.items()
+        }
+        self.configure(
+            enabled=values["adaptive_concurrency"],
+            min_active=values["concurrency_min"],
+            max_active=values["concurrency_max"],
+        )
+
+    def configure(
+        self,
+        enabled: Optional[bool] = None,
+        min_active: Optional[int] = None,
+        max_active: Optional[int] = None,
+    ) -> None:
+        with self._lock:
+            if enabled is not None:
+                self.enabled = bool(enabled)
+            if min_active is not None:
+                self.min_active = max(int(min_active), 1)
+            if max_active is not None:
+                self.max_active = max(int(max_active), self.min_active)
+
+            current = self.scheduler.max_active
+            bounded = min(max(current, self.min_active), self.max_active)
+
+        if bounded != current:
+            self.scheduler.set_max_active(bounded)
+
+        logger.info(
+            f"Concorrência adaptativa {'ativa' if self.enabled else 'inativa'}: "
+            f"{self.min_active}-{self.max_active} downloads "
+            f"(atual {self.scheduler.max_active})"
+        )
+
+    def record_speed(self, job_id: str, speed: Optional[float]) -> None:
+        if speed is None:
+            return
+
+        with self._lock:
+            self._speeds[job_id] = float(speed)
+            self._samples += 1
+
+        self._maybe_evaluate()
+
+    def record_result(
+        self, job_id: str, success: bool, throttled: bool = False
+    ) -> None:
+        with self._lock:
+            self._speeds.pop(job_id, None)
+            if success:
+                self._finished += 1
+            else:
+                self._failed += 1
+            self._throttled = self._throttled or throttled
+
+        # Um 429 não espera o fim da janela
+        if throttled:
+            self._evaluate()
+        else:
+            self._maybe_evaluate()
+
+    def forget(self, job_id: str) -> None:
+        with self._lock:
+            self._speeds.pop(job_id, None)
+
+    def _maybe_evaluate(self) -> None:
+        if time.monotonic() - self._window_started >= self.WINDOW:
+            self._evaluate()
+
+    def _evaluate(self) -> None:
+        with self._lock:
+            throughput = sum(self._speeds.values())
+            results = self._finished + self._failed
+            error_rate = self._failed / results if results else 0.0
+            throttled = self._throttled
+            samples = self._samples
+
+            self._window_started = time.monotonic()
+            self._samples = 0
+            self._finished = 0
+            self._failed = 0
+            self._throttled = False
+
+            if not self.enabled:
+                return
+
+            current = self.scheduler.max_active
+            target = current
+            reason = None
+
+            if throttled or (results and error_rate > self.ERROR_RATE_LIMIT):
+                target = max(current // 2, self.min_active)
+                reason = "limitação do servidor" if throttled else "taxa de erros"
+                self._probing = False
+
+            elif samples >= self.MIN_SAMPLES:
+                gained = (
+                    self._last_throughput is None
+                    or throughput >= self._last_throughput * self.GAIN_THRESHOLD
+                )
+
+                if self._probing and not gained:
+                    # O slot extra não aumentou a vazão: devolve
+                    target = max(current - 1, self.min_active)
+                    reason = "sem ganho de vazão"
+                    self._probing = False
+                elif (
+                    self.scheduler.active >= current
+                    and self.scheduler.pending_count()
+                    and current < self.max_active
+                ):
+                    target = current + 1
+                    reason = "fila cheia e banda disponível"
+                    self._probing = True
+                else:
+                    self._probing = False
+
+                self._last_throughput = throughput
+
+        if target != current:
+            logger.info(
+                f"Downloads simultâneos: {current} -> {target} ({reason}, "
+                f"vazão {throughput / 1024 / 1024:.2f} MiB/s, "
+                f"erros {error_rate:.0%})"
+            )
+            self.scheduler.set_max_active(target)
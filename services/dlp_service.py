@@ -1,9 +1,74 @@
+import copy
+
 from yt_dlp import YoutubeDL
+from yt_dlp.utils import DownloadError
 
+from services.bandwidth import FRAGMENT_RATELIMIT
+from services.concurrency import is_throttle_error
+from utils.download_archive import download_archive
 from utils.logging_config import setup_logging
+from utils.metadata_cache import canonical_key, metadata_cache
 
 logger = setup_logging()
 
+# Internos do yt-dlp usados abaixo (versões testadas no pyproject.toml).
+# Se uma atualização os renomear, o recurso degrada com um aviso no log
+# em vez de quebrar os downloads.
+try:
+    from yt_dlp.downloader.fragment import HttpQuietDownloader
+except ImportError:
+    HttpQuietDownloader = None
+
+
+def _patch_fragment_slow_down() -> bool:
+    if HttpQuietDownloader is None or not callable(
+        getattr(HttpQuietDownloader, "slow_down", None)
+    ):
+        logger.warning(
+            "yt-dlp sem HttpQuietDownloader.slow_down: mudanças no limite de "
+            "banda só valem para fragmentos a partir do próximo arquivo"
+        )
+        return False
+
+    fragment_slow_down = HttpQuietDownloader.slow_down
+
+    def live_fragment_slow_down(self, start_time, now, byte_counter):
+        # O downloader de fragmentos recebe uma cópia de params no início
+        # do arquivo; o limite por conexão é relido do YoutubeDL a cada bloco
+        ydl_params = getattr(getattr(self, "ydl", None), "params", None) or {}
+        if FRAGMENT_RATELIMIT in ydl_params:
+            self.params["ratelimit"] = ydl_params[FRAGMENT_RATELIMIT]
+        fragment_slow_down(self, start_time, now, byte_counter)
+
+    HttpQuietDownloader.slow_down = live_fragment_slow_down
+    return True
+
+
+_patch_fragment_slow_down()
+
+_retcode_warned = False
+
+
+def _download_failed(ydl, ydl_logger) -> bool:
+    """
+    Falha engolida pelo ignoreerrors: o código de retorno do yt-dlp ou,
+    se esse atributo interno sumir, os erros capturados pelo logger.
+    """
+    global _retcode_warned
+    if hasattr(ydl, "_download_retcode"):
+        return bool(ydl._download_retcode)
+
+    if not _retcode_warned:
+        _retcode_warned = True
+        logger.warning("yt-dlp sem _download_retcode: usando erros do logger")
+    return bool(ydl_logger.errors)
+
+
+def _reset_failure(ydl, ydl_logger) -> None:
+    if hasattr(ydl, "_download_retcode"):
+        ydl._download_retcode = 0
+    ydl_logger.errors.clear()
+
 
 def download_with_ydl(ydl_opts, link):
     logger.info("Iniciando download para link: {}", link)
@@ -16,15 +81,65 @@ def download_with_ydl(ydl_opts, link):
         raise e
 
 
-def start_download(link, format, diretorio, progress_hook, is_playlist=False):
+class YtDlpLogger:
+    """
+    Logger passado ao yt-dlp. Com ignoreerrors o yt-dlp só reporta as
+    falhas (trouble) sem levantar exceção; as mensagens ficam guardadas
+    para o chamador decidir se o download falhou e se houve 429.
+    """
+
+    def __init__(self):
+        self.errors = []
+        self.throttled = False
+
+    def debug(self, msg):
+        # to_screen também chega aqui; o progresso já vem pelos hooks
+        if not msg.startswith("[download]"):
+            logger.debug(msg)
+
+    def info(self, msg):
+        logger.info(msg)
+
+    def warning(self, msg):
+        # Fragmentos pulados por 429 aparecem só como aviso
+        self.throttled = self.throttled or is_throttle_error(msg)
+        logger.warning(msg)
+
+    def error(self, msg):
+        self.errors.append(msg)
+        self.throttled = self.throttled or is_throttle_error(msg)
+        logger.error(msg)
+
+
+def start_download(
+    link,
+    format,
+    diretorio,
+    progress_hook,
+    on_start=None,
+    fragment_threads=1,
+    postprocessor_hook=None,
+):
+    ydl_logger = YtDlpLogger()
     ydl_opts = {
         "format": f"bestvideo+bestaudio/best",
+        "logger": ydl_logger,
         "outtmpl": f"{diretorio}/%(title)s.%(ext)s",
         "progress_hooks": [progress_hook],
-        "noplaylist": not is_playlist,
+        # Playlists são expandidas em um job por vídeo no DownloadManager
+        "noplaylist": True,
         "ignoreerrors": True,
+        # Retoma arquivos .part deixados por uma execução interrompida
+        "continuedl": True,
+        "download_archive": str(download_archive.archive_path(format)),
+        # Fragmentos DASH/HLS baixados em paralelo
+        "concurrent_fragment_downloads": max(int(fragment_threads), 1),
     }
 
+    if postprocessor_hook:
+        # Início/fim de merge, extração de áudio e remux
+        ydl_opts["postprocessor_hooks"] = [postprocessor_hook]
+
     if format in ["mp3", "wav", "m4a"]:
         logger.info(f"Formatos de áudio selecionados: {format}")
         ydl_opts.update(
@@ -53,44 +168,144 @@ def start_download(link, format, diretorio, progress_hook, is_playlist=False):
 
     logger.debug(f"ydl_opts configurados: {ydl_opts}")
 
+    cache_key = canonical_key(link, "video")
+    cached_info = metadata_cache.get(cache_key)
+
     try:
         with YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(link, download=True)
+            info = None
 
-            if info:
-                # Para playlists, retorna info completa com entries
-                if is_playlist and "entries" in info:
-                    logger.info(f"Playlist detectada com {len(info['entries'])} vídeos")
-
-                    # Processa cada entry para adicionar filepath
-                    entries_with_filepath = []
-                    for entry in info.get("entries", []):
-                        if entry:
-                            entry_data = {
-                                "id": entry.get("id", ""),
-                                "title": entry.get("title", "Título Indisponível"),
-                                "thumbnail": entry.get("thumbnail", ""),
-                                "filepath": ydl.prepare_filename(entry),
-                            }
-                            entries_with_filepath.append(entry_data)
+            # Permite ao chamador ajustar ydl.params durante o download
+            # (ex.: ratelimit do limitador de banda)
+            if on_start:
+                on_start(ydl)
 
-                    return {
-                        "entries": entries_with_filepath,
-                        "title": info.get("title", "Playlist"),
-                        "id": info.get("id", ""),
-                    }
+            if cached_info:
+                # Reaproveita a extração feita ao colar o link
+                logger.info(f"Reutilizando metadados em cache: {cache_key}")
+                try:
+                    info = ydl.process_ie_result(
+                        copy.deepcopy(cached_info), download=True
+                    )
+                except DownloadError as e:
+                    logger.warning(f"Metadados em cache inválidos, extraindo: {e}")
+                    metadata_cache.invalidate(cache_key)
+                    info = None
+
+                # Com ignoreerrors a falha (ex.: URLs de formato expiradas)
+                # só aparece no código de retorno; um 429 não é repetido
+                if _download_failed(ydl, ydl_logger) and not ydl_logger.throttled:
+                    logger.warning("Download com metadados em cache falhou, extraindo")
+                    metadata_cache.invalidate(cache_key)
+                    _reset_failure(ydl, ydl_logger)
+                    info = None
+
+            if info is None and not _download_failed(ydl, ydl_logger):
+                info = ydl.extract_info(link, download=True)
+
+            # Erro engolido pelo ignoreerrors (extração ou download)
+            if _download_failed(ydl, ydl_logger):
+                raise DownloadError(
+                    "; ".join(ydl_logger.errors) or "yt-dlp reportou falha no download"
+                )
+
+            if info:
+                downloads = info.get("requested_downloads") or []
+                filepath = downloads[-1].get("filepath") if downloads else None
 
-                # Para vídeos únicos
-                else:
+                if not filepath:
+                    # Já estava no arquivo de downloads: o yt-dlp pulou
+                    # o vídeo depois da extração, sem baixar nada
+                    logger.info(f"Vídeo já no arquivo de downloads: {link}")
                     return {
+                        "skipped": True,
                         "title": info.get("title", "Título Indisponível"),
-                        "thumbnail": info.get("thumbnail", ""),
-                        "filepath": ydl.prepare_filename(info),
                         "id": info.get("id", ""),
+                        "extractor": info.get("extractor_key", ""),
                     }
 
-            return {}
+                return {
+                    "title": info.get("title", "Título Indisponível"),
+                    "thumbnail": info.get("thumbnail", ""),
+                    "filepath": filepath,
+                    "id": info.get("id", ""),
+                    "extractor": info.get("extractor_key", ""),
+                    "uploader": info.get("uploader") or info.get("channel"),
+                    # Concluído, mas com fragmentos pulados por 429
+                    "throttled": ydl_logger.throttled,
+                }
+
+            # Sem info e sem erro: o id do link já estava no arquivo de
+            # downloads e o yt-dlp nem extraiu
+            logger.info(f"Vídeo já no arquivo de downloads: {link}")
+            extractor, video_id = _archive_temp_id(ydl, link)
+            return {"skipped": True, "id": video_id, "extractor": extractor}
 
     except Exception as e:
         logger.error("Erro ao iniciar o download: {}", str(e))
         raise e
+
+
+def _archive_temp_id(ydl, link):
+    """Extrator e id que o yt-dlp usa para consultar o arquivo antes de extrair."""
+    for key, ie in (getattr(ydl, "_ies", None) or {}).items():
+        if ie.suitable(link):
+            return key, ie.get_temp_id(link)
+    return None, None
+
+
+def extract_playlist_entries(link):
+    """
+    Extração "flat" da playlist: lista as entradas sem resolver cada vídeo.
+    O resultado fica no cache de metadados, compartilhado com a UI.
+    """
+    return metadata_cache.get_or_load(
+        canonical_key(link, "playlist"), lambda: _extract_flat(link)
+    )
+
+
+def _extract_flat(link):
+    ydl_opts = {
+        "quiet": True,
+        "extract_flat": True,
+        "skip_download": True,
+        "no_warnings": True,
+    }
+
+    with YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(link, download=False)
+
+    if not info:
+        return {"id": "", "title": "Playlist", "entries": []}
+
+    entries = []
+    for entry in info.get("entries") or []:
+        if not entry:
+            continue
+
+        entry_id = entry.get("id", "")
+        entry_url = entry.get("url") or entry.get("webpage_url") or entry_id
+        if entry_url and "://" not in entry_url:
+            entry_url = f"https://www.youtube.com/watch?v={entry_url}"
+
+        if not entry_url:
+            continue
+
+        thumbnails = entry.get("thumbnails") or []
+        entries.append(
+            {
+                "id": entry_id,
+                "url": entry_url,
+                "title": entry.get("title", "Título Indisponível"),
+                "thumbnail": entry.get("thumbnail")
+                or (thumbnails[-1].get("url", "") if thumbnails else ""),
+            }
+        )
+
+    logger.info(f"Extração flat: {len(entries)} entradas em {link}")
+
+    return {
+        "id": info.get("id", ""),
+        "title": info.get("title", "Playlist"),
+        "entries": entries,
+    }
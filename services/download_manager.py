@@ -1,69 +1,179 @@
-import asyncio
 import threading
+import time
 import uuid
-from queue import Queue
-
-import flet as ft
 
 from utils.logging_config import setup_logging
 
 logger = setup_logging()
 
-from services.dlp_service import start_download
+# Status que encerram um vídeo (contam como processados na playlist)
+FINAL_STATUSES = ("finished", "skipped", "error", "cancelled")
+
+from services.bandwidth import BandwidthLimiter
+from services.cancellation import (
+    CancellationToken,
+    DownloadCancelled,
+    bind_token,
+    cleanup_partial_files,
+)
+from services.concurrency import AdaptiveConcurrency, is_throttle_error
+from services.dlp_service import extract_playlist_entries, start_download
+from services.event_bus import EventBus
+from services.download_queue import PRIORITY_NORMAL, DownloadJob, DownloadScheduler
+from services.process_worker import WORKER_PROCESS, WORKER_THREAD
+from services.process_worker import start_download_in_process
+from services.progress_events import (
+    POSTPROCESSOR_PHASES,
+    ProgressEvent,
+    SpeedEstimator,
+    StageTimer,
+    ThroughputMeter,
+)
+from utils.download_archive import archive_id, archive_id_for_url, download_archive
 
 
 class DownloadManager:
-    def __init__(self, page, max_downloads=3):
+    """
+    Motor de downloads, independente de interface.
+
+    Tudo o que acontece com os jobs (itens novos, progresso, fases de
+    pós-processamento, fim, erros, avisos) é publicado em self.events;
+    sidebar, barra de progresso, CLI e testes assinam o barramento.
+    """
+
+    def __init__(self, max_downloads=3, storage=None, persist_jobs=True):
         self.downloads = {}
         self.lock = threading.Lock()
-        self.page = page
         self.max_downloads = max_downloads
-        self.semaphore = threading.Semaphore(self.max_downloads)
+        self.scheduler = DownloadScheduler(max_active=self.max_downloads)
         self.active_downloads = 0
         self.cancelled_downloads = set()
+        # Token de cancelamento por job em execução; a presença do token
+        # indica que o job ainda ocupa um slot do scheduler
+        self.cancel_tokens = {}
+        self.running_jobs = {}
+        self.paused_jobs = {}
+        self._video_jobs = {}
         self.download_threads = {}
-        self.progress_queue = Queue()
-        self.progress_callback = None
-        self.sidebar = None
+        self.events = EventBus()
 
         self.playlist_progress = {}
 
-        self._start_progress_processor()
+        # Jobs pendentes persistidos em disco, retomados na próxima execução
+        self.storage = storage
+        self.jobs_storage = storage if persist_jobs else None
+        self._jobs_resumed = False
 
-    def _start_progress_processor(self):
-        if hasattr(self.page, "run_task"):
-            self.page.run_task(self._process_progress_updates)
-        else:
-            logger.warning("página não suporta run_task, usando fallback síncrono")
+        # "thread" roda o yt-dlp aqui; "process" em um processo separado
+        self.worker_mode = WORKER_THREAD
+        if self.storage:
+            self.worker_mode = self.storage.get_setting(
+                "download_worker", WORKER_THREAD
+            )
+
+        self.bandwidth = BandwidthLimiter(on_change=self._publish_bandwidth_state)
+        self.concurrency = AdaptiveConcurrency(self.scheduler)
+        self.throughput = ThroughputMeter()
+        if self.storage:
+            self.bandwidth.load_settings(self.storage)
+            self.concurrency.load_settings(self.storage)
+
+        if self.storage:
+            threading.Thread(
+                target=lambda: download_archive.import_downloads(
+                    self.storage.list_downloads()
+                ),
+                daemon=True,
+            ).start()
+
+        self._start_dispatcher()
+
+    def _start_dispatcher(self):
+        self.dispatcher_thread = threading.Thread(
+            target=self._dispatch_jobs, name="fletube-dispatcher", daemon=True
+        )
+        self.dispatcher_thread.start()
 
-    async def _process_progress_updates(self):
-        logger.info("Processador de progresso assíncrono iniciado")
+    def _dispatch_jobs(self):
+        logger.info("Despachante de downloads iniciado")
 
         while True:
-            try:
-                await asyncio.sleep(0.03)
+            job = self.scheduler.next_job()
+            if job is None:
+                break
 
-                updates_batch = []
-                while not self.progress_queue.empty():
-                    try:
-                        update = self.progress_queue.get_nowait()
-                        updates_batch.append(update)
-                    except:
-                        break
+            try:
+                thread = threading.Thread(
+                    target=self.download_thread,
+                    args=(job,),
+                    daemon=True,
+                )
 
-                if updates_batch and self.sidebar and self.sidebar.mounted:
-                    for update in updates_batch:
-                        await self._apply_update_async(update)
+                with self.lock:
+                    self.download_threads[job.job_id] = thread
 
+                thread.start()
+                logger.info(
+                    f"Download iniciado: {job.job_id[:8]}... "
+                    f"(playlist={job.parent_id is not None}, "
+                    f"pendentes={self.scheduler.pending_count()})"
+                )
             except Exception as e:
-                logger.error(f"Erro no processador de progresso: {e}")
-                await asyncio.sleep(1)
+                logger.error(f"Erro ao despachar job {job.job_id[:8]}: {e}")
+                self.scheduler.release()
+
+        logger.info("Despachante de downloads finalizado")
+
+    def _publish(self, update):
+        """
+        Publica um evento no barramento. Antes, aplica o estado que é do
+        motor e não da UI: descarta eventos de vídeos já cancelados e soma
+        o progresso proporcional das playlists (campo playlist_progress).
+        """
+        video_id = update.get("video_id")
+        download_id = update.get("download_id")
+        status = update.get("status")
+
+        if video_id and status != "cancelled" and self.is_cancelled(video_id):
+            logger.debug(f"Vídeo {video_id} cancelado - ignorando atualização")
+            return
+
+        playlist_processed = False
+        if download_id:
+            with self.lock:
+                info = self.playlist_progress.get(download_id)
+                if info is not None:
+                    if status == "downloading":
+                        info["current_progress"][video_id] = update.get("progress", 0)
+
+                    elif status in FINAL_STATUSES:
+                        bucket = (
+                            "completed"
+                            if status in ("finished", "skipped")
+                            else "failed"
+                        )
+                        if video_id not in info[bucket]:
+                            info[bucket].append(video_id)
+                        info["current_progress"].pop(video_id, None)
+                        playlist_processed = True
+
+                    update["playlist_progress"] = self._calculate_total_progress(
+                        download_id
+                    )
+
+        self.events.publish(update)
+
+        if playlist_processed:
+            self._check_playlist_done(download_id)
 
     def _calculate_total_progress(self, download_id):
         """
         Calcula o progresso total da playlist usando proporção matemática.
 
-        Fórmula: progresso_total = (videos_completos + progresso_atual) / total_videos
+        Fórmula: progresso_total = (videos_processados + progresso_atual) / total_videos
+
+        Vídeos com falha também contam como processados, para que a barra
+        chegue ao fim mesmo quando alguma entrada da playlist falha.
         """
         if download_id not in self.playlist_progress:
             return 0.0
@@ -71,10 +181,11 @@ class DownloadManager:
         info = self.playlist_progress[download_id]
         total_videos = info.get("total", 1)
         completed_count = len(info.get("completed", []))
+        failed_count = len(info.get("failed", []))
         current_progress = info.get("current_progress", {})
 
-        # Soma dos vídeos completos (cada um vale 1.0)
-        completed_sum = float(completed_count)
+        # Soma dos vídeos processados (cada um vale 1.0)
+        completed_sum = float(completed_count + failed_count)
 
         # Soma do progresso dos vídeos atuais (vale de 0.0 a 1.0 cada)
         current_sum = sum(current_progress.values())
@@ -89,227 +200,542 @@ class DownloadManager:
 
         return min(total_progress, 1.0)
 
-    async def _apply_update_async(self, update):
-        try:
-            video_id = update.get("video_id")
-            download_id = update.get("download_id")
-            status = update.get("status")
-            progress = update.get("progress", 0)
-            data = update.get("data", {})
-
-            if not video_id:
-                return
-
-            if self.is_cancelled(video_id):
-                logger.info(f"Vídeo {video_id} cancelado - ignorando atualização")
-                return
-
-            # Atualiza progresso proporcional para playlists
-            if download_id and download_id in self.playlist_progress:
-                info = self.playlist_progress[download_id]
-
-                if status == "downloading":
-                    info["current_progress"][video_id] = progress
-
-                elif status == "finished":
-                    if video_id not in info["completed"]:
-                        info["completed"].append(video_id)
-                    info["current_progress"].pop(video_id, None)
-
-                # Calcula e envia progresso total proporcional
-                total_progress = self._calculate_total_progress(download_id)
-
-                if self.progress_callback:
-                    try:
-                        self.progress_callback(total_progress, status)
-                    except Exception as e:
-                        logger.error(f"Erro no callback: {e}")
-
-            # Atualiza callback para downloads únicos
-            elif self.progress_callback and status == "downloading":
-                try:
-                    self.progress_callback(progress, "downloading")
-                except Exception as e:
-                    logger.error(f"Erro no callback de progresso: {e}")
-
-            # ATUALIZA SIDEBAR
-            if status == "add_item":
-                if video_id not in self.sidebar.items:
-                    logger.info(
-                        f"Adicionando item à sidebar: {data.get('title', 'N/A')[:30]}..."
-                    )
-                    self.sidebar.add_download_item(
-                        id=video_id,
-                        title=data.get("title", "Título Indisponível"),
-                        subtitle=data.get("format", "Formato"),
-                        thumbnail_url=data.get("thumbnail", "/images/thumb_broken.jpg"),
-                        file_path=data.get("file_path", ""),
-                        download_manager=self,
-                    )
-
-            elif status == "downloading":
-                self.sidebar.update_download_item(video_id, progress, "downloading")
-
-            elif status == "converting":
-                if self.progress_callback and not download_id:
-                    self.progress_callback(progress, "converting")
-                self.sidebar.update_download_item(video_id, progress, "converting")
-
-            elif status == "merging":
-                self.sidebar.update_download_item(video_id, 0.95, "merging")
-
-            elif status == "finished":
-                # Verifica se playlist está completa
-                if download_id and download_id in self.playlist_progress:
-                    info = self.playlist_progress[download_id]
-                    if len(info["completed"]) >= info["total"]:
-                        if self.progress_callback:
-                            self.progress_callback(1.0, "finished")
-                        logger.info(
-                            f"Playlist completa: {len(info['completed'])}/{info['total']}"
-                        )
-                elif self.progress_callback:
-                    self.progress_callback(1.0, "finished")
-
-                storage = self.page.session.get("app_storage")
-                if storage and data:
-                    storage.save_download(video_id, data)
+    def _check_playlist_done(self, download_id):
+        info = self.playlist_progress.get(download_id)
+        if not info or not info["total"]:
+            return
 
-                self.sidebar.update_download_item(video_id, 1.0, "finished")
-                logger.info(f"Download concluído: {video_id}")
+        processed = len(info["completed"]) + len(info["failed"])
+        if processed < info["total"]:
+            return
 
-            elif status == "error":
-                if self.progress_callback:
-                    self.progress_callback(0, "error")
-                self.sidebar.update_download_item(video_id, 0, "error")
-                logger.error(f"Erro no download: {video_id}")
+        logger.info(
+            f"Playlist completa: {len(info['completed'])}/{info['total']} "
+            f"({len(info['failed'])} falhas)"
+        )
 
-            elif status == "cancelled":
-                self.sidebar.update_download_item(video_id, 0, "cancelled")
+        final_status = "finished" if info["completed"] else "error"
 
-                await asyncio.sleep(2)
-                if video_id in self.sidebar.items:
-                    self.sidebar.downloads_column.controls.remove(
-                        self.sidebar.items[video_id]
-                    )
-                    del self.sidebar.items[video_id]
-                    self.sidebar.update_download_counts()
-                    if self.sidebar.mounted:
-                        self.sidebar.update()
+        with self.lock:
+            if self.playlist_progress.pop(download_id, None) is None:
+                return
 
-        except Exception as e:
-            logger.error(f"Erro ao aplicar atualização async: {e}")
+        self._publish(
+            {
+                "download_id": download_id,
+                "status": "playlist_finished",
+                "progress": 1.0,
+                "data": {
+                    "status": final_status,
+                    "total": info["total"],
+                    "completed": len(info["completed"]),
+                    "failed": len(info["failed"]),
+                },
+            }
+        )
 
     def iniciar_download(
         self,
         link,
         formato,
         diretorio,
-        sidebar,
-        page,
         is_playlist=False,
-        progress_callback=None,
+        priority=PRIORITY_NORMAL,
     ):
-        if not self.semaphore.acquire(blocking=False):
-            from utils.ui_helpers import show_error_snackbar
-
-            show_error_snackbar(page, "Limite de downloads simultâneos atingido.")
-            logger.info("Limite de downloads simultâneos atingido.")
-            return
-
-        self.sidebar = sidebar
-        self.progress_callback = progress_callback
-        download_id = str(uuid.uuid4())
-
-        # Inicializa controle de progresso para playlists
         if is_playlist:
-            logger.info(f"Inicializando controle de playlist: {download_id}")
-            self.playlist_progress[download_id] = {
+            playlist_id = str(uuid.uuid4())
+            logger.info(f"Inicializando controle de playlist: {playlist_id}")
+            self.playlist_progress[playlist_id] = {
                 "total": 0,
                 "completed": [],
+                "failed": [],
                 "current_progress": {},
             }
+            self._persist_playlist(playlist_id, link, formato, diretorio, priority)
+
+            threading.Thread(
+                target=self._expand_playlist,
+                args=(playlist_id, link, formato, diretorio, priority),
+                daemon=True,
+            ).start()
+            return playlist_id
+
+        job = DownloadJob(
+            link=link,
+            formato=formato,
+            diretorio=diretorio,
+            priority=priority,
+        )
+        self._submit_job(job)
+        return job.job_id
+
+    def _archived_entry(self, job):
+        """Id no arquivo de downloads se o vídeo já foi baixado nesse formato."""
+        entry_id = archive_id_for_url(job.link)
+        if download_archive.contains(entry_id, job.formato):
+            return entry_id
+        return None
+
+    def _skip_job(self, job, entry_id):
+        """Publica como ignorado um vídeo que já está no arquivo de downloads."""
+        logger.info(f"Vídeo já baixado em {job.formato}, ignorando: {job.link}")
+
+        item_id = job.video_id or (
+            entry_id.split(" ", 1)[1] if entry_id else job.job_id
+        )
+        self._publish(
+            {
+                "video_id": item_id,
+                "download_id": job.parent_id,
+                "status": "add_item",
+                "data": {
+                    "title": job.title or job.link,
+                    "format": job.formato,
+                    "thumbnail": job.thumbnail or "/images/thumb_broken.jpg",
+                },
+            }
+        )
+        self._publish(
+            {
+                "video_id": item_id,
+                "download_id": job.parent_id,
+                "status": "skipped",
+                "progress": 1.0,
+            }
+        )
+        self._finish_job(job, item_id, "completed")
+
+    def _notice(self, message):
+        """Aviso para o usuário (snackbar na interface, linha no CLI)."""
+        self._publish({"status": "notice", "data": {"message": message}})
 
-        thread = threading.Thread(
-            target=self.download_thread,
-            args=(link, formato, diretorio, sidebar, download_id, is_playlist),
-            daemon=True,
+    def _clear_cancelled(self, video_id):
+        """Um cancelamento anterior do vídeo não vale para um job novo."""
+        if video_id:
+            with self.lock:
+                self.cancelled_downloads.discard(video_id)
+
+    def _submit_job(self, job, notify=True):
+        self._clear_cancelled(job.video_id)
+
+        entry_id = self._archived_entry(job)
+        if entry_id:
+            self._skip_job(job, entry_id)
+            if notify:
+                self._notice(f"Este vídeo já foi baixado em {job.formato}.")
+            return
+
+        self._persist_job(job)
+
+        slots_busy = self.scheduler.active >= self.scheduler.max_active
+        position = self.scheduler.submit(job)
+
+        if slots_busy and notify:
+            self._notice(f"Download adicionado à fila (posição {position}).")
+            logger.info("Limite de downloads simultâneos atingido, job na fila")
+
+    def _expand_playlist(self, playlist_id, link, formato, diretorio, priority):
+        """
+        Expande a playlist em um job por vídeo, para que as entradas sejam
+        baixadas em paralelo respeitando o limite do DownloadManager.
+        """
+        try:
+            playlist_info = extract_playlist_entries(link)
+        except Exception as e:
+            logger.error(f"Erro ao expandir playlist {link}: {e}")
+            playlist_info = {"entries": []}
+
+        entries = playlist_info.get("entries", [])
+
+        if not entries:
+            logger.error(f"Playlist sem entradas: {link}")
+            with self.lock:
+                self.playlist_progress.pop(playlist_id, None)
+            if self.jobs_storage:
+                self.jobs_storage.delete_job(playlist_id)
+            self._publish(
+                {
+                    "download_id": playlist_id,
+                    "status": "playlist_finished",
+                    "progress": 0,
+                    "data": {"status": "error", "total": 0},
+                }
+            )
+            return
+
+        with self.lock:
+            completed = set()
+            if playlist_id in self.playlist_progress:
+                self.playlist_progress[playlist_id]["total"] = len(entries)
+                completed = set(self.playlist_progress[playlist_id]["completed"])
+
+        self._update_playlist_record(playlist_id, total=len(entries))
+
+        logger.info(
+            f"Playlist '{playlist_info.get('title', 'Playlist')}' expandida: "
+            f"{len(entries)} vídeos ({len(completed)} já baixados)"
         )
 
+        skipped = 0
+        for entry in entries:
+            if entry.get("id") and entry["id"] in completed:
+                continue
+
+            job = DownloadJob(
+                link=entry["url"],
+                formato=formato,
+                diretorio=diretorio,
+                priority=priority,
+                parent_id=playlist_id,
+                video_id=entry.get("id") or None,
+                title=entry.get("title"),
+                thumbnail=entry.get("thumbnail"),
+            )
+            self._clear_cancelled(job.video_id)
+
+            entry_id = self._archived_entry(job)
+            if entry_id:
+                self._skip_job(job, entry_id)
+                skipped += 1
+                continue
+
+            self.scheduler.submit(job)
+
+        if skipped:
+            logger.info(f"Playlist {playlist_id[:8]}: {skipped} vídeos já baixados")
+
+    def _publish_bandwidth_state(self, state):
+        self._publish({"video_id": None, "status": "bandwidth", "data": state})
+
+    def _persist_job(self, job):
+        if self.jobs_storage:
+            self.jobs_storage.save_job(job.job_id, job.to_dict())
+
+    def _persist_playlist(self, playlist_id, link, formato, diretorio, priority):
+        if not self.jobs_storage:
+            return
+
+        self.jobs_storage.save_job(
+            playlist_id,
+            {
+                "job_id": playlist_id,
+                "link": link,
+                "formato": formato,
+                "diretorio": diretorio,
+                "priority": priority,
+                "is_playlist": True,
+                "total": 0,
+                "completed": [],
+                "failed": [],
+                "partials": {},
+            },
+        )
+
+    def _update_playlist_record(
+        self, playlist_id, video_id=None, bucket=None, total=None, partial_path=None
+    ):
+        """
+        Registra o andamento de uma playlist no storage de jobs. Quando
+        todas as entradas foram processadas o registro é removido.
+        """
+        if not self.jobs_storage:
+            return
+
         with self.lock:
-            self.download_threads[download_id] = thread
+            record = self.jobs_storage.get_job(playlist_id)
+            if not record:
+                return
+
+            if total is not None:
+                record["total"] = total
+            if partial_path and video_id:
+                record["partials"][video_id] = partial_path
+            if bucket and video_id:
+                if video_id not in record[bucket]:
+                    record[bucket].append(video_id)
+                record["partials"].pop(video_id, None)
+
+            processed = len(record["completed"]) + len(record["failed"])
+            if record["total"] and processed >= record["total"]:
+                self.jobs_storage.delete_job(playlist_id)
+                logger.info(f"Playlist {playlist_id[:8]} concluída, job removido")
+            else:
+                self.jobs_storage.save_job(playlist_id, record)
+
+    def _record_partial_path(self, job, video_id, partial_path):
+        if job.partial_path == partial_path:
+            return
+
+        job.partial_path = partial_path
+        if job.parent_id:
+            self._update_playlist_record(
+                job.parent_id, video_id=video_id, partial_path=partial_path
+            )
+        else:
+            self._persist_job(job)
+
+    def _finish_job(self, job, video_id, bucket):
+        if not self.jobs_storage:
+            return
+
+        if job.parent_id:
+            self._update_playlist_record(
+                job.parent_id, video_id=video_id or job.job_id, bucket=bucket
+            )
+        else:
+            self.jobs_storage.delete_job(job.job_id)
+
+    def resume_pending_jobs(self):
+        """
+        Reenfileira os jobs que ficaram pendentes na execução anterior.
+
+        Vídeos avulsos voltam como estavam; playlists são expandidas de
+        novo pulando as entradas já concluídas. O yt-dlp continua os
+        arquivos .part existentes no mesmo diretório.
+        """
+        if self._jobs_resumed or not self.jobs_storage:
+            return 0
+        self._jobs_resumed = True
+
+        jobs = self.jobs_storage.list_jobs()
+        for record in jobs:
+            try:
+                if record.get("is_playlist"):
+                    playlist_id = record["job_id"]
+                    with self.lock:
+                        self.playlist_progress[playlist_id] = {
+                            "total": record.get("total", 0),
+                            "completed": list(record.get("completed", [])),
+                            "failed": [],
+                            "current_progress": {},
+                        }
+
+                    # Entradas com falha são tentadas de novo
+                    record["failed"] = []
+                    self.jobs_storage.save_job(playlist_id, record)
+
+                    threading.Thread(
+                        target=self._expand_playlist,
+                        args=(
+                            playlist_id,
+                            record["link"],
+                            record["formato"],
+                            record["diretorio"],
+                            record.get("priority", PRIORITY_NORMAL),
+                        ),
+                        daemon=True,
+                    ).start()
+                else:
+                    self.scheduler.submit(DownloadJob.from_dict(record))
+            except Exception as e:
+                logger.error(f"Erro ao retomar job {record.get('job_id')}: {e}")
+                self.jobs_storage.delete_job(record.get("job_id", ""))
+
+        if jobs:
+            logger.info(f"{len(jobs)} downloads pendentes retomados")
+            self._notice(f"{len(jobs)} downloads pendentes retomados.")
 
-        thread.start()
-        logger.info(f"Download iniciado: {download_id[:8]}... (playlist={is_playlist})")
+        return len(jobs)
+
+    def shutdown(self):
+        """Fecha o barramento de eventos e o despachante de jobs."""
+        logger.info("Encerrando gerenciador de downloads")
+        self.events.close()
+        self.scheduler.close()
 
     def cancel_download(self, video_id):
         with self.lock:
             self.cancelled_downloads.add(video_id)
             logger.info(f"Vídeo {video_id} marcado para cancelamento")
 
-            self.progress_queue.put(
-                {"video_id": video_id, "status": "cancelled", "progress": 0}
-            )
+            job_id = self._video_jobs.get(video_id)
+            token = self.cancel_tokens.get(job_id)
+            paused_job = self.paused_jobs.pop(video_id, None)
+
+        self._publish(
+            {
+                "video_id": video_id,
+                "download_id": paused_job.parent_id if paused_job else None,
+                "status": "cancelled",
+                "progress": 0,
+            }
+        )
+
+        if paused_job:
+            # Nada em execução: só descarta o job e o arquivo parcial
+            self._finish_job(paused_job, video_id, "failed")
+            cleanup_partial_files({paused_job.partial_path})
+
+        if token:
+            # Mata FFmpeg/processo filho e libera o slot sem esperar a
+            # thread de download terminar de desmontar
+            token.cancel()
+            self._release_slot(job_id)
+
+    def pause_download(self, video_id):
+        """
+        Interrompe o worker mantendo o arquivo .part e libera o slot e a
+        fatia de banda. O job fica guardado para resume_download.
+        """
+        with self.lock:
+            job_id = self._video_jobs.get(video_id)
+            token = self.cancel_tokens.get(job_id)
+            job = self.running_jobs.get(job_id)
+
+            if not token or not job:
+                logger.warning(f"Nenhum download em andamento para pausar: {video_id}")
+                return False
+
+            job.video_id = job.video_id or video_id
+            self.paused_jobs[video_id] = job
+
+        logger.info(f"Pausando download {video_id}")
+        token.cancel(pause=True)
+        self._release_slot(job_id)
+
+        self._publish(
+            {"video_id": video_id, "download_id": job.parent_id, "status": "paused"}
+        )
+        return True
+
+    def resume_download(self, video_id):
+        """Reenfileira um job pausado; o yt-dlp continua o .part existente."""
+        with self.lock:
+            job = self.paused_jobs.pop(video_id, None)
+            thread = self.download_threads.get(job.job_id) if job else None
+
+        if not job:
+            logger.warning(f"Nenhum download pausado: {video_id}")
+            return False
+
+        def requeue():
+            # O worker anterior precisa soltar o .part antes de outro abrir
+            if thread and thread is not threading.current_thread():
+                thread.join()
+            self.scheduler.submit(job)
+
+        threading.Thread(target=requeue, daemon=True).start()
+        logger.info(f"Retomando download {video_id}")
+
+        self._publish(
+            {"video_id": video_id, "download_id": job.parent_id, "status": "pending"}
+        )
+        return True
+
+    def _release_slot(self, download_id):
+        with self.lock:
+            if self.cancel_tokens.pop(download_id, None) is None:
+                return False
+
+        self.bandwidth.unregister(download_id)
+        self.scheduler.release()
+        return True
 
     def is_cancelled(self, video_id):
         return video_id in self.cancelled_downloads
 
-    def download_thread(
-        self, link, formato, diretorio, sidebar, download_id, is_playlist=False
-    ):
-        import time
+    def download_thread(self, job):
+        link = job.link
+        formato = job.formato
+        download_id = job.job_id
+        parent_id = job.parent_id
 
         last_progress_time = 0
         last_progress_value = -1
-        video_id_global = None
-        playlist_videos = {}
+        video_id_global = job.video_id
+        tracked_video_id = job.video_id
+        partial_paths = {job.partial_path}
+        speed_estimator = SpeedEstimator()
+        stages = StageTimer()
+        phase_ticker = threading.Event()
+        # Vídeos cujo add_item já foi publicado nesta execução
+        announced = set()
+
+        token = CancellationToken()
+        with self.lock:
+            self.cancel_tokens[download_id] = token
+            self.running_jobs[download_id] = job
+            if job.video_id:
+                self._video_jobs[job.video_id] = download_id
+            # Cancelado enquanto esperava na fila (ex.: retomado, "pending")
+            if job.video_id in self.cancelled_downloads:
+                token.cancel()
+
+        def item_data(
+            video_id,
+            title=None,
+            thumbnail=None,
+            file_path="",
+            uploader=None,
+            extractor=None,
+        ):
+            return {
+                "id": video_id,
+                "title": title or job.title or "Título Indisponível",
+                "thumbnail": thumbnail or job.thumbnail or "/images/thumb_broken.jpg",
+                "format": formato,
+                "file_path": file_path,
+                "uploader": uploader or "",
+                "extractor": extractor or "",
+            }
+
+        def announce(video_id, data):
+            announced.add(video_id)
+            self._publish(
+                {
+                    "video_id": video_id,
+                    "download_id": parent_id,
+                    "status": "add_item",
+                    "data": data,
+                }
+            )
 
         def progress_hook(d):
-            nonlocal last_progress_time, last_progress_value, video_id_global, playlist_videos
+            nonlocal last_progress_time, last_progress_value, video_id_global
+            nonlocal tracked_video_id
 
             info_dict = d.get("info_dict", {})
             video_id = info_dict.get("id", "")
 
-            # Detecta novos vídeos da playlist
-            if is_playlist and video_id:
-                if video_id not in playlist_videos:
-                    playlist_videos[video_id] = {
-                        "title": info_dict.get("title", "Título Indisponível"),
-                        "thumbnail": info_dict.get(
-                            "thumbnail", "/images/thumb_broken.jpg"
-                        ),
-                        "added_to_ui": False,
-                    }
-
-                    # Atualiza total de vídeos
-                    if download_id in self.playlist_progress:
-                        self.playlist_progress[download_id]["total"] = len(
-                            playlist_videos
-                        )
-                        logger.info(
-                            f"Vídeo {len(playlist_videos)} detectado: "
-                            f"{info_dict.get('title', 'N/A')[:40]}..."
-                        )
-
             if not video_id_global and video_id:
                 video_id_global = video_id
 
             current_video_id = video_id or video_id_global
 
+            self.bandwidth.tick()
+
+            # Temporários a remover caso o download seja cancelado
+            for key in ("tmpfilename", "filename"):
+                if d.get(key):
+                    partial_paths.add(d[key])
+
+            if current_video_id and current_video_id != tracked_video_id:
+                tracked_video_id = current_video_id
+                with self.lock:
+                    self._video_jobs[current_video_id] = download_id
+                    if not job.video_id:
+                        # Link avulso: o id só aparece agora
+                        self.cancelled_downloads.discard(current_video_id)
+
             if current_video_id and self.is_cancelled(current_video_id):
-                logger.info(f"Vídeo {current_video_id} cancelado - interrompendo")
-                raise Exception(f"Download cancelado pelo usuário")
+                token.cancel()
 
-            current_time = time.time()
-            if current_time - last_progress_time < 0.05:
-                return
+            if token.cancelled:
+                logger.info(f"Vídeo {current_video_id} interrompido pelo usuário")
+                token.raise_if_cancelled()
 
+            # A média de velocidade usa todas as amostras, não só as enviadas
+            event = None
             progress = 0
             if d["status"] == "downloading":
-                if "total_bytes" in d and "downloaded_bytes" in d:
-                    progress = d["downloaded_bytes"] / max(d["total_bytes"], 1)
-                elif "total_bytes_estimate" in d and "downloaded_bytes" in d:
-                    progress = d["downloaded_bytes"] / max(d["total_bytes_estimate"], 1)
+                event = speed_estimator.event(current_video_id, d)
+                progress = event.progress
+                self.throughput.update(download_id, event.speed)
+                self.concurrency.record_speed(download_id, event.speed)
+
+            current_time = time.time()
+            if current_time - last_progress_time < 0.05:
+                return
 
             if (
                 abs(progress - last_progress_value) < 0.005
@@ -327,190 +753,252 @@ class DownloadManager:
 
             try:
                 if d["status"] == "downloading":
+                    partial_path = d.get("tmpfilename") or d.get("filename")
+                    if partial_path:
+                        self._record_partial_path(job, current_video_id, partial_path)
+
                     # Adiciona à UI se ainda não foi adicionado
-                    if current_video_id not in sidebar.items:
-                        video_info = playlist_videos.get(current_video_id, {})
-
-                        self.progress_queue.put(
-                            {
-                                "video_id": current_video_id,
-                                "download_id": download_id if is_playlist else None,
-                                "status": "add_item",
-                                "data": {
-                                    "id": current_video_id,
-                                    "title": video_info.get("title")
-                                    or info_dict.get("title", "Título Indisponível"),
-                                    "thumbnail": video_info.get("thumbnail")
-                                    or info_dict.get(
-                                        "thumbnail", "/images/thumb_broken.jpg"
-                                    ),
-                                    "format": formato,
-                                    "file_path": d.get("filename", ""),
-                                },
-                            }
+                    if current_video_id not in announced:
+                        announce(
+                            current_video_id,
+                            item_data(
+                                current_video_id,
+                                title=info_dict.get("title"),
+                                thumbnail=info_dict.get("thumbnail"),
+                                file_path=d.get("filename", ""),
+                            ),
                         )
 
-                        if is_playlist and current_video_id in playlist_videos:
-                            playlist_videos[current_video_id]["added_to_ui"] = True
-
                     # Atualiza progresso
-                    self.progress_queue.put(
+                    event.video_id = current_video_id
+                    self._publish(
                         {
                             "video_id": current_video_id,
-                            "download_id": download_id if is_playlist else None,
+                            "download_id": parent_id,
                             "status": "downloading",
                             "progress": progress,
+                            "event": event,
                         }
                     )
 
                 elif d["status"] == "finished":
-                    filename = d.get("filename", "")
-
-                    # Ignora arquivos parciais
-                    if (
-                        "f251" in filename
-                        or "f140" in filename
-                        or ".webm" in filename
-                        or filename.endswith(".m4a")
-                    ):
-                        logger.debug(f"Arquivo parcial concluído: {filename}")
-                    else:
-                        self.progress_queue.put(
-                            {
-                                "video_id": current_video_id,
-                                "download_id": download_id if is_playlist else None,
-                                "status": "downloading",
-                                "progress": 0.95,
-                            }
-                        )
+                    # Merge/conversão chegam pelo postprocessor_hook
+                    logger.debug(f"Arquivo baixado: {d.get('filename', '')}")
 
             except Exception as e:
                 logger.error(f"Erro no progress_hook: {e}")
 
+        def publish_phase(phase, stage):
+            # FFmpeg não informa progresso: a UI mostra o tempo decorrido
+            while True:
+                if video_id_global:
+                    self._publish(
+                        {
+                            "video_id": video_id_global,
+                            "download_id": parent_id,
+                            "status": phase,
+                            "progress": 0.95,
+                            "event": ProgressEvent(
+                                video_id=video_id_global,
+                                phase=phase,
+                                progress=0.95,
+                                elapsed=stages.elapsed(stage),
+                            ),
+                        }
+                    )
+                if phase_ticker.wait(1):
+                    break
+
+        def postprocessor_hook(d):
+            nonlocal phase_ticker
+
+            stage = d.get("postprocessor") or "postprocessor"
+            phase = POSTPROCESSOR_PHASES.get(stage)
+
+            if d.get("status") == "started":
+                token.raise_if_cancelled()
+                stages.finish("download")
+                stages.start(stage)
+                logger.info(f"[{download_id[:8]}] Etapa {stage} iniciada")
+
+                if phase:
+                    phase_ticker.set()
+                    phase_ticker = threading.Event()
+                    threading.Thread(
+                        target=publish_phase, args=(phase, stage), daemon=True
+                    ).start()
+
+            elif d.get("status") == "finished":
+                duration = stages.finish(stage)
+                if phase:
+                    phase_ticker.set()
+                if duration is not None:
+                    logger.info(
+                        f"[{download_id[:8]}] Etapa {stage} concluída em "
+                        f"{duration:.1f}s"
+                    )
+
         try:
+            token.raise_if_cancelled()
             logger.info(f"Iniciando download: {link}")
 
-            result_info = start_download(
-                link, formato, diretorio, progress_hook, is_playlist
+            stages.start("download")
+            fragment_threads = self.bandwidth.fragment_threads(
+                self.scheduler.max_active
             )
+            download_options = {
+                "postprocessor_hook": postprocessor_hook,
+                "on_start": lambda ydl: self.bandwidth.register(
+                    download_id, ydl, fragment_threads
+                ),
+                "fragment_threads": fragment_threads,
+            }
 
-            if (
-                is_playlist
-                and isinstance(result_info, dict)
-                and "entries" in result_info
-            ):
-                total_entries = len(result_info["entries"])
-                logger.info(f"Playlist completa: {total_entries} vídeos")
-
-                # Atualiza total final
-                if download_id in self.playlist_progress:
-                    self.playlist_progress[download_id]["total"] = total_entries
-
-                for entry in result_info.get("entries", []):
-                    entry_id = entry.get("id")
-                    if entry_id:
-                        download_data = {
-                            "id": entry_id,
-                            "title": entry.get("title", "Título Indisponível"),
-                            "thumbnail": entry.get(
-                                "thumbnail", "/images/thumb_broken.jpg"
-                            ),
-                            "format": formato,
-                            "file_path": entry.get("filepath", ""),
-                        }
+            if self.worker_mode == WORKER_PROCESS:
+                result_info = start_download_in_process(
+                    link,
+                    formato,
+                    job.diretorio,
+                    progress_hook,
+                    cancel_token=token,
+                    **download_options,
+                )
+            else:
+                with bind_token(token):
+                    result_info = start_download(
+                        link, formato, job.diretorio, progress_hook, **download_options
+                    )
 
-                        if entry_id not in sidebar.items:
-                            self.progress_queue.put(
-                                {
-                                    "video_id": entry_id,
-                                    "download_id": download_id,
-                                    "status": "add_item",
-                                    "data": download_data,
-                                }
-                            )
-
-                        # Marca como finalizado
-                        self.progress_queue.put(
-                            {
-                                "video_id": entry_id,
-                                "download_id": download_id,
-                                "status": "finished",
-                                "progress": 1.0,
-                                "data": download_data,
-                            }
-                        )
+            # Cancelado depois de o yt-dlp terminar sem erro (ex.: no merge)
+            token.raise_if_cancelled()
+
+            stages.finish("download")
+            logger.info(f"[{download_id[:8]}] Tempo por etapa: {stages.timings}")
 
-            elif video_id_global:
-                download_data = {
-                    "id": video_id_global,
-                    "title": result_info.get("title", "Título Indisponível"),
-                    "thumbnail": result_info.get(
-                        "thumbnail", "/images/thumb_broken.jpg"
+            if result_info and result_info.get("skipped"):
+                # Fora do YouTube só o yt-dlp sabe que o vídeo já estava no
+                # arquivo de downloads: nada foi baixado nem vai ao histórico
+                self._skip_job(
+                    job,
+                    archive_id(
+                        result_info.get("extractor"),
+                        result_info.get("id") or video_id_global,
                     ),
-                    "format": formato,
-                    "file_path": result_info.get("filepath", ""),
-                }
+                )
+                self.concurrency.forget(download_id)
+                return
 
-                if video_id_global not in sidebar.items:
-                    self.progress_queue.put(
-                        {
-                            "video_id": video_id_global,
-                            "download_id": None,
-                            "status": "add_item",
-                            "data": download_data,
-                        }
-                    )
+            if not video_id_global and result_info:
+                video_id_global = result_info.get("id")
 
-                self.progress_queue.put(
-                    {
-                        "video_id": video_id_global,
-                        "download_id": None,
-                        "status": "downloading",
-                        "progress": 0.99,
-                    }
-                )
+            if not video_id_global or not result_info:
+                raise Exception("yt-dlp não retornou informações do vídeo")
 
-                time.sleep(0.1)
+            download_data = item_data(
+                video_id_global,
+                title=result_info.get("title"),
+                thumbnail=result_info.get("thumbnail"),
+                file_path=result_info.get("filepath", ""),
+                uploader=result_info.get("uploader"),
+                extractor=result_info.get("extractor"),
+            )
+            download_data["timings"] = stages.timings
+            download_archive.mark(
+                archive_id(result_info.get("extractor"), video_id_global), formato
+            )
 
-                self.progress_queue.put(
-                    {
-                        "video_id": video_id_global,
-                        "download_id": None,
-                        "status": "finished",
-                        "progress": 1.0,
-                        "data": download_data,
-                    }
-                )
+            if video_id_global not in announced:
+                announce(video_id_global, download_data)
 
-            with self.lock:
-                if download_id in self.cancelled_downloads:
-                    self.cancelled_downloads.remove(download_id)
+            self._publish(
+                {
+                    "video_id": video_id_global,
+                    "download_id": parent_id,
+                    "status": "downloading",
+                    "progress": 0.99,
+                }
+            )
+
+            time.sleep(0.1)
+
+            self._publish(
+                {
+                    "video_id": video_id_global,
+                    "download_id": parent_id,
+                    "status": "finished",
+                    "progress": 1.0,
+                    "data": download_data,
+                }
+            )
+
+            # O histórico é gravado aqui, não na UI: downloads concluídos
+            # com a página fechada (ou no CLI) também entram nele
+            if self.storage:
+                self.storage.save_download(video_id_global, download_data)
+
+            self._finish_job(job, job.video_id or video_id_global, "completed")
+            self.concurrency.record_result(
+                download_id,
+                success=True,
+                throttled=bool(result_info.get("throttled")),
+            )
 
         except Exception as e:
-            if "cancelado pelo usuário" in str(e).lower():
+            if token.paused:
+                # Sem limpeza: o .part e os fragmentos são reaproveitados
+                logger.info(f"Download {download_id[:8]} pausado")
+                self.concurrency.forget(download_id)
+
+            elif isinstance(e, DownloadCancelled) or token.cancelled:
                 logger.info(f"Download {download_id[:8]} cancelado com sucesso")
-            else:
-                logger.error(f"Erro no download: {e}")
+                cleanup_partial_files(partial_paths)
+                self._finish_job(job, job.video_id or video_id_global, "failed")
+                self.concurrency.forget(download_id)
 
-                if video_id_global:
-                    self.progress_queue.put(
+                # Conta a entrada como processada no progresso da playlist
+                if parent_id and video_id_global:
+                    self._publish(
                         {
                             "video_id": video_id_global,
-                            "download_id": None,
-                            "status": "error",
+                            "download_id": parent_id,
+                            "status": "cancelled",
                             "progress": 0,
                         }
                     )
+            else:
+                logger.error(f"Erro no download: {e}")
+                self._finish_job(job, job.video_id or video_id_global, "failed")
+                self.concurrency.record_result(
+                    download_id, success=False, throttled=is_throttle_error(e)
+                )
+
+                error_id = video_id_global or download_id
+                if error_id not in announced:
+                    announce(error_id, item_data(error_id, title=job.title or link))
+
+                self._publish(
+                    {
+                        "video_id": error_id,
+                        "download_id": parent_id,
+                        "status": "error",
+                        "progress": 0,
+                        "message": str(e),
+                    }
+                )
 
         finally:
-            self.semaphore.release()
+            phase_ticker.set()
+            self.throughput.remove(download_id)
+            self._release_slot(download_id)
+            # O YoutubeDL pode ter sido registrado depois do cancelamento
+            self.bandwidth.unregister(download_id)
 
             with self.lock:
                 if download_id in self.download_threads:
                     del self.download_threads[download_id]
-
-                if download_id in self.playlist_progress:
-                    logger.info(f"Limpando progresso: {download_id[:8]}")
-                    del self.playlist_progress[download_id]
+                self.running_jobs.pop(download_id, None)
+                for video_id in (job.video_id, tracked_video_id):
+                    if self._video_jobs.get(video_id) == download_id:
+                        del self._video_jobs[video_id]
 
             logger.info(f"Thread de download finalizada: {download_id[:8]}")
@@ -0,0 +1,139 @@
+import heapq
+import itertools
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Dict, List, Optional
+
+from utils.logging_config import setup_logging
+
+logger = setup_logging()
+
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 10
+
+
+@dataclass
+class DownloadJob:
+    link: str
+    formato: str
+    diretorio: str
+    is_playlist: bool = False
+    priority: int = PRIORITY_NORMAL
+    job_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    parent_id: Optional[str] = None
+    video_id: Optional[str] = None
+    title: Optional[str] = None
+    thumbnail: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    partial_path: Optional[str] = None
+
+    @property
+    def lane(self) -> str:
+        return "playlist" if self.is_playlist or self.parent_id else "single"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DownloadJob":
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+
+class DownloadScheduler:
+    """
+    Fila de downloads pendentes com prioridade e controle de slots.
+
+    Cada tipo de job (vídeo único / playlist) tem sua própria fila de
+    prioridade. Entre jobs de mesma prioridade as filas são atendidas em
+    rodízio, evitando que uma playlist grande bloqueie vídeos avulsos.
+    """
+
+    LANES = ("single", "playlist")
+
+    def __init__(self, max_active: int = 3):
+        self.max_active = max_active
+        self.active = 0
+        self._lanes: Dict[str, List] = {lane: [] for lane in self.LANES}
+        self._next_lane = 0
+        self._counter = itertools.count()
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def submit(self, job: DownloadJob) -> int:
+        with self._condition:
+            heapq.heappush(
+                self._lanes[job.lane], (job.priority, next(self._counter), job)
+            )
+            position = self._pending_locked()
+            self._condition.notify_all()
+
+        logger.info(
+            f"Job enfileirado: {job.job_id[:8]} (prioridade={job.priority}, "
+            f"fila={job.lane}, posição={position})"
+        )
+        return position
+
+    def next_job(self, timeout: Optional[float] = None) -> Optional[DownloadJob]:
+        """Bloqueia até existir um job pendente e um slot livre."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._condition:
+            while not self._closed:
+                if self.active < self.max_active and self._pending_locked():
+                    job = self._pop_locked()
+                    self.active += 1
+                    return job
+
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                self._condition.wait(remaining)
+
+            return None
+
+    def set_max_active(self, max_active: int) -> None:
+        """
+        Altera o número de slots em tempo de execução. Reduzir não
+        interrompe downloads em andamento: novos jobs só saem da fila
+        quando os ativos ficarem abaixo do novo limite.
+        """
+        with self._condition:
+            self.max_active = max(int(max_active), 1)
+            self._condition.notify_all()
+
+    def release(self):
+        with self._condition:
+            self.active = max(self.active - 1, 0)
+            self._condition.notify_all()
+
+    def pending_count(self) -> int:
+        with self._condition:
+            return self._pending_locked()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def _pending_locked(self) -> int:
+        return sum(len(lane) for lane in self._lanes.values())
+
+    def _pop_locked(self) -> DownloadJob:
+        best_priority = min(lane[0][0] for lane in self._lanes.values() if lane)
+
+        # Rodízio entre filas que possuem jobs da melhor prioridade
+        for offset in range(len(self.LANES)):
+            lane_name = self.LANES[(self._next_lane + offset) % len(self.LANES)]
+            lane = self._lanes[lane_name]
+            if lane and lane[0][0] == best_priority:
+                self._next_lane = (self.LANES.index(lane_name) + 1) % len(self.LANES)
+                return heapq.heappop(lane)[2]
+
+        raise RuntimeError("Nenhum job pendente")
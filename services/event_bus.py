@@ -0,0 +1,58 @@
+import threading
+from typing import Any, List
+
+from services.progress_channel import ProgressChannel
+from utils.logging_config import setup_logging
+
+logger = setup_logging()
+
+
+class EventBus:
+    """
+    Publicação dos eventos do DownloadManager para vários consumidores.
+
+    Cada subscribe() devolve um ProgressChannel próprio: a sidebar, a
+    barra de progresso, o modo linha de comando ou um teste consomem o
+    mesmo fluxo no seu ritmo, sem que um leitor tire eventos do outro.
+    Quem assina depois só recebe o que for publicado a partir dali.
+    """
+
+    def __init__(self):
+        self._subscribers: List[ProgressChannel] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def subscribe(self) -> ProgressChannel:
+        channel = ProgressChannel()
+        with self._lock:
+            if self._closed:
+                channel.close()
+            else:
+                self._subscribers.append(channel)
+        return channel
+
+    def unsubscribe(self, channel: ProgressChannel) -> None:
+        with self._lock:
+            if channel in self._subscribers:
+                self._subscribers.remove(channel)
+        channel.close()
+
+    def publish(self, event: Any) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for channel in subscribers:
+            channel.put(event)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            subscribers, self._subscribers = self._subscribers, []
+
+        for channel in subscribers:
+            channel.close()
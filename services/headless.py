@@ -0,0 +1,152 @@
+import asyncio
+import time
+from dataclasses import asdict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from services.download_manager import DownloadManager
+from utils.logging_config import setup_logging
+
+logger = setup_logging()
+
+
+IDLE_CHECK_INTERVAL = 0.5
+SHUTDOWN_TIMEOUT = 5
+
+
+class HeadlessDownloadManager(DownloadManager):
+    """
+    DownloadManager sem Flet, para o modo linha de comando.
+
+    Usa o mesmo scheduler, limitador de banda, arquivo de downloads e
+    threads/processos de download da interface; assina o barramento de
+    eventos e entrega cada um a emit().
+    """
+
+    def __init__(
+        self,
+        storage,
+        emit: Callable[[Dict[str, Any]], None],
+        max_downloads: int = 3,
+    ):
+        self.emit = emit
+        self.summary = {"finished": 0, "skipped": 0, "error": 0, "cancelled": 0}
+        self._expanding = 0
+        # Sem persistência de jobs: um batch interrompido não deixa nada
+        # para o resume_pending_jobs da interface baixar depois
+        super().__init__(
+            max_downloads=max_downloads, storage=storage, persist_jobs=False
+        )
+        self.channel = self.events.subscribe()
+
+    def _expand_playlist(self, *args):
+        try:
+            super()._expand_playlist(*args)
+        finally:
+            with self.lock:
+                self._expanding -= 1
+
+    async def run(
+        self, requests: Iterable[Tuple[str, bool]], formato: str, diretorio: str
+    ) -> Dict[str, int]:
+        """Baixa todos os links e retorna a contagem por status final."""
+        self.channel.bind()
+        started = time.monotonic()
+
+        for link, is_playlist in requests:
+            if is_playlist:
+                with self.lock:
+                    self._expanding += 1
+            self.iniciar_download(link, formato, diretorio, is_playlist=is_playlist)
+
+        while True:
+            try:
+                await asyncio.wait_for(self.channel.wait(), timeout=IDLE_CHECK_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+            for update in self.channel.drain():
+                self._handle_update(update)
+
+            if self._idle():
+                break
+
+        self.emit(
+            {
+                "event": "summary",
+                "elapsed": round(time.monotonic() - started, 2),
+                **self.summary,
+            }
+        )
+        return self.summary
+
+    def _idle(self) -> bool:
+        with self.lock:
+            expanding = self._expanding
+        return (
+            not expanding
+            and not self.scheduler.pending_count()
+            and not self.scheduler.active
+            and self.channel.empty()
+        )
+
+    def _handle_update(self, update: Dict[str, Any]) -> None:
+        status = update.get("status")
+        data = update.get("data") or {}
+
+        if status == "bandwidth":
+            self.emit({"event": "bandwidth", **data})
+            return
+
+        if status == "notice":
+            self.emit({"event": "notice", "message": data.get("message")})
+            return
+
+        if status in self.summary:
+            self.summary[status] += 1
+
+        self.emit(self._serialize(update))
+
+    @staticmethod
+    def _serialize(update: Dict[str, Any]) -> Dict[str, Any]:
+        record = {
+            "event": update.get("status"),
+            "video_id": update.get("video_id"),
+        }
+        if update.get("download_id"):
+            record["playlist_id"] = update["download_id"]
+        if "progress" in update:
+            record["progress"] = round(update["progress"] or 0, 4)
+        if update.get("message"):
+            record["message"] = update["message"]
+
+        event = update.get("event")
+        if event:
+            record.update(
+                {
+                    key: value
+                    for key, value in asdict(event).items()
+                    if value is not None and key not in ("video_id", "progress")
+                }
+            )
+
+        data = update.get("data") or {}
+        for key in ("title", "format", "file_path", "timings", "completed", "failed"):
+            if data.get(key):
+                record[key] = data[key]
+
+        return record
+
+    def cancel_all(self, timeout: Optional[float] = SHUTDOWN_TIMEOUT) -> None:
+        """Interrompe os downloads em andamento (Ctrl+C) e limpa os parciais."""
+        with self.lock:
+            tokens = list(self.cancel_tokens.values())
+            threads = list(self.download_threads.values())
+
+        self.scheduler.close()
+        for token in tokens:
+            token.cancel()
+
+        for thread in threads:
+            thread.join(timeout)
+
+        self.shutdown()
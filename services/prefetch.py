@@ -0,0 +1,67 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict
+
+from services.dlp_service import extract_playlist_entries
+from utils.logging_config import setup_logging
+from utils.metadata_cache import canonical_key, is_youtube_playlist_url
+from utils.thumbnail_cache import thumbnail_cache
+from utils.video_info_extractor import VideoInfoExtractor
+
+logger = setup_logging()
+
+
+PREFETCH_WORKERS = 2
+
+_executor = ThreadPoolExecutor(
+    max_workers=PREFETCH_WORKERS, thread_name_prefix="fletube-prefetch"
+)
+_inflight: Dict[str, Future] = {}
+_lock = threading.Lock()
+
+
+def _prefetch(url: str) -> Dict[str, Any]:
+    # A lista da playlist é o que o clique em download consulta primeiro
+    if is_youtube_playlist_url(url):
+        try:
+            extract_playlist_entries(url)
+        except Exception as e:
+            logger.warning(f"Pré-carregamento da playlist falhou: {e}")
+
+    # Info completo (com formatos) no cache em memória: é ele que o
+    # start_download reaproveita com process_ie_result
+    info_dict = VideoInfoExtractor.extract_info_dict(url, full=True)
+
+    thumbnail = info_dict.get("thumbnail")
+    if thumbnail:
+        thumbnail_cache.get(thumbnail, "sidebar")
+
+    logger.info(f"Link pré-carregado: {info_dict.get('title', url)[:50]}")
+    return info_dict
+
+
+def prefetch_link(url: str) -> Future:
+    """
+    Resolve em segundo plano metadados, formatos, entradas de playlist e
+    thumbnail de um link assim que ele aparece (clipboard ou campo de
+    texto), para que o download comece sem esperar a extração.
+
+    Pedidos repetidos do mesmo vídeo reaproveitam o Future em andamento.
+    """
+    key = canonical_key(url, "video")
+
+    with _lock:
+        future = _inflight.get(key)
+        if future is not None:
+            return future
+
+        future = _executor.submit(_prefetch, url)
+        _inflight[key] = future
+
+    def done(f):
+        with _lock:
+            if _inflight.get(key) is f:
+                del _inflight[key]
+
+    future.add_done_callback(done)
+    return future
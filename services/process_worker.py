@@ -0,0 +1,259 @@
+import multiprocessing
+import signal
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from services.cancellation import CancellationToken, bind_token
+from utils.logging_config import setup_logging
+
+logger = setup_logging()
+
+
+WORKER_THREAD = "thread"
+WORKER_PROCESS = "process"
+
+POLL_INTERVAL = 0.1
+TERMINATE_TIMEOUT = 5
+# Tempo para o filho encerrar sozinho (matando o FFmpeg) depois do
+# pedido de cancelamento, antes de terminate()
+CANCEL_GRACE = 3
+
+# Campos do progress hook repassados ao processo principal; o info_dict
+# completo é grande e nem sempre serializável
+PROGRESS_FIELDS = (
+    "status",
+    "downloaded_bytes",
+    "total_bytes",
+    "total_bytes_estimate",
+    "speed",
+    "eta",
+    "fragment_index",
+    "fragment_count",
+    "filename",
+    "tmpfilename",
+)
+INFO_FIELDS = ("id", "title", "thumbnail")
+POSTPROCESSOR_FIELDS = ("status", "postprocessor")
+
+
+def _compact_progress(d: Dict[str, Any]) -> Dict[str, Any]:
+    event = {key: d[key] for key in PROGRESS_FIELDS if key in d}
+    info_dict = d.get("info_dict") or {}
+    event["info_dict"] = {key: info_dict.get(key) for key in INFO_FIELDS}
+    return event
+
+
+def _compact_postprocessor(d: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: d.get(key) for key in POSTPROCESSOR_FIELDS}
+
+
+def _raise_cancelled(signum, frame):
+    # KeyboardInterrupt faz o yt-dlp matar o FFmpeg em andamento
+    # (Popen.communicate_or_kill) antes de o processo sair
+    raise KeyboardInterrupt("Download cancelado pelo usuário")
+
+
+def _worker_main(events, control, link, format, diretorio, options):
+    """Ponto de entrada do processo filho (contexto spawn)."""
+    signal.signal(signal.SIGTERM, _raise_cancelled)
+
+    from services.dlp_service import start_download
+    from utils.metadata_cache import canonical_key, metadata_cache
+
+    if options.get("cached_info"):
+        metadata_cache.set(canonical_key(link, "video"), options["cached_info"])
+
+    live = {}
+    token = CancellationToken()
+
+    def listen_control():
+        # Ajustes vindos do processo principal (ex.: ratelimit) e o pedido
+        # de cancelamento, que aqui mata os subprocessos (FFmpeg) do
+        # próprio filho; no Windows não existe SIGTERM para isso
+        while True:
+            try:
+                message = control.recv()
+            except (EOFError, OSError):
+                break
+
+            if message[0] == "cancel":
+                token.cancel()
+                continue
+
+            _, key, value = message
+            live.setdefault("params", {})[key] = value
+            if "ydl" in live:
+                live["ydl"].params[key] = value
+
+    def send_progress(d):
+        token.raise_if_cancelled()
+        events.send(("progress", _compact_progress(d)))
+
+    def send_postprocess(d):
+        token.raise_if_cancelled()
+        events.send(("postprocess", _compact_postprocessor(d)))
+
+    def on_start(ydl):
+        ydl.params.update(live.get("params", {}))
+        live["ydl"] = ydl
+
+    threading.Thread(target=listen_control, daemon=True).start()
+
+    try:
+        with bind_token(token):
+            result = start_download(
+                link,
+                format,
+                diretorio,
+                send_progress,
+                on_start=on_start,
+                fragment_threads=options.get("fragment_threads", 1),
+                postprocessor_hook=(
+                    send_postprocess if options.get("postprocessor_hook") else None
+                ),
+            )
+        token.raise_if_cancelled()
+        events.send(("result", result))
+    except BaseException as e:
+        events.send(("error", str(e)))
+    finally:
+        events.close()
+
+
+class RemoteParams(dict):
+    """Repasse de ydl.params ao YoutubeDL que roda no processo filho."""
+
+    def __init__(self, send: Callable[[str, Any], None]):
+        super().__init__()
+        self._send = send
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._send(key, value)
+
+
+class RemoteYDL:
+    """Representa o YoutubeDL do filho para quem ajusta params em tempo real."""
+
+    def __init__(self, send: Callable[[str, Any], None]):
+        self.params = RemoteParams(send)
+
+
+def start_download_in_process(
+    link,
+    format,
+    diretorio,
+    progress_hook,
+    on_start=None,
+    fragment_threads=1,
+    postprocessor_hook=None,
+    cancel_token: Optional[CancellationToken] = None,
+):
+    """
+    Mesmo contrato de dlp_service.start_download, mas o yt-dlp roda em um
+    processo separado: extração, regex dos extratores e o merge deixam de
+    disputar o GIL com a UI. Os eventos de progresso voltam por um pipe e
+    são entregues a progress_hook nesta thread. Cancelar o token pede pelo
+    pipe de controle que o filho cancele o próprio token, o que mata o
+    FFmpeg dele; só se o filho não sair em CANCEL_GRACE segundos vem o
+    terminate() (no Windows ele finaliza o processo sem matar os netos).
+    """
+    from utils.metadata_cache import canonical_key, metadata_cache
+
+    context = multiprocessing.get_context("spawn")
+    events_reader, events_writer = context.Pipe(duplex=False)
+    control_reader, control_writer = context.Pipe(duplex=False)
+    send_lock = threading.Lock()
+
+    def send_message(message):
+        with send_lock:
+            try:
+                control_writer.send(message)
+            except (BrokenPipeError, OSError):
+                pass
+
+    def send_control(key, value):
+        send_message(("param", key, value))
+
+    options = {
+        "fragment_threads": fragment_threads,
+        "postprocessor_hook": postprocessor_hook is not None,
+        "cached_info": metadata_cache.get(canonical_key(link, "video")),
+    }
+
+    process = context.Process(
+        target=_worker_main,
+        args=(events_writer, control_reader, link, format, diretorio, options),
+        name="fletube-download",
+        daemon=True,
+    )
+    process.start()
+    # As pontas usadas pelo filho só ficam abertas lá
+    events_writer.close()
+    control_reader.close()
+    logger.info(f"Download em processo separado (pid={process.pid}): {link}")
+
+    if cancel_token:
+        cancel_token.on_cancel(lambda: send_message(("cancel", None)))
+
+    if on_start:
+        on_start(RemoteYDL(send_control))
+
+    try:
+        while True:
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+
+            if not events_reader.poll(POLL_INTERVAL):
+                if not process.is_alive() and not events_reader.poll():
+                    raise Exception(
+                        f"Processo de download encerrado (código {process.exitcode})"
+                    )
+                continue
+
+            try:
+                kind, payload = events_reader.recv()
+            except EOFError:
+                raise Exception(
+                    f"Processo de download encerrado (código {process.exitcode})"
+                )
+
+            if kind == "progress":
+                progress_hook(payload)
+            elif kind == "postprocess":
+                if postprocessor_hook:
+                    postprocessor_hook(payload)
+            elif kind == "result":
+                return payload
+            elif kind == "error":
+                if cancel_token:
+                    cancel_token.raise_if_cancelled()
+                raise Exception(payload)
+
+    except BaseException:
+        cancelled = bool(cancel_token and cancel_token.cancelled)
+        _terminate(process, grace=CANCEL_GRACE if cancelled else 0)
+        raise
+
+    finally:
+        process.join(TERMINATE_TIMEOUT)
+        events_reader.close()
+        with send_lock:
+            control_writer.close()
+
+
+def _terminate(process, grace: float = 0) -> None:
+    if grace:
+        # Cancelamento cooperativo: o filho mata o FFmpeg e sai sozinho
+        process.join(grace)
+
+    if not process.is_alive():
+        return
+
+    logger.info(f"Encerrando processo de download (pid={process.pid})")
+    process.terminate()
+    process.join(TERMINATE_TIMEOUT)
+
+    if process.is_alive():
+        logger.warning(f"Processo {process.pid} não respondeu, forçando")
+        process.kill()
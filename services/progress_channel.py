@@ -0,0 +1,77 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Any, List, Optional
+
+from utils.logging_config import setup_logging
+
+logger = setup_logging()
+
+
+class ProgressChannel:
+    """
+    Canal entre as threads de download e o loop asyncio da UI.
+
+    put() pode ser chamado de qualquer thread: o item vai para um deque e
+    o consumidor é acordado via loop.call_soon_threadsafe. Sem eventos, o
+    consumidor fica parado em wait() sem consumir CPU.
+    """
+
+    def __init__(self):
+        self._items: deque = deque()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._event: Optional[asyncio.Event] = None
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def bind(self) -> None:
+        """Associa o canal ao loop em execução; chamado pelo consumidor."""
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._event = asyncio.Event()
+            if self._items or self._closed:
+                self._event.set()
+
+    def put(self, item: Any) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._items.append(item)
+            self._wake_locked()
+
+    def _wake_locked(self) -> None:
+        if self._loop is None or self._event is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:
+            # Loop já encerrado: não há mais quem consumir
+            self._closed = True
+
+    async def wait(self) -> bool:
+        """Espera até haver itens; retorna False quando o canal foi fechado."""
+        if not self._closed:
+            await self._event.wait()
+            self._event.clear()
+        return not (self._closed and not self._items)
+
+    def drain(self) -> List[Any]:
+        with self._lock:
+            items = list(self._items)
+            self._items.clear()
+        return items
+
+    def empty(self) -> bool:
+        return not self._items
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wake_locked()
+        logger.info("Canal de progresso fechado")
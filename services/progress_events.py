@@ -0,0 +1,138 @@
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+# Constante de tempo da média móvel de velocidade: picos de poucos
+# segundos não fazem o ETA pular
+SPEED_TIME_CONSTANT = 3.0
+
+# Postprocessors do yt-dlp que aparecem na UI como fase própria; os
+# demais (MoveFiles, Fixup...) só entram na medição de tempo
+POSTPROCESSOR_PHASES = {
+    "Merger": "merging",
+    "ExtractAudio": "converting",
+    "VideoRemuxer": "converting",
+    "VideoConvertor": "converting",
+}
+
+
+@dataclass
+class ProgressEvent:
+    """Estado de progresso de um vídeo, como chega à UI."""
+
+    video_id: str
+    phase: str
+    progress: float
+    downloaded_bytes: Optional[int] = None
+    total_bytes: Optional[int] = None
+    speed: Optional[float] = None
+    eta: Optional[int] = None
+    fragment_index: Optional[int] = None
+    fragment_count: Optional[int] = None
+    elapsed: Optional[float] = None
+
+
+class SpeedEstimator:
+    """
+    Média móvel exponencial da velocidade de um download, ponderada pelo
+    tempo entre amostras (os hooks do yt-dlp não chegam em ritmo fixo).
+    """
+
+    def __init__(self, time_constant: float = SPEED_TIME_CONSTANT):
+        self.time_constant = time_constant
+        self.speed: Optional[float] = None
+        self._last_sample: Optional[float] = None
+
+    def update(self, speed: Optional[float], now: Optional[float] = None):
+        if speed is None:
+            return self.speed
+
+        now = time.monotonic() if now is None else now
+        if self.speed is None or self._last_sample is None:
+            self.speed = float(speed)
+        else:
+            elapsed = max(now - self._last_sample, 0.0)
+            alpha = 1 - math.exp(-elapsed / self.time_constant)
+            self.speed += alpha * (speed - self.speed)
+
+        self._last_sample = now
+        return self.speed
+
+    def eta(self, downloaded: Optional[int], total: Optional[int]) -> Optional[int]:
+        if not self.speed or not total or downloaded is None:
+            return None
+        return max(int((total - downloaded) / self.speed), 0)
+
+    def event(self, video_id: str, d: Dict[str, Any]) -> ProgressEvent:
+        """Converte o dicionário do progress hook em um ProgressEvent."""
+        downloaded = d.get("downloaded_bytes")
+        total = d.get("total_bytes") or d.get("total_bytes_estimate")
+        speed = self.update(d.get("speed"))
+
+        progress = 0.0
+        if downloaded is not None and total:
+            progress = min(downloaded / total, 1.0)
+
+        return ProgressEvent(
+            video_id=video_id,
+            phase=d.get("status", "downloading"),
+            progress=progress,
+            downloaded_bytes=downloaded,
+            total_bytes=total,
+            speed=speed,
+            eta=self.eta(downloaded, total),
+            fragment_index=d.get("fragment_index"),
+            fragment_count=d.get("fragment_count"),
+        )
+
+
+class ThroughputMeter:
+    """Soma das velocidades suavizadas de todos os downloads ativos."""
+
+    def __init__(self):
+        self._speeds: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def update(self, job_id: str, speed: Optional[float]) -> None:
+        if speed is None:
+            return
+        with self._lock:
+            self._speeds[job_id] = speed
+
+    def remove(self, job_id: str) -> None:
+        with self._lock:
+            self._speeds.pop(job_id, None)
+
+    def total(self) -> float:
+        with self._lock:
+            return sum(self._speeds.values())
+
+    def active(self) -> int:
+        with self._lock:
+            return len(self._speeds)
+
+
+class StageTimer:
+    """Duração de cada etapa de um job (download, Merger, ExtractAudio...)."""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._started: Dict[str, float] = {}
+
+    def start(self, stage: str) -> None:
+        self._started[stage] = time.monotonic()
+
+    def elapsed(self, stage: str) -> float:
+        started = self._started.get(stage)
+        return time.monotonic() - started if started is not None else 0.0
+
+    def finish(self, stage: str) -> Optional[float]:
+        started = self._started.pop(stage, None)
+        if started is None:
+            return None
+
+        duration = time.monotonic() - started
+        self.timings[stage] = round(self.timings.get(stage, 0.0) + duration, 2)
+        return duration
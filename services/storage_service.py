@@ -1,9 +1,14 @@
 import os
+import threading
+import time
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from utils.ClientStoragev2 import SecureStorage
+from utils.download_archive import archive_id, download_archive
 from utils.logging_config import setup_logging
+from utils.search_index import SearchIndex
+from utils.sqlite_storage import SQLiteStorage
 
 logger = setup_logging()
 
@@ -13,6 +18,8 @@ class StorageError(Exception):
 
 
 class FletubeStorage:
+    DOWNLOADS_BACKENDS = ("json", "sqlite")
+
     def __init__(self, base_path: Optional[Path] = None):
         if base_path is None:
             base_path = Path.home() / ".fletube"
@@ -26,26 +33,60 @@ class FletubeStorage:
 
         secret_key = os.getenv("SECURE_STORAGE_SECRET_KEY")
 
+        self.base_path = base_path
+
+        # Índice de busca do histórico (backend JSON), construído na
+        # primeira consulta e mantido por save_download/delete_download/
+        # clear_downloads. save_download roda nas threads de download:
+        # índice e cache da última busca só mudam sob _index_lock
+        self.search_index = SearchIndex()
+        self._index_ready = False
+        self._last_search = None
+        self._index_lock = threading.RLock()
+
         try:
-            self.downloads = SecureStorage(
-                storage_path=base_path / "downloads.json",
+            self.settings = SecureStorage(
+                storage_path=base_path / "settings.json",
                 auto_save=True,
                 encrypt_data=False,
+                flush_interval_ms=250,
             )
-            logger.info("Downloads storage inicializado")
+            logger.info("Settings storage inicializado")
+        except Exception as e:
+            logger.error(f"Falha no settings storage: {e}")
+            raise
+
+        self.downloads_backend = self.get_setting("downloads_backend", "json")
+        if self.downloads_backend not in self.DOWNLOADS_BACKENDS:
+            logger.warning(f"Backend desconhecido: {self.downloads_backend}")
+            self.downloads_backend = "json"
+
+        try:
+            if self.downloads_backend == "sqlite":
+                self.downloads = SQLiteStorage(base_path / "downloads.db")
+                self._migrate_json_downloads(base_path / "downloads.json")
+            else:
+                self.downloads = SecureStorage(
+                    storage_path=base_path / "downloads.json",
+                    auto_save=True,
+                    encrypt_data=False,
+                )
+                self._migrate_sqlite_downloads(base_path / "downloads.db")
+            logger.info(f"Downloads storage inicializado ({self.downloads_backend})")
         except Exception as e:
             logger.error(f"Falha no downloads storage: {e}")
             raise
 
         try:
-            self.settings = SecureStorage(
-                storage_path=base_path / "settings.json",
+            self.jobs = SecureStorage(
+                storage_path=base_path / "jobs.json",
                 auto_save=True,
                 encrypt_data=False,
+                flush_interval_ms=500,
             )
-            logger.info("Settings storage inicializado")
+            logger.info("Jobs storage inicializado")
         except Exception as e:
-            logger.error(f"Falha no settings storage: {e}")
+            logger.error(f"Falha no jobs storage: {e}")
             raise
 
         try:
@@ -66,9 +107,79 @@ class FletubeStorage:
             logger.error(f"Falha no credentials storage: {e}")
             self.credentials = None
 
+    def _migrate_json_downloads(self, json_path: Path):
+        """
+        Migração do histórico em JSON para o SQLite.
+
+        Depois de importado, o arquivo JSON é renomeado para .migrated e
+        não é lido novamente; voltar ao backend JSON faz o caminho inverso
+        (_migrate_sqlite_downloads).
+        """
+        if not json_path.exists() and not json_path.with_suffix(".journal").exists():
+            return
+
+        try:
+            legacy = SecureStorage(
+                storage_path=json_path, auto_save=False, encrypt_data=False
+            )
+            keys = legacy.list_keys(namespace="completed")
+            imported = self.downloads.import_items(
+                ((k, legacy.get(k, namespace="completed")) for k in keys),
+                namespace="completed",
+            )
+            legacy.close()
+
+            for path in (json_path, json_path.with_suffix(".journal")):
+                if path.exists():
+                    path.replace(path.with_name(path.name + ".migrated"))
+
+            logger.info(f"Histórico migrado para SQLite: {imported} downloads")
+        except Exception as e:
+            logger.error(f"Erro ao migrar histórico para SQLite: {e}")
+
+    def _migrate_sqlite_downloads(self, db_path: Path):
+        """
+        Migração do histórico em SQLite de volta para o JSON, quando o
+        backend volta a ser "json". O banco (e os arquivos do WAL) é
+        renomeado para .migrated depois de exportado.
+        """
+        if not db_path.exists():
+            return
+
+        try:
+            legacy = SQLiteStorage(db_path)
+            keys = legacy.list_keys(namespace="completed")
+            with self.downloads.batch():
+                for key in keys:
+                    self.downloads.set(
+                        key,
+                        legacy.get(key, namespace="completed"),
+                        namespace="completed",
+                    )
+            legacy.close()
+
+            for suffix in ("", "-wal", "-shm"):
+                path = db_path.with_name(db_path.name + suffix)
+                if path.exists():
+                    path.replace(path.with_name(path.name + ".migrated"))
+
+            logger.info(f"Histórico migrado para JSON: {len(keys)} downloads")
+        except Exception as e:
+            logger.error(f"Erro ao migrar histórico para JSON: {e}")
+
     def save_download(self, download_id: str, data: Dict[str, Any]):
         try:
+            data = {"created_at": time.time(), **data}
             self.downloads.set(download_id, data, namespace="completed")
+            # Histórico e arquivo de downloads andam juntos (ex.: desfazer
+            # uma exclusão volta a marcar o vídeo como baixado)
+            download_archive.add(
+                archive_id(data.get("extractor"), download_id), data.get("format", "")
+            )
+            with self._index_lock:
+                if self._index_ready:
+                    self.search_index.add(download_id, data)
+                self._last_search = None
             logger.info(f"Download salvo: {download_id}")
         except Exception as e:
             logger.error(f"Erro ao salvar download {download_id}: {e}")
@@ -82,21 +193,100 @@ class FletubeStorage:
 
     def list_downloads(self) -> List[Dict[str, Any]]:
         try:
-            keys = self.downloads.list_keys(namespace="completed")
+            return [d for d in self.downloads.values(namespace="completed") if d]
+        except Exception as e:
+            logger.error(f"Erro ao listar downloads: {e}")
+            return []
+
+    def _ensure_index(self):
+        with self._index_lock:
+            if not self._index_ready:
+                self.search_index.build(self.list_downloads())
+                self._index_ready = True
+
+    def _search_ids(
+        self, text: Optional[str], format: Optional[str], sort_by: str
+    ) -> List[str]:
+        # A última busca fica guardada: a paginação do histórico pede
+        # várias fatias do mesmo resultado
+        key = (text or "", format or "", sort_by)
+        with self._index_lock:
+            if self._last_search and self._last_search[0] == key:
+                return self._last_search[1]
+
+            self._ensure_index()
+            ids = self.search_index.search(text=text, format=format, sort_by=sort_by)
+            self._last_search = (key, ids)
+            return ids
+
+    def count_downloads(
+        self, text: Optional[str] = None, format: Optional[str] = None
+    ) -> int:
+        try:
+            if isinstance(self.downloads, SQLiteStorage):
+                return self.downloads.count(
+                    namespace="completed", text=text, format=format
+                )
+            if text or format:
+                return len(self._search_ids(text, format, "title"))
+            return len(self.downloads.list_keys(namespace="completed"))
+        except Exception as e:
+            logger.error(f"Erro ao contar downloads: {e}")
+            return 0
+
+    def query_downloads(
+        self,
+        text: Optional[str] = None,
+        format: Optional[str] = None,
+        sort_by: str = "title",
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        try:
+            if isinstance(self.downloads, SQLiteStorage):
+                # Filtro, ordenação e paginação direto no banco (FTS5)
+                return self.downloads.query(
+                    namespace="completed",
+                    text=text,
+                    format=format,
+                    sort_by=sort_by,
+                    limit=limit,
+                    offset=offset,
+                )
+
+            ids = self._search_ids(text, format, sort_by)
+            if limit is not None:
+                ids = ids[offset : offset + limit]
+            else:
+                ids = ids[offset:]
+
             downloads = []
-            for k in keys:
-                download = self.get_download(k)
-                if download:
-                    downloads.append(download)
+            for download_id in ids:
+                item = self.get_download(download_id)
+                if item:
+                    downloads.append(item)
             return downloads
         except Exception as e:
-            logger.error(f"Erro ao listar downloads: {e}")
+            logger.error(f"Erro ao consultar downloads: {e}")
             return []
 
     def delete_download(self, download_id: str) -> bool:
         try:
+            item = self.get_download(download_id) or {}
             result = self.downloads.delete(download_id, namespace="completed")
+            with self._index_lock:
+                self.search_index.remove(download_id)
+                self._last_search = None
             if result:
+                # Sem isso o vídeo nunca mais seria baixado nesse formato
+                download_archive.discard(
+                    [
+                        (
+                            archive_id(item.get("extractor"), download_id),
+                            item.get("format", ""),
+                        )
+                    ]
+                )
                 logger.info(f"Download removido: {download_id}")
             return result
         except Exception as e:
@@ -105,11 +295,49 @@ class FletubeStorage:
 
     def clear_downloads(self):
         try:
+            items = self.list_downloads()
             self.downloads.clear(namespace="completed")
+            download_archive.discard(
+                (
+                    archive_id(item.get("extractor"), item.get("id")),
+                    item.get("format", ""),
+                )
+                for item in items
+            )
+            with self._index_lock:
+                self.search_index.clear()
+                self._last_search = None
             logger.info("Historico de downloads limpo")
         except Exception as e:
             logger.error(f"Erro ao limpar downloads: {e}")
 
+    def save_job(self, job_id: str, data: Dict[str, Any]):
+        try:
+            self.jobs.set(job_id, data, namespace="pending")
+        except Exception as e:
+            logger.error(f"Erro ao salvar job {job_id}: {e}")
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            return self.jobs.get(job_id, namespace="pending")
+        except Exception as e:
+            logger.error(f"Erro ao recuperar job {job_id}: {e}")
+            return None
+
+    def delete_job(self, job_id: str) -> bool:
+        try:
+            return self.jobs.delete(job_id, namespace="pending")
+        except Exception as e:
+            logger.error(f"Erro ao deletar job {job_id}: {e}")
+            return False
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        try:
+            return [j for j in self.jobs.values(namespace="pending") if j]
+        except Exception as e:
+            logger.error(f"Erro ao listar jobs: {e}")
+            return []
+
     def get_setting(self, key: str, default: Any = None) -> Any:
         try:
             return self.settings.get(key, namespace="app", default=default)
@@ -123,6 +351,14 @@ class FletubeStorage:
         except Exception as e:
             logger.error(f"Erro ao salvar setting {key}: {e}")
 
+    def set_settings(self, values: Dict[str, Any]):
+        try:
+            with self.settings.batch():
+                for key, value in values.items():
+                    self.settings.set(key, value, namespace="app")
+        except Exception as e:
+            logger.error(f"Erro ao salvar settings: {e}")
+
     def get_all_settings(self) -> Dict[str, Any]:
         try:
             keys = self.settings.list_keys(namespace="app")
@@ -178,6 +414,24 @@ class FletubeStorage:
         except Exception as e:
             logger.error(f"Erro ao limpar credenciais: {e}")
 
+    def flush(self):
+        try:
+            self.settings.flush()
+            self.jobs.flush()
+            if isinstance(self.downloads, SecureStorage):
+                self.downloads.flush()
+            if self.credentials:
+                self.credentials.flush()
+        except Exception as e:
+            logger.error(f"Erro ao gravar alterações pendentes: {e}")
+
+    def close(self):
+        self.flush()
+        for storage in (self.settings, self.downloads, self.jobs, self.credentials):
+            if storage is not None:
+                storage.close()
+        logger.info("Storage encerrado")
+
     def export_all(self) -> Dict[str, Any]:
         try:
             export_data = {
@@ -203,6 +457,7 @@ class FletubeStorage:
 
             info = {
                 "downloads_count": len(downloads_keys),
+                "downloads_backend": self.downloads_backend,
                 "settings_count": len(settings_keys),
                 "secure_available": self.credentials is not None,
                 "credentials_available": self.credentials is not None,
@@ -0,0 +1,53 @@
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+import services.dlp_service
+import services.download_manager
+import services.prefetch
+import services.storage_service
+import utils.download_archive
+import utils.metadata_cache
+import utils.thumbnail_cache
+import utils.video_info_extractor
+from utils.download_archive import DownloadArchive
+from utils.metadata_cache import PersistentMetadataCache
+from utils.thumbnail_cache import ThumbnailCache
+
+# Módulos que importam os singletons gravados em ~/.fletube pelo nome
+SINGLETON_USERS = {
+    "download_archive": (
+        "utils.download_archive",
+        "services.download_manager",
+        "services.dlp_service",
+        "services.storage_service",
+    ),
+    "disk_metadata_cache": ("utils.metadata_cache", "utils.video_info_extractor"),
+    "thumbnail_cache": (
+        "utils.thumbnail_cache",
+        "services.prefetch",
+        "partials.download_sidebar",
+        "pages.history_page",
+    ),
+}
+
+
+@pytest.fixture(autouse=True)
+def fletube_home(tmp_path, monkeypatch):
+    """Arquivo de downloads e caches em tmp_path, nunca no home real."""
+    home = tmp_path / "fletube_home"
+    singletons = SimpleNamespace(
+        download_archive=DownloadArchive(home / "archives"),
+        disk_metadata_cache=PersistentMetadataCache(home / "metadata_cache.db"),
+        thumbnail_cache=ThumbnailCache(home / "thumbnails"),
+    )
+
+    for name, modules in SINGLETON_USERS.items():
+        for module_name in modules:
+            module = sys.modules.get(module_name)
+            if module is not None:
+                monkeypatch.setattr(module, name, getattr(singletons, name))
+
+    yield singletons
+    singletons.disk_metadata_cache.close()
@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+from yt_dlp import YoutubeDL
+from yt_dlp.downloader.fragment import HttpQuietDownloader
+
+import services.dlp_service  # noqa: F401 - relê o limite nos fragmentos
+from services.bandwidth import FRAGMENT_RATELIMIT, BandwidthLimiter
+
+
+def fake_ydl():
+    return SimpleNamespace(params={})
+
+
+def test_fragment_connections_share_the_job_rate():
+    limiter = BandwidthLimiter()
+    limiter.configure(limit_kbps=4000)
+
+    fragmented, progressive = fake_ydl(), fake_ydl()
+    limiter.register("a", fragmented, fragment_threads=4)
+    limiter.register("b", progressive)
+
+    assert fragmented.params["ratelimit"] == 2000 * 1024
+    assert fragmented.params[FRAGMENT_RATELIMIT] == 500 * 1024
+    assert progressive.params[FRAGMENT_RATELIMIT] == 2000 * 1024
+
+    # As 4 conexões juntas não passam da fatia do download
+    assert 4 * fragmented.params[FRAGMENT_RATELIMIT] <= limiter.per_job_rate()
+
+    limiter.unregister("b")
+    assert fragmented.params[FRAGMENT_RATELIMIT] == 1000 * 1024
+
+
+def test_job_cap_and_unlimited_rates():
+    limiter = BandwidthLimiter()
+    limiter.configure(limit_kbps=3000, job_cap_kbps=1000)
+
+    ydl = fake_ydl()
+    limiter.register("a", ydl, fragment_threads=3)
+    assert ydl.params["ratelimit"] == 1000 * 1024
+    assert ydl.params[FRAGMENT_RATELIMIT] == 1000 * 1024 // 3
+
+    limiter.configure(limit_kbps=0, job_cap_kbps=0)
+    assert ydl.params["ratelimit"] is None
+    assert ydl.params[FRAGMENT_RATELIMIT] is None
+
+
+def test_running_fragment_downloader_reads_live_limit(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("time.sleep", sleeps.append)
+
+    ydl = YoutubeDL({"quiet": True, FRAGMENT_RATELIMIT: 1000})
+    # Cópia de params feita pelo yt-dlp no início do arquivo
+    dl = HttpQuietDownloader(ydl, {**ydl.params, "ratelimit": 1000})
+
+    ydl.params[FRAGMENT_RATELIMIT] = 500
+    dl.slow_down(start_time=0.0, now=1.0, byte_counter=1000)
+
+    assert dl.params["ratelimit"] == 500
+    assert sleeps == [1.0]
+
+
+def test_fragment_patch_falls_back_without_yt_dlp_internals(monkeypatch):
+    monkeypatch.setattr(services.dlp_service, "HttpQuietDownloader", None)
+    assert services.dlp_service._patch_fragment_slow_down() is False
@@ -0,0 +1,129 @@
+import time
+
+import pytest
+from yt_dlp import YoutubeDL
+
+import services.dlp_service as dlp_service
+import services.download_manager as download_manager
+from services.download_manager import DownloadManager
+from services.download_queue import DownloadJob
+from services.storage_service import FletubeStorage
+from test_headless import fake_start_download
+
+
+class ArchivedYDL(YoutubeDL):
+    """Vídeo de outro site já registrado no arquivo de downloads."""
+
+    def extract_info(self, url, download=True, **kwargs):
+        return {
+            "id": "abc",
+            "title": "abc",
+            "extractor_key": "Vimeo",
+            "__write_download_archive": "ignore",
+        }
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(download_manager, "start_download", fake_start_download)
+    storage = FletubeStorage(tmp_path)
+    manager = DownloadManager(storage=storage)
+    yield manager
+    manager.shutdown()
+    storage.close()
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_new_download_of_a_cancelled_video_is_not_cancelled(manager, tmp_path):
+    video_id = "abc"
+    link = f"https://example.com/v/{video_id}"
+
+    manager.iniciar_download(link, "mp4", str(tmp_path))
+    assert wait_for(lambda: video_id in manager._video_jobs)
+    manager.cancel_download(video_id)
+    assert wait_for(lambda: not manager.download_threads)
+
+    manager.iniciar_download(link, "mp4", str(tmp_path))
+
+    assert wait_for(
+        lambda: any(d["id"] == video_id for d in manager.storage.list_downloads())
+    )
+    assert not manager.is_cancelled(video_id)
+
+
+def test_playlist_entry_of_a_cancelled_video_is_not_cancelled(
+    manager, tmp_path, monkeypatch
+):
+    video_id = "abc"
+    monkeypatch.setattr(
+        download_manager,
+        "extract_playlist_entries",
+        lambda link: {
+            "entries": [{"id": video_id, "url": f"https://example.com/v/{video_id}"}]
+        },
+    )
+    # Cancelado antes, em outra playlist
+    manager.cancel_download(video_id)
+    channel = manager.events.subscribe()
+
+    manager.iniciar_download(
+        "https://example.com/list/b", "mp4", str(tmp_path), is_playlist=True
+    )
+
+    assert wait_for(
+        lambda: any(d["id"] == video_id for d in manager.storage.list_downloads())
+    )
+    statuses = [update["status"] for update in channel.drain()]
+    assert "cancelled" not in statuses
+    assert not manager.is_cancelled(video_id)
+
+
+def test_job_cancelled_while_pending_never_starts(manager, tmp_path, monkeypatch):
+    started = []
+    monkeypatch.setattr(
+        download_manager, "start_download", lambda *args, **kwargs: started.append(1)
+    )
+    job = DownloadJob(
+        link="https://example.com/v/abc",
+        formato="mp4",
+        diretorio=str(tmp_path),
+        video_id="abc",
+    )
+
+    # Ex.: job retomado que ainda aguarda um slot na fila
+    manager.cancel_download("abc")
+    manager.scheduler.submit(job)
+
+    assert wait_for(
+        lambda: not manager.scheduler.pending_count() and not manager.download_threads
+    )
+    assert started == []
+
+
+def test_archive_skip_from_yt_dlp_is_published_as_skipped(
+    manager, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(dlp_service, "YoutubeDL", ArchivedYDL)
+    monkeypatch.setattr(dlp_service.metadata_cache, "get", lambda key: None)
+    monkeypatch.setattr(download_manager, "start_download", dlp_service.start_download)
+    channel = manager.events.subscribe()
+
+    manager.iniciar_download("https://vimeo.com/123", "mp4", str(tmp_path))
+
+    statuses = []
+
+    def skipped():
+        statuses.extend(update["status"] for update in channel.drain())
+        return "skipped" in statuses
+
+    assert wait_for(skipped)
+    assert "finished" not in statuses
+    assert manager.storage.list_downloads() == []
@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+import pytest
+
+import services.download_manager as download_manager
+from services.download_manager import DownloadManager
+from services.headless import HeadlessDownloadManager
+from services.storage_service import FletubeStorage
+
+
+def fake_start_download(link, formato, diretorio, progress_hook, **kwargs):
+    video_id = link.rsplit("/", 1)[-1]
+    for i in range(1, 6):
+        progress_hook(
+            {
+                "status": "downloading",
+                "downloaded_bytes": i * 100,
+                "total_bytes": 500,
+                "speed": 1000.0,
+                "info_dict": {"id": video_id, "title": video_id},
+            }
+        )
+        time.sleep(0.05)
+    return {"id": video_id, "title": video_id, "filepath": f"/tmp/{video_id}.mp4"}
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(download_manager, "start_download", fake_start_download)
+    storage = FletubeStorage(tmp_path)
+    yield storage
+    storage.close()
+
+
+def assert_nothing_to_resume(storage):
+    assert storage.list_jobs() == []
+
+    manager = DownloadManager(storage=storage)
+    try:
+        assert manager.resume_pending_jobs() == 0
+    finally:
+        manager.shutdown()
+
+
+def test_batch_run_leaves_no_pending_jobs(storage, tmp_path):
+    events = []
+    manager = HeadlessDownloadManager(storage, events.append, max_downloads=1)
+
+    links = [(f"https://example.com/v/{name}", False) for name in ("aaa", "bbb")]
+    summary = asyncio.run(manager.run(links, "mp4", str(tmp_path)))
+    manager.shutdown()
+
+    assert summary["finished"] == 2
+    assert {d["id"] for d in storage.list_downloads()} == {"aaa", "bbb"}
+    assert_nothing_to_resume(storage)
+
+
+def test_interrupted_batch_leaves_no_pending_jobs(storage, tmp_path):
+    manager = HeadlessDownloadManager(storage, lambda record: None, max_downloads=1)
+
+    for name in ("aaa", "bbb", "ccc"):
+        manager.iniciar_download(f"https://example.com/v/{name}", "mp4", str(tmp_path))
+
+    time.sleep(0.1)
+    assert manager.scheduler.pending_count() == 2
+
+    manager.cancel_all()
+
+    assert_nothing_to_resume(storage)
@@ -0,0 +1,23 @@
+import pytest
+
+from utils.instance_lock import InstanceLock, StorageLockedError
+
+# main importa as páginas, que dependem do cliente do Supabase
+pytest.importorskip("supabase")
+import main  # noqa: E402
+
+
+def test_app_refuses_storage_locked_by_another_process(tmp_path, monkeypatch):
+    lock_path = tmp_path / "fletube.lock"
+    monkeypatch.setattr(main, "storage_lock", lambda: InstanceLock(lock_path))
+    monkeypatch.setattr(
+        main, "FletubeStorage", lambda: pytest.fail("storage aberto sem a trava")
+    )
+
+    batch_lock = InstanceLock(lock_path)
+    assert batch_lock.acquire()
+    try:
+        with pytest.raises(StorageLockedError):
+            main.AppState(page=None)
+    finally:
+        batch_lock.release()
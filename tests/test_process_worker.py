@@ -0,0 +1,46 @@
+import multiprocessing
+import signal
+import sys
+import time
+
+import services.dlp_service as dlp_service
+from services.process_worker import _worker_main
+from yt_dlp.utils import Popen
+
+
+def test_cancel_over_control_pipe_kills_child_subprocesses(monkeypatch):
+    spawned = []
+
+    def fake_start_download(link, formato, diretorio, progress_hook, **kwargs):
+        # Simula o FFmpeg aberto pelo yt-dlp enquanto o download avança
+        spawned.append(Popen([sys.executable, "-c", "import time; time.sleep(30)"]))
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            progress_hook({"status": "downloading", "info_dict": {}})
+            time.sleep(0.01)
+        return {"id": "abc"}
+
+    monkeypatch.setattr(dlp_service, "start_download", fake_start_download)
+
+    events_reader, events_writer = multiprocessing.Pipe(duplex=False)
+    control_reader, control_writer = multiprocessing.Pipe(duplex=False)
+    control_writer.send(("cancel", None))
+
+    previous_handler = signal.getsignal(signal.SIGTERM)
+    started = time.monotonic()
+    try:
+        _worker_main(events_writer, control_reader, "https://x/abc", "mp4", ".", {})
+    finally:
+        signal.signal(signal.SIGTERM, previous_handler)
+
+    assert time.monotonic() - started < 5
+    assert spawned[0].wait(5) is not None
+
+    kinds = []
+    try:
+        while True:
+            kinds.append(events_reader.recv()[0])
+    except EOFError:
+        pass
+    assert kinds[-1] == "error"
+    assert "result" not in kinds
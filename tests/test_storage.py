@@ -0,0 +1,47 @@
+from services.storage_service import FletubeStorage
+
+
+def reopen_with_backend(storage, base_path, backend):
+    storage.set_setting("downloads_backend", backend)
+    storage.close()
+    return FletubeStorage(base_path)
+
+
+def test_history_survives_switching_backends_both_ways(tmp_path):
+    storage = FletubeStorage(tmp_path)
+    storage.save_download("aaa", {"id": "aaa", "title": "Primeiro"})
+
+    storage = reopen_with_backend(storage, tmp_path, "sqlite")
+    assert storage.downloads_backend == "sqlite"
+    assert [d["id"] for d in storage.list_downloads()] == ["aaa"]
+    storage.save_download("bbb", {"id": "bbb", "title": "Segundo"})
+
+    storage = reopen_with_backend(storage, tmp_path, "json")
+    assert storage.downloads_backend == "json"
+    assert {d["id"] for d in storage.list_downloads()} == {"aaa", "bbb"}
+    assert not (tmp_path / "downloads.db").exists()
+
+    storage = reopen_with_backend(storage, tmp_path, "sqlite")
+    assert {d["id"] for d in storage.list_downloads()} == {"aaa", "bbb"}
+    storage.close()
+
+
+def test_deleting_history_allows_downloading_again(tmp_path, fletube_home):
+    archive = fletube_home.download_archive
+    storage = FletubeStorage(tmp_path)
+    item = {"id": "aaa", "format": "mp4", "extractor": "Youtube"}
+
+    storage.save_download("aaa", item)
+    assert archive.contains("youtube aaa", "mp4")
+
+    storage.delete_download("aaa")
+    assert not archive.contains("youtube aaa", "mp4")
+    assert "youtube aaa" not in archive.archive_path("mp4").read_text()
+
+    # Desfazer a exclusão volta a marcar o vídeo
+    storage.save_download("aaa", item)
+    storage.save_download("bbb", {"id": "bbb", "format": "mp3"})
+    storage.clear_downloads()
+    assert not archive.contains("youtube aaa", "mp4")
+    assert not archive.contains("youtube bbb", "mp3")
+    storage.close()
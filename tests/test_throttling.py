@@ -0,0 +1,99 @@
+import time
+
+import pytest
+from yt_dlp import YoutubeDL
+from yt_dlp.utils import DownloadError
+
+import services.dlp_service as dlp_service
+import services.download_manager as download_manager
+from services.concurrency import is_throttle_error
+from services.download_manager import DownloadManager
+from services.storage_service import FletubeStorage
+
+THROTTLE_ERROR = "[youtube] abc: HTTP Error 429: Too Many Requests"
+
+
+class ThrottledYDL(YoutubeDL):
+    """Reporta um 429 como o extrator faria, sem acessar a rede."""
+
+    def extract_info(self, url, download=True, **kwargs):
+        self.report_error(THROTTLE_ERROR)
+        return None
+
+
+class SkippedFragmentYDL(YoutubeDL):
+    """Download concluído, mas com fragmentos pulados por 429."""
+
+    def extract_info(self, url, download=True, **kwargs):
+        self.report_warning("fragment 3 not found (HTTP Error 429), skipping")
+        return {
+            "id": "abc",
+            "title": "abc",
+            "extractor_key": "Youtube",
+            "ext": "mp4",
+            "requested_downloads": [{"filepath": "/tmp/abc.mp4"}],
+        }
+
+
+@pytest.fixture(autouse=True)
+def no_cached_metadata(monkeypatch):
+    monkeypatch.setattr(dlp_service.metadata_cache, "get", lambda key: None)
+
+
+def test_ignored_429_is_raised(monkeypatch, tmp_path):
+    monkeypatch.setattr(dlp_service, "YoutubeDL", ThrottledYDL)
+
+    with pytest.raises(DownloadError) as excinfo:
+        dlp_service.start_download(
+            "https://example.com/v/abc", "mp4", str(tmp_path), lambda d: None
+        )
+
+    assert is_throttle_error(excinfo.value)
+
+
+def test_skipped_fragments_are_reported_as_throttled(monkeypatch, tmp_path):
+    monkeypatch.setattr(dlp_service, "YoutubeDL", SkippedFragmentYDL)
+
+    result = dlp_service.start_download(
+        "https://example.com/v/abc", "mp4", str(tmp_path), lambda d: None
+    )
+
+    assert result["id"] == "abc"
+    assert result["throttled"] is True
+
+
+def test_429_halves_concurrency_and_skips_history(monkeypatch, tmp_path):
+    monkeypatch.setattr(dlp_service, "YoutubeDL", ThrottledYDL)
+    monkeypatch.setattr(download_manager, "start_download", dlp_service.start_download)
+
+    storage = FletubeStorage(tmp_path / "storage")
+    manager = DownloadManager(max_downloads=4, storage=storage, persist_jobs=False)
+    manager.concurrency.configure(enabled=True, min_active=1, max_active=6)
+    manager.scheduler.set_max_active(4)
+    channel = manager.events.subscribe()
+
+    try:
+        manager.iniciar_download("https://example.com/v/abc", "mp4", str(tmp_path))
+
+        deadline = time.monotonic() + 5
+        statuses = []
+        while "error" not in statuses and time.monotonic() < deadline:
+            time.sleep(0.05)
+            statuses += [update["status"] for update in channel.drain()]
+
+        assert "error" in statuses
+        assert "finished" not in statuses
+        assert manager.scheduler.max_active == 2
+        assert storage.list_downloads() == []
+    finally:
+        manager.shutdown()
+        storage.close()
+
+
+def test_failure_detected_from_logger_without_retcode():
+    # Se o yt-dlp renomear _download_retcode, os erros capturados decidem
+    ydl_logger = dlp_service.YtDlpLogger()
+    assert not dlp_service._download_failed(object(), ydl_logger)
+
+    ydl_logger.error(THROTTLE_ERROR)
+    assert dlp_service._download_failed(object(), ydl_logger)
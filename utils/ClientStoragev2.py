@@ -1,5 +1,7 @@
+import atexit
 import json
 import threading
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -32,13 +34,34 @@ class SecureStorage:
         auto_save: bool = True,
         encrypt_data: bool = False,
         secret_key: Optional[str] = None,
+        journal: bool = True,
+        compact_threshold: int = 500,
+        flush_interval_ms: Optional[int] = None,
     ):
         self.storage_path = Path(storage_path)
         self.auto_save = auto_save
         self.encrypt_data = encrypt_data
         self._secret_key = secret_key
         self._data: Dict[str, Any] = {}
-        self._lock = threading.Lock()
+        self._lock = threading.RLock()
+
+        # Journal append-only: cada escrita vira uma linha (O(1)); o snapshot
+        # completo só é regravado na compactação
+        self.journal = journal
+        self.journal_path = self.storage_path.with_suffix(".journal")
+        self.compact_threshold = compact_threshold
+        self._journal_file = None
+        self._journal_records = 0
+
+        # Escrita agrupada: mutações ficam pendentes e são gravadas juntas
+        # no máximo a cada flush_interval_ms, em flush() ou ao encerrar
+        self.flush_interval_ms = flush_interval_ms
+        self._pending_records: List[Dict[str, Any]] = []
+        self._batch_depth = 0
+        self._flush_timer: Optional[threading.Timer] = None
+
+        if self.flush_interval_ms:
+            atexit.register(self.flush)
 
         if self.encrypt_data:
             if not FLET_SECURITY_AVAILABLE:
@@ -99,6 +122,92 @@ class SecureStorage:
             except Exception as e:
                 logger.error(f"Erro inesperado ao carregar dados: {e}")
 
+        if self.journal:
+            self._replay_journal()
+
+    def _replay_journal(self) -> None:
+        """
+        Reaplica sobre o snapshot as operações gravadas no journal.
+
+        As operações são idempotentes, então reaplicar registros que já
+        estão no snapshot (queda entre a compactação e o truncamento do
+        journal) não altera o resultado. Uma última linha incompleta,
+        deixada por uma queda no meio da escrita, é ignorada.
+        """
+        if not self.journal_path.exists():
+            return
+
+        replayed = 0
+        needs_compaction = False
+
+        with self._lock:
+            try:
+                with open(self.journal_path, "r", encoding="utf-8") as f:
+                    content = f.read()
+            except Exception as e:
+                logger.error(f"Erro ao ler journal {self.journal_path}: {e}")
+                return
+
+            # Sem quebra de linha final a próxima escrita seria concatenada
+            # ao último registro: força a compactação
+            if content and not content.endswith("\n"):
+                needs_compaction = True
+
+            for line_number, line in enumerate(content.splitlines(), start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(
+                        f"Registro inválido no journal "
+                        f"{self.journal_path.name}:{line_number} - ignorado"
+                    )
+                    needs_compaction = True
+                    continue
+
+                self._apply_record(record)
+                replayed += 1
+
+            self._journal_records = replayed
+
+            if needs_compaction:
+                try:
+                    self.save()
+                except StorageError as e:
+                    logger.error(f"Erro ao compactar journal corrompido: {e}")
+
+        if replayed:
+            logger.info(f"Journal reaplicado: {replayed} operações")
+
+    def _apply_record(self, record: Dict[str, Any]) -> None:
+        op = record.get("op")
+        namespace = record.get("ns")
+        key = record.get("key")
+
+        if op == "set":
+            if namespace:
+                self._data.setdefault(namespace, {})[key] = record.get("value")
+            else:
+                self._data[key] = record.get("value")
+
+        elif op == "delete":
+            if namespace:
+                bucket = self._data.get(namespace)
+                if bucket is not None:
+                    bucket.pop(key, None)
+                    if not bucket:
+                        del self._data[namespace]
+            else:
+                self._data.pop(key, None)
+
+        elif op == "clear":
+            if namespace:
+                self._data.pop(namespace, None)
+            else:
+                self._data.clear()
+
     def _create_backup(self) -> None:
         if self.storage_path.exists():
             backup_path = self.storage_path.with_suffix(".backup")
@@ -108,10 +217,118 @@ class SecureStorage:
             except Exception as e:
                 logger.error(f"Erro ao criar backup: {e}")
 
-    def _save_if_auto(self) -> None:
-        if self.auto_save:
+    def _save_if_auto(self, record: Dict[str, Any]) -> None:
+        if not self.auto_save:
+            return
+
+        if self._batch_depth or self.flush_interval_ms:
+            with self._lock:
+                self._pending_records.append(record)
+                if not self._batch_depth:
+                    self._schedule_flush()
+            return
+
+        if self.journal:
+            self._append_journal([record])
+        else:
             self.save()
 
+    def _schedule_flush(self) -> None:
+        if self._flush_timer is not None:
+            return
+
+        self._flush_timer = threading.Timer(
+            self.flush_interval_ms / 1000, self._flush_from_timer
+        )
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+
+    def _flush_from_timer(self) -> None:
+        try:
+            self.flush()
+        except StorageError as e:
+            logger.error(f"Erro na gravação agrupada: {e}")
+
+    def flush(self) -> None:
+        """Grava de uma vez todas as mutações pendentes."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+
+            if not self._pending_records:
+                return
+
+            records = self._pending_records
+            self._pending_records = []
+
+            if self.journal:
+                self._append_journal(records)
+            else:
+                self.save()
+
+            logger.debug(f"Flush: {len(records)} operações em {self.storage_path.name}")
+
+    @contextmanager
+    def batch(self):
+        """
+        Agrupa várias mutações em uma única gravação:
+
+            with storage.batch():
+                storage.set("a", 1)
+                storage.set("b", 2)
+        """
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                outermost = self._batch_depth == 0
+            if outermost:
+                self.flush()
+
+    def _append_journal(self, records: List[Dict[str, Any]]) -> None:
+        try:
+            with self._lock:
+                if self._journal_file is None:
+                    self._journal_file = open(self.journal_path, "a", encoding="utf-8")
+
+                self._journal_file.write(
+                    "".join(
+                        json.dumps(
+                            record,
+                            ensure_ascii=False,
+                            separators=(",", ":"),
+                            default=str,
+                        )
+                        + "\n"
+                        for record in records
+                    )
+                )
+                self._journal_file.flush()
+                self._journal_records += len(records)
+
+                if self._journal_records >= self.compact_threshold:
+                    logger.debug(f"Compactando journal: {self.journal_path.name}")
+                    self.save()
+        except StorageError:
+            raise
+        except Exception as e:
+            logger.error(f"Erro ao gravar journal: {e}")
+            raise StorageError(f"Falha ao gravar journal: {e}")
+
+    def _truncate_journal(self) -> None:
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+
+        if self.journal_path.exists():
+            self.journal_path.unlink()
+
+        self._journal_records = 0
+
     def set(self, key: str, value: Any, namespace: Optional[str] = None) -> None:
         with self._lock:
             stored_value = self._encrypt_value(value) if self.encrypt_data else value
@@ -123,7 +340,10 @@ class SecureStorage:
             else:
                 self._data[key] = stored_value
 
-        self._save_if_auto()
+            self._save_if_auto(
+                {"op": "set", "ns": namespace, "key": key, "value": stored_value}
+            )
+
         logger.debug(f"Set: {namespace}.{key if namespace else key}")
 
     def get(
@@ -160,7 +380,7 @@ class SecureStorage:
                     else:
                         return False
 
-                self._save_if_auto()
+                self._save_if_auto({"op": "delete", "ns": namespace, "key": key})
                 logger.debug(f"Deleted: {namespace}.{key if namespace else key}")
                 return True
             except Exception as e:
@@ -179,6 +399,24 @@ class SecureStorage:
                 return list(self._data.get(namespace, {}).keys())
             return list(self._data.keys())
 
+    def values(self, namespace: Optional[str] = None) -> List[Any]:
+        with self._lock:
+            if namespace:
+                stored_values = list(self._data.get(namespace, {}).values())
+            else:
+                stored_values = list(self._data.values())
+
+            if not self.encrypt_data:
+                return stored_values
+
+            decrypted = []
+            for stored_value in stored_values:
+                try:
+                    decrypted.append(self._decrypt_value(stored_value))
+                except EncryptionError as e:
+                    logger.error(f"Erro ao descriptografar valor: {e}")
+            return decrypted
+
     def clear(self, namespace: Optional[str] = None) -> None:
         with self._lock:
             if namespace:
@@ -189,7 +427,7 @@ class SecureStorage:
                 self._data.clear()
                 logger.info("Todos os dados limpos")
 
-        self._save_if_auto()
+            self._save_if_auto({"op": "clear", "ns": namespace})
 
     def save(self) -> None:
         try:
@@ -208,6 +446,12 @@ class SecureStorage:
                     json.dump(full_data, f, indent=2, ensure_ascii=False, default=str)
 
                 temp_path.replace(self.storage_path)
+
+                # O snapshot já contém tudo que estava no journal
+                self._pending_records = []
+                if self.journal:
+                    self._truncate_journal()
+
                 logger.debug(f"Dados salvos: {self.storage_path}")
         except Exception as e:
             logger.error(f"Erro ao salvar dados: {e}")
@@ -241,12 +485,21 @@ class SecureStorage:
                     },
                 }
 
+    def close(self) -> None:
+        self.flush()
+
+        with self._lock:
+            if self._journal_file is not None:
+                self._journal_file.close()
+                self._journal_file = None
+
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if not exc_type and self.auto_save:
             self.save()
+        self.close()
 
     def __repr__(self) -> str:
         crypto = "encrypted" if self.encrypt_data else "plain"
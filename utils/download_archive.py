@@ -0,0 +1,148 @@
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from utils.logging_config import setup_logging
+from utils.metadata_cache import canonical_key
+
+logger = setup_logging()
+
+
+def archive_id(extractor: Optional[str], video_id: Optional[str]) -> Optional[str]:
+    """Identificador no formato do --download-archive do yt-dlp: "youtube ID"."""
+    if not video_id:
+        return None
+    return f"{(extractor or 'youtube').lower()} {video_id}"
+
+
+def archive_id_for_url(url: str) -> Optional[str]:
+    """
+    Resolve o id de arquivo a partir da URL, sem extração. Só é possível
+    para o YouTube; para outros sites o próprio yt-dlp consulta o arquivo.
+    """
+    key = canonical_key(url, "video")
+    if key.startswith("youtube:video:"):
+        return archive_id("youtube", key.rsplit(":", 1)[1])
+    return None
+
+
+class DownloadArchive:
+    """
+    Índice de vídeos já baixados, um arquivo por formato.
+
+    Os arquivos seguem o formato do --download-archive do yt-dlp e são
+    passados a ele no download; em memória ficam como sets, de modo que
+    a checagem antes de enfileirar é O(1).
+    """
+
+    def __init__(self, archive_dir: Path):
+        self.archive_dir = Path(archive_dir)
+        self._entries: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def archive_path(self, format: str) -> Path:
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        return self.archive_dir / f"{format or 'default'}.txt"
+
+    def _load_locked(self, format: str) -> Set[str]:
+        entries = self._entries.get(format)
+        if entries is not None:
+            return entries
+
+        entries = set()
+        path = self.archive_path(format)
+        try:
+            if path.exists():
+                with open(path, "r", encoding="utf-8") as f:
+                    entries = {line.strip() for line in f if line.strip()}
+        except Exception as e:
+            logger.error(f"Erro ao ler arquivo de downloads {path.name}: {e}")
+
+        self._entries[format] = entries
+        return entries
+
+    def contains(self, entry_id: Optional[str], format: str) -> bool:
+        if not entry_id:
+            return False
+        with self._lock:
+            return entry_id in self._load_locked(format)
+
+    def mark(self, entry_id: Optional[str], format: str) -> None:
+        """
+        Registra o vídeo só em memória: o yt-dlp já grava a linha no
+        arquivo ao concluir o download.
+        """
+        if not entry_id:
+            return
+        with self._lock:
+            self._load_locked(format).add(entry_id)
+
+    def add(self, entry_id: Optional[str], format: str) -> bool:
+        if not entry_id:
+            return False
+
+        with self._lock:
+            entries = self._load_locked(format)
+            if entry_id in entries:
+                return False
+
+            try:
+                with open(self.archive_path(format), "a", encoding="utf-8") as f:
+                    f.write(entry_id + "\n")
+            except Exception as e:
+                logger.error(f"Erro ao gravar arquivo de downloads: {e}")
+                return False
+
+            entries.add(entry_id)
+            return True
+
+    def discard(self, entries: Iterable[Tuple[Optional[str], str]]) -> int:
+        """
+        Tira (id, formato) do arquivo, para que o vídeo possa ser baixado de
+        novo. Cada arquivo de formato é regravado uma única vez.
+        """
+        by_format: Dict[str, Set[str]] = {}
+        for entry_id, format in entries:
+            if entry_id:
+                by_format.setdefault(format, set()).add(entry_id)
+
+        removed = 0
+        with self._lock:
+            for format, entry_ids in by_format.items():
+                current = self._load_locked(format)
+                gone = current & entry_ids
+                if not gone:
+                    continue
+
+                path = self.archive_path(format)
+                tmp_path = path.with_name(path.name + ".tmp")
+                try:
+                    with open(tmp_path, "w", encoding="utf-8") as f:
+                        f.writelines(f"{e}\n" for e in current - gone)
+                    os.replace(tmp_path, path)
+                except Exception as e:
+                    logger.error(f"Erro ao regravar arquivo de downloads: {e}")
+                    continue
+
+                current -= gone
+                removed += len(gone)
+
+        if removed:
+            logger.info(f"Arquivo de downloads: {removed} itens removidos")
+        return removed
+
+    def import_downloads(self, downloads: Iterable[Dict[str, Any]]) -> int:
+        """Inclui no arquivo o histórico salvo antes de o arquivo existir."""
+        added = 0
+        for item in downloads:
+            entry_id = archive_id(item.get("extractor"), item.get("id"))
+            if self.add(entry_id, item.get("format", "")):
+                added += 1
+
+        if added:
+            logger.info(f"Arquivo de downloads: {added} itens importados do histórico")
+        return added
+
+
+download_archive = DownloadArchive(Path.home() / ".fletube" / "archives")
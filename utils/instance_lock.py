@@ -0,0 +1,70 @@
+from pathlib import Path
+from typing import Optional
+
+from utils.logging_config import setup_logging
+
+logger = setup_logging()
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+    import fcntl
+
+
+class StorageLockedError(RuntimeError):
+    """Outro processo do Fletube já está usando o diretório de dados."""
+
+
+class InstanceLock:
+    """
+    Trava exclusiva do diretório de dados entre processos.
+
+    Os arquivos do storage (journal + compactação) supõem um único
+    processo escrevendo; aplicativo e modo linha de comando seguram esta
+    trava enquanto o storage está aberto. O sistema operacional a libera
+    se o processo morrer.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = None
+
+    def acquire(self) -> bool:
+        if self._file is not None:
+            return True
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(self.path, "a+")
+        try:
+            if msvcrt:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        self._file = lock_file
+        return True
+
+    def release(self) -> None:
+        lock_file, self._file = self._file, None
+        if lock_file is None:
+            return
+
+        try:
+            if msvcrt:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+        except OSError as e:
+            logger.warning(f"Erro ao liberar trava {self.path.name}: {e}")
+        finally:
+            lock_file.close()
+
+
+def storage_lock(base_path: Optional[Path] = None) -> InstanceLock:
+    return InstanceLock((base_path or Path.home() / ".fletube") / "fletube.lock")
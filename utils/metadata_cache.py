@@ -0,0 +1,370 @@
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from utils.logging_config import setup_logging
+
+logger = setup_logging()
+
+
+YOUTUBE_HOSTS = ("youtube.com", "youtu.be", "youtube-nocookie.com")
+
+
+def _youtube_video_id(parsed) -> Optional[str]:
+    host = parsed.netloc.lower()
+    path_parts = [part for part in parsed.path.split("/") if part]
+
+    if host.endswith("youtu.be") and path_parts:
+        return path_parts[0]
+
+    query_id = parse_qs(parsed.query).get("v")
+    if query_id:
+        return query_id[0]
+
+    if len(path_parts) >= 2 and path_parts[0] in ("shorts", "embed", "live", "v"):
+        return path_parts[1]
+
+    return None
+
+
+def canonical_key(url: str, kind: str = "video") -> str:
+    """
+    Gera a chave canônica de cache para uma URL.
+
+    Para o YouTube usa o id do vídeo ou da playlist, de modo que
+    youtu.be/ID, watch?v=ID&t=30 e shorts/ID compartilham a mesma entrada.
+    Outras URLs são normalizadas (host em minúsculas, sem fragmento).
+    """
+    url = (url or "").strip()
+    parsed = urlparse(url if "://" in url else f"https://{url}")
+    host = parsed.netloc.lower()
+
+    if host.startswith("www.") or host.startswith("m."):
+        host = host.split(".", 1)[1]
+
+    if host.endswith(YOUTUBE_HOSTS):
+        if kind == "playlist":
+            list_id = parse_qs(parsed.query).get("list")
+            if list_id:
+                return f"youtube:playlist:{list_id[0]}"
+            kind = "flat"
+
+        video_id = _youtube_video_id(parsed)
+        if video_id:
+            return f"youtube:{kind}:{video_id}"
+
+    path = parsed.path.rstrip("/")
+    query = f"?{parsed.query}" if parsed.query else ""
+    return f"url:{kind}:{host}{path}{query}"
+
+
+def is_youtube_url(url: str) -> bool:
+    return canonical_key(url, "video").startswith("youtube:")
+
+
+def is_youtube_playlist_url(url: str) -> bool:
+    return canonical_key(url, "playlist").startswith("youtube:playlist:")
+
+
+class MetadataCache:
+    """
+    Cache em memória (TTL + LRU) das extrações do yt-dlp.
+
+    Evita que a mesma URL seja extraída várias vezes por ação do usuário
+    (thumbnail, verificação de playlist e download).
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 1800):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading: Dict[str, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Any]:
+        max_age = self.ttl if max_age is None else min(max_age, self.ttl)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, value = entry
+            if time.time() - stored_at > max_age:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                logger.debug(f"Cache de metadados: removido {evicted_key}")
+
+    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        """
+        Retorna o valor em cache ou executa o loader uma única vez, mesmo
+        que várias threads peçam a mesma chave ao mesmo tempo.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        with key_lock:
+            value = self.get(key)
+            if value is not None:
+                return value
+
+            try:
+                value = loader()
+                if value is not None:
+                    self.set(key, value)
+                return value
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+COMPACT_INFO_FIELDS = (
+    "id",
+    "title",
+    "thumbnail",
+    "duration",
+    "uploader",
+    "channel",
+    "view_count",
+    "upload_date",
+    "description",
+    "webpage_url",
+    "extractor_key",
+)
+
+
+def compact_info(info_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduz o info dict do yt-dlp ao necessário para exibição.
+
+    Formatos ficam de fora (as URLs expiram em poucas horas): o cache em
+    disco serve para título e thumbnail, e o download sempre resolve URLs
+    novas.
+    """
+    compact = {
+        field: info_dict.get(field)
+        for field in COMPACT_INFO_FIELDS
+        if info_dict.get(field) is not None
+    }
+
+    description = compact.get("description")
+    if description and len(description) > 2000:
+        compact["description"] = description[:2000]
+
+    compact["thumbnails"] = [
+        {key: thumb.get(key) for key in ("url", "width", "height") if thumb.get(key)}
+        for thumb in (info_dict.get("thumbnails") or [])[-3:]
+    ]
+
+    return compact
+
+
+class PersistentMetadataCache:
+    """
+    Cache de metadados em disco (SQLite, JSON comprimido com zlib).
+
+    Mantém as extrações entre reinícios do aplicativo. Entradas mais
+    antigas que max_age são descartadas e, quando o arquivo passa de
+    max_bytes, as menos acessadas são removidas primeiro.
+    """
+
+    EVICT_EVERY = 50
+
+    def __init__(
+        self,
+        db_path: Path,
+        max_bytes: int = 20 * 1024 * 1024,
+        max_age: float = 7 * 24 * 3600,
+    ):
+        self.db_path = Path(db_path)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS metadata (
+                    key TEXT PRIMARY KEY,
+                    payload BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_metadata_accessed "
+                "ON metadata (accessed_at)"
+            )
+            self._conn.commit()
+            self._evict_locked()
+            logger.info(f"Cache de metadados em disco: {self.db_path}")
+        return self._conn
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Any]:
+        max_age = self.max_age if max_age is None else min(max_age, self.max_age)
+
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT payload, created_at FROM metadata WHERE key = ?", (key,)
+                ).fetchone()
+
+                if row is None:
+                    return None
+
+                payload, created_at = row
+                now = time.time()
+                if now - created_at > max_age:
+                    conn.execute("DELETE FROM metadata WHERE key = ?", (key,))
+                    conn.commit()
+                    return None
+
+                conn.execute(
+                    "UPDATE metadata SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+                conn.commit()
+
+            return json.loads(zlib.decompress(payload).decode("utf-8"))
+        except Exception as e:
+            logger.error(f"Erro ao ler cache em disco ({key}): {e}")
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        try:
+            payload = zlib.compress(
+                json.dumps(value, ensure_ascii=False, default=str).encode("utf-8")
+            )
+            now = time.time()
+
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO metadata "
+                    "(key, payload, size, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, payload, len(payload), now, now),
+                )
+                conn.commit()
+
+                self._writes += 1
+                if self._writes % self.EVICT_EVERY == 0:
+                    self._evict_locked()
+        except Exception as e:
+            logger.error(f"Erro ao gravar cache em disco ({key}): {e}")
+
+    def _evict_locked(self) -> None:
+        conn = self._conn
+        conn.execute(
+            "DELETE FROM metadata WHERE created_at < ?", (time.time() - self.max_age,)
+        )
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM metadata").fetchone()
+        excess = total[0] - self.max_bytes
+
+        if excess > 0:
+            rows: List[tuple] = conn.execute(
+                "SELECT key, size FROM metadata ORDER BY accessed_at ASC"
+            ).fetchall()
+            to_delete = []
+            for key, size in rows:
+                if excess <= 0:
+                    break
+                to_delete.append((key,))
+                excess -= size
+            conn.executemany("DELETE FROM metadata WHERE key = ?", to_delete)
+            logger.info(f"Cache em disco: {len(to_delete)} entradas removidas")
+
+        conn.commit()
+
+    def invalidate(self, key: str) -> None:
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("DELETE FROM metadata WHERE key = ?", (key,))
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Erro ao invalidar cache em disco ({key}): {e}")
+
+    def clear(self) -> None:
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("DELETE FROM metadata")
+                conn.commit()
+                conn.execute("VACUUM")
+        except Exception as e:
+            logger.error(f"Erro ao limpar cache em disco: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            with self._lock:
+                conn = self._connect()
+                count, size = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM metadata"
+                ).fetchone()
+            return {"entries": count, "bytes": size, "path": str(self.db_path)}
+        except Exception as e:
+            logger.error(f"Erro ao obter estatísticas do cache em disco: {e}")
+            return {"entries": 0, "bytes": 0, "path": str(self.db_path)}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+metadata_cache = MetadataCache()
+disk_metadata_cache = PersistentMetadataCache(
+    Path.home() / ".fletube" / "metadata_cache.db"
+)
@@ -0,0 +1,168 @@
+import bisect
+import difflib
+import re
+import threading
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from utils.logging_config import setup_logging
+
+logger = setup_logging()
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+INDEXED_FIELDS = ("title", "format", "uploader")
+
+
+def normalize(text: str) -> str:
+    """Minúsculas e sem acentos: "Canção" e "cancao" viram o mesmo token."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(normalize(text))
+
+
+class SearchIndex:
+    """
+    Índice invertido em memória sobre título, formato e canal.
+
+    Cada token aponta para o conjunto de ids que o contém; o vocabulário
+    fica ordenado para que buscas por prefixo sejam um bisect. Termos
+    sem nenhum prefixo correspondente caem para uma busca aproximada
+    (difflib) no vocabulário, tolerando erros de digitação.
+    """
+
+    FUZZY_CUTOFF = 0.8
+    FUZZY_MATCHES = 3
+
+    def __init__(self):
+        self._postings: Dict[str, Set[str]] = {}
+        self._vocabulary: List[str] = []
+        self._doc_tokens: Dict[str, Set[str]] = {}
+        self._sort_keys: Dict[str, tuple] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_tokens)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_tokens
+
+    def build(self, items: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            self.clear()
+            for item in items:
+                self.add(item.get("id"), item)
+            logger.info(f"Índice de busca construído: {len(self)} itens")
+
+    def add(self, doc_id: Optional[str], item: Dict[str, Any]) -> None:
+        if not doc_id:
+            return
+
+        tokens = set()
+        for field in INDEXED_FIELDS:
+            tokens.update(tokenize(str(item.get(field) or "")))
+
+        with self._lock:
+            self.remove(doc_id)
+
+            for token in tokens:
+                posting = self._postings.get(token)
+                if posting is None:
+                    posting = self._postings[token] = set()
+                    bisect.insort(self._vocabulary, token)
+                posting.add(doc_id)
+
+            self._doc_tokens[doc_id] = tokens
+            self._sort_keys[doc_id] = (
+                normalize(item.get("title", "")),
+                item.get("format") or "",
+                item.get("created_at") or 0,
+            )
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            tokens = self._doc_tokens.pop(doc_id, None)
+            self._sort_keys.pop(doc_id, None)
+            if not tokens:
+                return
+
+            for token in tokens:
+                posting = self._postings.get(token)
+                if posting is None:
+                    continue
+                posting.discard(doc_id)
+                if not posting:
+                    del self._postings[token]
+                    position = bisect.bisect_left(self._vocabulary, token)
+                    if (
+                        position < len(self._vocabulary)
+                        and self._vocabulary[position] == token
+                    ):
+                        self._vocabulary.pop(position)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._vocabulary.clear()
+            self._doc_tokens.clear()
+            self._sort_keys.clear()
+
+    def _prefix_tokens(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        matches = []
+        for token in self._vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            matches.append(token)
+        return matches
+
+    def _match_term(self, term: str) -> Set[str]:
+        tokens = self._prefix_tokens(term)
+        if not tokens:
+            tokens = difflib.get_close_matches(
+                term, self._vocabulary, self.FUZZY_MATCHES, self.FUZZY_CUTOFF
+            )
+
+        ids: Set[str] = set()
+        for token in tokens:
+            ids |= self._postings[token]
+        return ids
+
+    def search(
+        self,
+        text: Optional[str] = None,
+        format: Optional[str] = None,
+        sort_by: str = "title",
+    ) -> List[str]:
+        """
+        Retorna os ids que contêm todos os termos (por prefixo ou
+        aproximação), já ordenados pelo critério pedido.
+        """
+        with self._lock:
+            terms = tokenize(text or "")
+
+            if terms:
+                result: Optional[Set[str]] = None
+                for term in sorted(terms, key=len, reverse=True):
+                    ids = self._match_term(term)
+                    result = ids if result is None else result & ids
+                    if not result:
+                        return []
+            else:
+                result = set(self._doc_tokens)
+
+            if format:
+                result = {
+                    doc_id for doc_id in result if self._sort_keys[doc_id][1] == format
+                }
+
+            keys = self._sort_keys
+            if sort_by == "format":
+                return sorted(result, key=lambda i: (keys[i][1], keys[i][0]))
+            if sort_by == "created_at":
+                return sorted(result, key=lambda i: keys[i][2], reverse=True)
+            return sorted(result, key=lambda i: keys[i][0])
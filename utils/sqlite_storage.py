@@ -0,0 +1,336 @@
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.logging_config import setup_logging
+from utils.search_index import tokenize
+
+logger = setup_logging()
+
+# Texto pesquisável de cada entrada, o mesmo do SearchIndex em memória
+FTS_BODY = (
+    "coalesce({row}.title, '') || ' ' || coalesce({row}.format, '') || ' ' || "
+    "coalesce(json_extract({row}.data, '$.uploader'), '')"
+)
+
+
+class SQLiteStorageError(Exception):
+    pass
+
+
+class SQLiteStorage:
+    """
+    Backend SQLite com a mesma interface de SecureStorage.
+
+    Pensado para o histórico de downloads: cada entrada vira uma linha,
+    com colunas indexadas para título, formato, data e caminho, de modo
+    que listar e filtrar dezenas de milhares de itens é uma única query.
+    A busca textual usa FTS5 (prefixo por termo, sem acentos), mantido
+    por triggers na própria tabela.
+    """
+
+    SORT_COLUMNS = {
+        "title": "title COLLATE NOCASE ASC",
+        "format": "format ASC, title COLLATE NOCASE ASC",
+        "created_at": "created_at DESC",
+    }
+
+    def __init__(self, storage_path: Path):
+        self.storage_path = Path(storage_path)
+        self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+
+        try:
+            self._conn = sqlite3.connect(
+                str(self.storage_path), check_same_thread=False
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._create_schema()
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao abrir {self.storage_path}: {e}")
+            raise SQLiteStorageError(f"Falha ao abrir banco: {e}")
+
+        logger.info(f"SQLite storage inicializado: {self.storage_path.name}")
+
+    def _create_schema(self) -> None:
+        with self._lock:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    namespace TEXT NOT NULL DEFAULT '',
+                    key TEXT NOT NULL,
+                    title TEXT,
+                    format TEXT,
+                    created_at REAL NOT NULL,
+                    file_path TEXT,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                );
+                CREATE INDEX IF NOT EXISTS idx_entries_title
+                    ON entries (namespace, title COLLATE NOCASE);
+                CREATE INDEX IF NOT EXISTS idx_entries_format
+                    ON entries (namespace, format);
+                CREATE INDEX IF NOT EXISTS idx_entries_created_at
+                    ON entries (namespace, created_at);
+                CREATE INDEX IF NOT EXISTS idx_entries_file_path
+                    ON entries (file_path);
+                """
+            )
+            self._create_fts()
+            self._conn.commit()
+
+    def _create_fts(self) -> None:
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'entries_fts'"
+        ).fetchone()
+
+        new_body = FTS_BODY.format(row="new")
+        self._conn.executescript(
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+                body, tokenize = 'unicode61 remove_diacritics 2'
+            );
+            CREATE TRIGGER IF NOT EXISTS entries_fts_insert AFTER INSERT ON entries
+            BEGIN
+                INSERT INTO entries_fts (rowid, body) VALUES (new.rowid, {new_body});
+            END;
+            CREATE TRIGGER IF NOT EXISTS entries_fts_delete AFTER DELETE ON entries
+            BEGIN
+                DELETE FROM entries_fts WHERE rowid = old.rowid;
+            END;
+            CREATE TRIGGER IF NOT EXISTS entries_fts_update AFTER UPDATE ON entries
+            BEGIN
+                DELETE FROM entries_fts WHERE rowid = old.rowid;
+                INSERT INTO entries_fts (rowid, body) VALUES (new.rowid, {new_body});
+            END;
+            """
+        )
+
+        if not exists:
+            # Bancos criados antes do FTS: indexa o que já existe
+            self._conn.execute(
+                "INSERT INTO entries_fts (rowid, body) "
+                f"SELECT rowid, {FTS_BODY.format(row='entries')} FROM entries"
+            )
+
+    @staticmethod
+    def _row_values(value: Any) -> tuple:
+        if isinstance(value, dict):
+            created_at = value.get("created_at")
+            if not isinstance(created_at, (int, float)):
+                created_at = time.time()
+            return (
+                value.get("title"),
+                value.get("format"),
+                created_at,
+                value.get("file_path"),
+            )
+        return (None, None, time.time(), None)
+
+    def set(self, key: str, value: Any, namespace: Optional[str] = None) -> None:
+        self.set_many({key: value}, namespace=namespace)
+        logger.debug(f"Set: {namespace}.{key}")
+
+    def set_many(self, items: Dict[str, Any], namespace: Optional[str] = None) -> None:
+        rows = [
+            (
+                namespace or "",
+                key,
+                *self._row_values(value),
+                json.dumps(value, default=str),
+            )
+            for key, value in items.items()
+        ]
+
+        try:
+            with self._lock:
+                # created_at da primeira gravação é preservado em atualizações
+                self._conn.executemany(
+                    """
+                    INSERT INTO entries
+                        (namespace, key, title, format, created_at, file_path, data)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (namespace, key) DO UPDATE SET
+                        title = excluded.title,
+                        format = excluded.format,
+                        file_path = excluded.file_path,
+                        data = excluded.data
+                    """,
+                    rows,
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao gravar no SQLite: {e}")
+            raise SQLiteStorageError(f"Falha ao gravar: {e}")
+
+    def get(
+        self, key: str, namespace: Optional[str] = None, default: Any = None
+    ) -> Any:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM entries WHERE namespace = ? AND key = ?",
+                (namespace or "", key),
+            ).fetchone()
+
+        if row is None:
+            return default
+
+        return json.loads(row[0])
+
+    def delete(self, key: str, namespace: Optional[str] = None) -> bool:
+        try:
+            with self._lock:
+                cursor = self._conn.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND key = ?",
+                    (namespace or "", key),
+                )
+                self._conn.commit()
+
+            deleted = cursor.rowcount > 0
+            if deleted:
+                logger.debug(f"Deleted: {namespace}.{key}")
+            return deleted
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao deletar {key}: {e}")
+            return False
+
+    def exists(self, key: str, namespace: Optional[str] = None) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM entries WHERE namespace = ? AND key = ?",
+                (namespace or "", key),
+            ).fetchone()
+        return row is not None
+
+    def list_keys(self, namespace: Optional[str] = None) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM entries WHERE namespace = ?", (namespace or "",)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def values(self, namespace: Optional[str] = None) -> List[Any]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM entries WHERE namespace = ? ORDER BY created_at",
+                (namespace or "",),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    @staticmethod
+    def _filter_clause(
+        namespace: Optional[str], text: Optional[str], format: Optional[str]
+    ) -> tuple:
+        sql = " WHERE namespace = ?"
+        params: List[Any] = [namespace or ""]
+
+        terms = tokenize(text or "")
+        if terms:
+            # Todos os termos, cada um por prefixo: "mus ao viv" acha
+            # "Música ao vivo"
+            sql += (
+                " AND rowid IN (SELECT rowid FROM entries_fts"
+                " WHERE entries_fts MATCH ?)"
+            )
+            params.append(" ".join(f'"{term}"*' for term in terms))
+
+        if format:
+            sql += " AND format = ?"
+            params.append(format)
+
+        return sql, params
+
+    def count(
+        self,
+        namespace: Optional[str] = None,
+        text: Optional[str] = None,
+        format: Optional[str] = None,
+    ) -> int:
+        where, params = self._filter_clause(namespace, text, format)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM entries" + where, params
+            ).fetchone()
+        return row[0]
+
+    def query(
+        self,
+        namespace: Optional[str] = None,
+        text: Optional[str] = None,
+        format: Optional[str] = None,
+        sort_by: str = "title",
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Any]:
+        where, params = self._filter_clause(namespace, text, format)
+        sql = "SELECT data FROM entries" + where
+
+        sql += f" ORDER BY {self.SORT_COLUMNS.get(sort_by, self.SORT_COLUMNS['title'])}"
+
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([limit, offset])
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        return [json.loads(row[0]) for row in rows]
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        with self._lock:
+            if namespace:
+                self._conn.execute(
+                    "DELETE FROM entries WHERE namespace = ?", (namespace,)
+                )
+                logger.info(f"Namespace limpo: {namespace}")
+            else:
+                self._conn.execute("DELETE FROM entries")
+                logger.info("Todos os dados limpos")
+            self._conn.commit()
+
+    def save(self) -> None:
+        with self._lock:
+            self._conn.commit()
+
+    def import_items(
+        self, items: Iterable[tuple], namespace: Optional[str] = None
+    ) -> int:
+        """Importa (chave, valor) em uma única transação."""
+        batch = dict(items)
+        if batch:
+            self.set_many(batch, namespace=namespace)
+        return len(batch)
+
+    def export_data(self, decrypt_export: bool = True) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT namespace, key, data FROM entries"
+            ).fetchall()
+
+        for namespace, key, value in rows:
+            if namespace:
+                data.setdefault(namespace, {})[key] = json.loads(value)
+            else:
+                data[key] = json.loads(value)
+
+        return {
+            "data": data,
+            "metadata": {
+                "exported_at": datetime.now().isoformat(),
+                "version": "1.3.0",
+            },
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __repr__(self) -> str:
+        return f"SQLiteStorage(path={self.storage_path.name})"
@@ -0,0 +1,268 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+
+from utils.logging_config import setup_logging
+
+logger = setup_logging()
+
+try:
+    from PIL import Image, ImageOps, features
+
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+    logger.warning("Pillow não disponível - thumbnails salvas sem redimensionar")
+
+
+# Tamanhos de exibição (largura, altura) em pixels lógicos
+THUMBNAIL_SIZES: Dict[str, Tuple[int, int]] = {
+    "sidebar": (50, 50),
+    "history": (235, 120),
+}
+
+# As variantes são geradas com o dobro da resolução para telas HiDPI
+THUMBNAIL_SCALE = 2
+THUMBNAIL_MAX_BYTES = 64 * 1024 * 1024
+FETCH_TIMEOUT = 10
+FETCH_WORKERS = 4
+
+
+def _image_format() -> Tuple[str, str]:
+    if PIL_AVAILABLE and features.check("webp"):
+        return "WEBP", ".webp"
+    return "JPEG", ".jpg"
+
+
+class ThumbnailCache:
+    """
+    Cache em disco das thumbnails exibidas na sidebar e no histórico.
+
+    Cada URL é baixada uma única vez e gera uma variante redimensionada
+    por tamanho de THUMBNAIL_SIZES; sem Pillow guarda a imagem original.
+    Buscas simultâneas da mesma URL compartilham o mesmo download e, acima
+    de max_bytes, os arquivos usados há mais tempo são removidos.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = THUMBNAIL_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._format, self._ext = _image_format()
+        self._index: Optional["OrderedDict[str, int]"] = None
+        self._total_bytes = 0
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=FETCH_WORKERS, thread_name_prefix="fletube-thumbnail"
+        )
+
+    @staticmethod
+    def is_remote(url: Optional[str]) -> bool:
+        return bool(url) and url.startswith(("http://", "https://"))
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()[:20]
+
+    def _variant_path(self, url: str, size: str) -> Path:
+        key = self._key(url)
+        if not PIL_AVAILABLE:
+            return self.cache_dir / f"{key}.img"
+        width, height = THUMBNAIL_SIZES[size]
+        return self.cache_dir / f"{key}_{width}x{height}{self._ext}"
+
+    def _load_index_locked(self) -> "OrderedDict[str, int]":
+        if self._index is not None:
+            return self._index
+
+        # Ordem de LRU entre execuções: data de último acesso (mtime)
+        files = []
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_file():
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, entry.name, stat.st_size))
+        except OSError as e:
+            logger.error(f"Erro ao ler cache de thumbnails: {e}")
+
+        self._index = OrderedDict((name, size) for _, name, size in sorted(files))
+        self._total_bytes = sum(self._index.values())
+        return self._index
+
+    def _touch_locked(self, path: Path) -> bool:
+        index = self._load_index_locked()
+        if path.name not in index:
+            return False
+
+        index.move_to_end(path.name)
+        try:
+            os.utime(path)
+        except OSError:
+            # Removido por fora do app
+            self._total_bytes -= index.pop(path.name)
+            return False
+        return True
+
+    def _store_locked(self, path: Path, data: bytes) -> None:
+        index = self._load_index_locked()
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        self._total_bytes += len(data) - index.pop(path.name, 0)
+        index[path.name] = len(data)
+        self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        index = self._load_index_locked()
+        removed = 0
+        # A entrada mais recente nunca sai, mesmo sozinha acima do limite
+        while self._total_bytes > self.max_bytes and len(index) > 1:
+            name, size = index.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(self.cache_dir / name)
+                removed += 1
+            except OSError as e:
+                logger.warning(f"Não foi possível remover thumbnail {name}: {e}")
+
+        if removed:
+            logger.debug(f"Cache de thumbnails: {removed} arquivos removidos (LRU)")
+
+    def cached_path(self, url: str, size: str) -> Optional[str]:
+        """Caminho local da variante, se já estiver em cache."""
+        if not self.is_remote(url):
+            return None
+
+        path = self._variant_path(url, size)
+        with self._lock:
+            if self._touch_locked(path):
+                return str(path)
+        return None
+
+    def _render(self, data: bytes, size: str) -> bytes:
+        width, height = THUMBNAIL_SIZES[size]
+        with Image.open(io.BytesIO(data)) as image:
+            image = ImageOps.fit(
+                image.convert("RGB"),
+                (width * THUMBNAIL_SCALE, height * THUMBNAIL_SCALE),
+                Image.LANCZOS,
+            )
+            output = io.BytesIO()
+            image.save(output, self._format, quality=85)
+            return output.getvalue()
+
+    def _fetch(self, url: str) -> None:
+        response = requests.get(url, timeout=FETCH_TIMEOUT)
+        response.raise_for_status()
+        data = response.content
+
+        if not PIL_AVAILABLE:
+            variants = {self._variant_path(url, "sidebar"): data}
+        else:
+            variants = {
+                self._variant_path(url, size): self._render(data, size)
+                for size in THUMBNAIL_SIZES
+            }
+
+        with self._lock:
+            for path, variant in variants.items():
+                self._store_locked(path, variant)
+
+        logger.debug(f"Thumbnail em cache: {url}")
+
+    def _fetch_async(self, url: str) -> Future:
+        """Um único download por URL, compartilhado por quem pedir junto."""
+        with self._lock:
+            future = self._inflight.get(url)
+            if future is not None:
+                return future
+
+            future = self._executor.submit(self._fetch, url)
+            self._inflight[url] = future
+
+        def done(f):
+            with self._lock:
+                self._inflight.pop(url, None)
+            if f.exception():
+                logger.warning(f"Erro ao baixar thumbnail {url}: {f.exception()}")
+
+        future.add_done_callback(done)
+        return future
+
+    def get(self, url: str, size: str, timeout: Optional[float] = None) -> str:
+        """
+        Caminho local da thumbnail, baixando se necessário. Em caso de
+        falha devolve a própria URL, que o ft.Image ainda consegue exibir.
+        """
+        if not self.is_remote(url):
+            return url
+
+        cached = self.cached_path(url, size)
+        if cached:
+            return cached
+
+        try:
+            self._fetch_async(url).result(timeout)
+        except Exception:
+            return url
+        return self.cached_path(url, size) or url
+
+    def src(
+        self,
+        url: str,
+        size: str,
+        on_ready: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """
+        src para o ft.Image sem bloquear a UI: o caminho local quando já
+        está em cache; senão a URL original, com o download em segundo
+        plano (on_ready recebe o caminho local quando ele terminar).
+        """
+        if not self.is_remote(url):
+            return url
+
+        cached = self.cached_path(url, size)
+        if cached:
+            return cached
+
+        future = self._fetch_async(url)
+        if on_ready:
+
+            def ready(f):
+                path = None if f.exception() else self.cached_path(url, size)
+                if path:
+                    try:
+                        on_ready(path)
+                    except Exception as e:
+                        logger.error(f"Erro ao aplicar thumbnail em cache: {e}")
+
+            future.add_done_callback(ready)
+        return url
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            index = self._load_index_locked()
+            return {"entries": len(index), "bytes": self._total_bytes}
+
+    def clear(self) -> None:
+        with self._lock:
+            index = self._load_index_locked()
+            for name in list(index):
+                try:
+                    os.remove(self.cache_dir / name)
+                except OSError:
+                    pass
+            index.clear()
+            self._total_bytes = 0
+
+
+thumbnail_cache = ThumbnailCache(Path.home() / ".fletube" / "thumbnails")
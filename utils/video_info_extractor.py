@@ -4,6 +4,12 @@ from typing import Any, Dict, Optional
 import yt_dlp
 
 from utils.logging_config import setup_logging
+from utils.metadata_cache import (
+    canonical_key,
+    compact_info,
+    disk_metadata_cache,
+    metadata_cache,
+)
 
 logger = setup_logging()
 
@@ -53,9 +59,29 @@ class VideoInfoExtractor:
     }
 
     @classmethod
-    def extract_info(cls, url: str) -> VideoInfo:
-        with yt_dlp.YoutubeDL(cls.BASE_OPTS) as ydl:
-            try:
+    def extract_info_dict(cls, url: str, full: bool = False) -> Dict[str, Any]:
+        """
+        Retorna o info dict do vídeo, usando o cache de metadados
+        compartilhado com a verificação de playlist e o download.
+
+        Ordem de busca: memória (info completo), disco (versão compacta,
+        sobrevive a reinícios) e por fim o yt-dlp. Com full=True o disco é
+        ignorado: o download precisa do info completo, com as URLs dos
+        formatos.
+        """
+        cache_key = canonical_key(url, "video")
+
+        cached = metadata_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        stored = None if full else disk_metadata_cache.get(cache_key)
+        if stored is not None:
+            logger.info(f"Informações obtidas do cache em disco: {cache_key}")
+            return stored
+
+        def load():
+            with yt_dlp.YoutubeDL(cls.BASE_OPTS) as ydl:
                 logger.info(f"Extraindo informações de: {url[:50]}...")
 
                 info_dict = ydl.extract_info(url, download=False)
@@ -66,32 +92,52 @@ class VideoInfoExtractor:
                         raise ValueError("Playlist vazia")
                     info_dict = info_dict["entries"][0]
 
-                video_info = VideoInfo.from_dict(info_dict)
+                info_dict = ydl.sanitize_info(info_dict)
+
+            disk_metadata_cache.set(cache_key, compact_info(info_dict))
+            return info_dict
 
-                logger.info(f"Informações extraídas: {video_info.title}")
+        return metadata_cache.get_or_load(cache_key, load)
 
-                return video_info
+    @classmethod
+    def extract_info(cls, url: str) -> VideoInfo:
+        try:
+            info_dict = cls.extract_info_dict(url)
 
-            except yt_dlp.utils.DownloadError as e:
-                error_msg = str(e).lower()
+            video_info = VideoInfo.from_dict(info_dict)
 
-                if "private" in error_msg or "members-only" in error_msg:
-                    raise ValueError("Vídeo privado ou exclusivo para membros")
-                elif "unavailable" in error_msg or "removed" in error_msg:
-                    raise ValueError("Vídeo indisponível ou removido")
-                elif "copyright" in error_msg:
-                    raise ValueError("Vídeo bloqueado por direitos autorais")
-                else:
-                    logger.error(f"Erro do yt-dlp: {e}")
-                    raise ValueError(f"Erro ao acessar vídeo: {e}")
+            logger.info(f"Informações extraídas: {video_info.title}")
 
-            except KeyError as e:
-                logger.error(f"Campo obrigatório ausente: {e}")
-                raise ValueError(f"Informações incompletas do vídeo")
+            return video_info
 
-            except Exception as e:
-                logger.error(f"Erro inesperado: {e}", exc_info=True)
-                raise ValueError(f"Erro ao processar vídeo: {e}")
+        except Exception as e:
+            raise cls.describe_error(e)
+
+    @staticmethod
+    def describe_error(e: Exception) -> ValueError:
+        """Converte a falha da extração na mensagem exibida ao usuário."""
+        if isinstance(e, yt_dlp.utils.DownloadError):
+            error_msg = str(e).lower()
+
+            if "private" in error_msg or "members-only" in error_msg:
+                return ValueError("Vídeo privado ou exclusivo para membros")
+            elif "unavailable" in error_msg or "removed" in error_msg:
+                return ValueError("Vídeo indisponível ou removido")
+            elif "copyright" in error_msg:
+                return ValueError("Vídeo bloqueado por direitos autorais")
+            else:
+                logger.error(f"Erro do yt-dlp: {e}")
+                return ValueError(f"Erro ao acessar vídeo: {e}")
+
+        if isinstance(e, ValueError):
+            return e
+
+        if isinstance(e, KeyError):
+            logger.error(f"Campo obrigatório ausente: {e}")
+            return ValueError(f"Informações incompletas do vídeo")
+
+        logger.error(f"Erro inesperado: {e}", exc_info=True)
+        return ValueError(f"Erro ao processar vídeo: {e}")
 
     @classmethod
     def extract_thumbnail(cls, url: str) -> str: